@@ -0,0 +1,30 @@
+"""unique (user_id, season_id) on user_battlepass
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the row with the most XP where concurrent first grants created duplicates
+    op.execute("""
+        DELETE FROM user_battlepass a
+        USING user_battlepass b
+        WHERE a.user_id = b.user_id
+          AND a.season_id = b.season_id
+          AND (a.total_xp_earned, a.id) < (b.total_xp_earned, b.id)
+    """)
+    op.create_unique_constraint(
+        'uq_user_battlepass_user_season', 'user_battlepass', ['user_id', 'season_id']
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_user_battlepass_user_season', 'user_battlepass', type_='unique')
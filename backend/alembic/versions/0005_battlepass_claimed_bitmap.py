@@ -0,0 +1,51 @@
+"""user_battlepass.claimed_levels CSV -> claimed_lo / claimed_hi bitmaps
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user_battlepass', sa.Column('claimed_lo', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('user_battlepass', sa.Column('claimed_hi', sa.BigInteger(), nullable=False, server_default='0'))
+    # Level n sets bit n-1 of claimed_lo (1-64) or bit n-65 of claimed_hi (65-128)
+    op.execute("""
+        UPDATE user_battlepass u SET
+          claimed_lo = COALESCE(c.lo, 0),
+          claimed_hi = COALESCE(c.hi, 0)
+        FROM (
+          SELECT id,
+                 bit_or(1::bigint << (lv - 1)) FILTER (WHERE lv BETWEEN 1 AND 64) AS lo,
+                 bit_or(1::bigint << (lv - 65)) FILTER (WHERE lv BETWEEN 65 AND 128) AS hi
+          FROM (
+            SELECT id, trim(x)::int AS lv
+            FROM user_battlepass, unnest(string_to_array(claimed_levels, ',')) AS x
+            WHERE trim(x) <> ''
+          ) levels
+          GROUP BY id
+        ) c
+        WHERE u.id = c.id
+    """)
+    op.drop_column('user_battlepass', 'claimed_levels')
+
+
+def downgrade():
+    op.add_column('user_battlepass', sa.Column('claimed_levels', sa.Text(), nullable=False, server_default=''))
+    op.execute("""
+        UPDATE user_battlepass u SET claimed_levels = COALESCE((
+          SELECT string_agg(lv::text, ',' ORDER BY lv)
+          FROM generate_series(1, 128) AS lv
+          WHERE CASE WHEN lv <= 64 THEN (u.claimed_lo >> (lv - 1)) & 1
+                     ELSE (u.claimed_hi >> (lv - 65)) & 1 END = 1
+        ), '')
+    """)
+    op.drop_column('user_battlepass', 'claimed_hi')
+    op.drop_column('user_battlepass', 'claimed_lo')
@@ -0,0 +1,27 @@
+"""applied_hand_events: hand event stream entries already applied
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'applied_hand_events',
+        sa.Column('entry_id', sa.String(32), primary_key=True),
+        sa.Column('applied_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_applied_hand_events_applied_at', 'applied_hand_events', ['applied_at'])
+
+
+def downgrade():
+    op.drop_index('ix_applied_hand_events_applied_at', 'applied_hand_events')
+    op.drop_table('applied_hand_events')
@@ -1,5 +1,11 @@
 """Achievements API and progress checker called after each hand."""
 import datetime
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from sqlalchemy import select
@@ -10,6 +16,9 @@ from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.achievement import Achievement, UserAchievement
 from app.models.shop import PlayerStats
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/achievements", tags=["achievements"])
 
@@ -34,7 +43,7 @@ async def list_achievements(
     user: User = Depends(get_current_user),
 ):
     """Return all achievements with per-user progress."""
-    all_ach = (await db.execute(select(Achievement))).scalars().all()
+    all_ach = (await get_catalog(db)).entries
 
     user_ach_result = await db.execute(
         select(UserAchievement).where(UserAchievement.user_id == user.id)
@@ -62,13 +71,163 @@ async def list_achievements(
     return out
 
 
-# ── Internal helper called from game_manager after each hand ──────────────────
+# ── Catalog cache ─────────────────────────────────────────────────────────────
+
+def _count(value) -> int:
+    return value or 0
+
+
+# Achievement key -> (PlayerStats field it tracks, progress from that field's value).
+# streak_5 has no source field: it is updated externally.
+_PROGRESS: dict[str, tuple[str, Callable[[Any], int]]] = {
+    "first_hand":     ("hands_played", _count),
+    "first_win":      ("hands_won", _count),
+    "hands_10":       ("hands_played", _count),
+    "hands_100":      ("hands_played", _count),
+    "hands_1000":     ("hands_played", _count),
+    "royal_flush":    ("best_hand", lambda v: 1 if v == "Royal Flush" else 0),
+    "bluff_master":   ("hands_won_no_showdown", _count),
+    "big_pot":        ("biggest_pot_won", lambda v: 1 if float(v or 0) >= 10000 else 0),
+    "tournament_win": ("tournaments_won", _count),
+    "all_in_win":     ("all_ins_won", _count),
+    "login_7":        ("login_streak", _count),
+    "login_30":       ("login_streak", _count),
+}
+
+CATALOG_TTL = 300.0  # seconds; a fallback, edits bump CATALOG_VERSION_KEY
+# Admin edits INCR this key; each worker compares it with the version its
+# catalog was loaded at, at most once per CATALOG_VERSION_CHECK seconds
+CATALOG_VERSION_KEY = "poker:achievements:catalog_version"
+CATALOG_VERSION_CHECK = 2.0
+UNLOCKED_CACHE_SIZE = 100_000  # users whose unlocked set is kept in memory
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: int
+    key: str
+    name: str
+    description: str | None
+    icon: str | None
+    rarity: str
+    target: int
+    xp_reward: int
+
+
+@dataclass
+class AchievementCatalog:
+    entries: list[CatalogEntry]
+    # PlayerStats field -> achievements whose progress comes from it
+    by_field: dict[str, list[CatalogEntry]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+    version: int = 0  # CATALOG_VERSION_KEY when loaded
+    checked_at: float = 0.0  # last comparison with CATALOG_VERSION_KEY
+
+    @classmethod
+    def build(cls, rows: list[Achievement], version: int = 0) -> "AchievementCatalog":
+        entries = [
+            CatalogEntry(
+                id=a.id, key=a.key, name=a.name, description=a.description,
+                icon=a.icon, rarity=a.rarity, target=a.target, xp_reward=a.xp_reward,
+            )
+            for a in rows
+        ]
+        by_field: dict[str, list[CatalogEntry]] = {}
+        for entry in entries:
+            source = _PROGRESS.get(entry.key)
+            if source:
+                by_field.setdefault(source[0], []).append(entry)
+        now = time.monotonic()
+        return cls(entries, by_field, now, version, now)
+
+
+_catalog: AchievementCatalog | None = None
+
+# user_id -> bitset of unlocked achievement ids (bit n = achievement id n).
+# Unlocks are never undone, so a missing bit only costs a DB read, never a
+# second award.
+_unlocked: OrderedDict[int, int] = OrderedDict()
+
+
+async def _catalog_version() -> int | None:
+    try:
+        return int(await get_redis().get(CATALOG_VERSION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Achievement catalog version check failed: {e}")
+        return None
+
+
+async def get_catalog(db: AsyncSession) -> AchievementCatalog:
+    global _catalog
+    now = time.monotonic()
+    if _catalog is not None and now - _catalog.loaded_at <= CATALOG_TTL:
+        if now - _catalog.checked_at < CATALOG_VERSION_CHECK:
+            return _catalog
+        version = await _catalog_version()
+        _catalog.checked_at = now
+        if version is None or version == _catalog.version:
+            return _catalog
+    else:
+        version = await _catalog_version()
 
-async def check_and_award(user_id: int, db: AsyncSession) -> list[str]:
+    # The version is read before the rows, so a catalog loaded ahead of an
+    # edit's commit is tagged with the old version and reloaded next check
+    rows = (await db.execute(select(Achievement).order_by(Achievement.id))).scalars().all()
+    _catalog = AchievementCatalog.build(rows, version or 0)
+    return _catalog
+
+
+async def invalidate_catalog():
     """
-    Re-evaluate all achievement conditions for a user based on PlayerStats.
-    Returns list of newly unlocked achievement keys.
+    Drop the cached catalog here and on every other worker. Call after the
+    transaction editing achievements has committed.
     """
+    global _catalog
+    _catalog = None
+    try:
+        await get_redis().incr(CATALOG_VERSION_KEY)
+    except Exception as e:
+        logger.error(f"Failed to publish achievement catalog change, other workers catch up within {CATALOG_TTL:.0f}s: {e}")
+
+
+def _unlocked_bits(user_id: int) -> int:
+    bits = _unlocked.get(user_id, 0)
+    if bits:
+        _unlocked.move_to_end(user_id)
+    return bits
+
+
+def _mark_unlocked(user_id: int, achievement_id: int):
+    _unlocked[user_id] = _unlocked.get(user_id, 0) | (1 << achievement_id)
+    _unlocked.move_to_end(user_id)
+    if len(_unlocked) > UNLOCKED_CACHE_SIZE:
+        _unlocked.popitem(last=False)
+
+
+# ── Internal helper called after each batch of hands ──────────────────────────
+
+async def check_and_award(
+    user_id: int,
+    db: AsyncSession,
+    changed: set[str] | None = None,
+) -> list[str]:
+    """
+    Re-evaluate achievement conditions for a user based on PlayerStats.
+    With `changed` (PlayerStats fields that moved), only achievements tracking
+    those fields are looked at; without it every achievement is, so callers
+    that don't track what they changed still get a full check. Returns list
+    of newly unlocked achievement keys.
+    """
+    catalog = await get_catalog(db)
+    if changed is None:
+        candidates = catalog.entries
+    else:
+        candidates = [e for f in changed for e in catalog.by_field.get(f, ())]
+    unlocked = _unlocked_bits(user_id)
+    candidates = [e for e in candidates if not unlocked >> e.id & 1]
+    if not candidates:
+        return []
+
     stats_result = await db.execute(
         select(PlayerStats).where(PlayerStats.user_id == user_id)
     )
@@ -76,9 +235,11 @@ async def check_and_award(user_id: int, db: AsyncSession) -> list[str]:
     if not stats:
         return []
 
-    all_ach = (await db.execute(select(Achievement))).scalars().all()
     user_ach_result = await db.execute(
-        select(UserAchievement).where(UserAchievement.user_id == user_id)
+        select(UserAchievement).where(
+            UserAchievement.user_id == user_id,
+            UserAchievement.achievement_id.in_([e.id for e in candidates]),
+        )
     )
     user_map: dict[int, UserAchievement] = {
         row.achievement_id: row for row in user_ach_result.scalars().all()
@@ -87,9 +248,10 @@ async def check_and_award(user_id: int, db: AsyncSession) -> list[str]:
     newly_unlocked: list[str] = []
     now = datetime.datetime.now(datetime.timezone.utc)
 
-    for ach in all_ach:
+    for ach in candidates:
         ua = user_map.get(ach.id)
         if ua and ua.unlocked:
+            _mark_unlocked(user_id, ach.id)
             continue  # already done
 
         # Map achievement key → current progress value
@@ -110,6 +272,7 @@ async def check_and_award(user_id: int, db: AsyncSession) -> list[str]:
             ua.unlocked = True
             ua.unlocked_at = now
             newly_unlocked.append(ach.key)
+            _mark_unlocked(user_id, ach.id)
             # Award XP
             stats.xp = (stats.xp or 0) + ach.xp_reward
             stats.level = _calc_level(stats.xp)
@@ -121,24 +284,12 @@ async def check_and_award(user_id: int, db: AsyncSession) -> list[str]:
 
 
 def _get_progress(key: str, stats: PlayerStats) -> int:
-    """Map achievement key to the relevant stat counter."""
-    mapping = {
-        "first_hand":     stats.hands_played,
-        "first_win":      stats.hands_won,
-        "hands_10":       stats.hands_played,
-        "hands_100":      stats.hands_played,
-        "hands_1000":     stats.hands_played,
-        "royal_flush":    1 if stats.best_hand == "Royal Flush" else 0,
-        "bluff_master":   stats.hands_won_no_showdown,
-        "big_pot":        1 if float(stats.biggest_pot_won or 0) >= 10000 else 0,
-        "tournament_win": stats.tournaments_won,
-        "all_in_win":     stats.all_ins_won,
-        # streak_5 and login_* are updated externally
-        "streak_5":       0,
-        "login_7":        stats.login_streak,
-        "login_30":       stats.login_streak,
-    }
-    return mapping.get(key, 0)
+    """Current progress of an achievement from the stat counter it tracks."""
+    source = _PROGRESS.get(key)
+    if source is None:
+        return 0
+    stat_field, progress = source
+    return progress(getattr(stats, stat_field))
 
 
 def _calc_level(xp: int) -> int:
@@ -18,6 +18,8 @@ from app.models.balance import Balance, Transaction, TxType
 from app.models.table import PokerTable, TablePlayer, TableStatus
 from app.models.tournament import Tournament, TournamentPlayer, TournamentStatus
 from app.models.shop import ShopItem, ItemType, ItemRarity
+from app.models.achievement import Achievement, UserAchievement
+from app.api.achievements import invalidate_catalog as invalidate_achievement_catalog
 
 UPLOAD_DIR = "/app/uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -107,6 +109,25 @@ class UpdateTournamentRequest(BaseModel):
     starts_at: datetime.datetime | None = None
 
 
+class CreateAchievementRequest(BaseModel):
+    key: str
+    name: str
+    description: str | None = None
+    icon: str | None = None
+    rarity: str = "bronze"
+    target: int = 1
+    xp_reward: int = 50
+
+
+class UpdateAchievementRequest(BaseModel):
+    name: str | None = None
+    description: str | None = None
+    icon: str | None = None
+    rarity: str | None = None
+    target: int | None = None
+    xp_reward: int | None = None
+
+
 class BanRequest(BaseModel):
     banned: bool
 
@@ -123,6 +144,35 @@ async def check_admin(admin: User = Depends(require_admin)):
     return {"admin": True, "telegram_id": admin.telegram_id}
 
 
+# ── WebSocket fan-out metrics ──
+
+@router.get("/ws-metrics")
+async def ws_metrics(admin: User = Depends(require_admin)):
+    from app.ws import manager as ws_manager
+    return ws_manager.get_metrics()
+
+
+@router.get("/engine-metrics")
+async def engine_metrics(admin: User = Depends(require_admin)):
+    from app import game_manager
+    return game_manager.engine_stats()
+
+
+@router.get("/worker-loads")
+async def worker_loads(admin: User = Depends(require_admin)):
+    from app import sharding
+    return {"workers": await sharding.worker_loads()}
+
+
+@router.post("/leaderboards/rebuild")
+async def rebuild_leaderboards(
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    from app import leaderboards
+    return {"boards": await leaderboards.rebuild(db)}
+
+
 # ── Dashboard stats ──
 
 @router.get("/stats", response_model=AdminStats)
@@ -740,6 +790,61 @@ async def admin_delete_shop_item(
     return {"deleted": item_id}
 
 
+# ── Achievements CRUD ──
+
+@router.post("/achievements")
+async def admin_create_achievement(
+    body: CreateAchievementRequest,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    existing = await db.execute(select(Achievement).where(Achievement.key == body.key))
+    if existing.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="key already exists")
+    ach = Achievement(**body.model_dump())
+    db.add(ach)
+    await db.commit()
+    await invalidate_achievement_catalog()
+    return {"id": ach.id, "key": ach.key}
+
+
+@router.put("/achievements/{achievement_id}")
+async def admin_update_achievement(
+    achievement_id: int,
+    body: UpdateAchievementRequest,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    result = await db.execute(select(Achievement).where(Achievement.id == achievement_id))
+    ach = result.scalar_one_or_none()
+    if not ach:
+        raise HTTPException(status_code=404, detail="Achievement not found")
+
+    for name, value in body.model_dump(exclude_none=True).items():
+        setattr(ach, name, value)
+
+    await db.commit()
+    await invalidate_achievement_catalog()
+    return {"status": "updated", "id": achievement_id}
+
+
+@router.delete("/achievements/{achievement_id}")
+async def admin_delete_achievement(
+    achievement_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    await db.execute(delete(UserAchievement).where(UserAchievement.achievement_id == achievement_id))
+    result = await db.execute(select(Achievement).where(Achievement.id == achievement_id))
+    ach = result.scalar_one_or_none()
+    if not ach:
+        raise HTTPException(status_code=404, detail="Achievement not found")
+    await db.delete(ach)
+    await db.commit()
+    await invalidate_achievement_catalog()
+    return {"deleted": achievement_id}
+
+
 # ── All Transactions (admin view) ─────────────────────────────────────────────
 
 class AdminTxOut(BaseModel):
@@ -1,14 +1,19 @@
 """Battle Pass API: season info, user progress, XP grant, reward claim."""
 import datetime
+from dataclasses import dataclass
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.models.battlepass import BattlePassSeason, BattlePassLevel, UserBattlePass
+from app.models.battlepass import (
+    BattlePassSeason, BattlePassLevel, UserBattlePass, MAX_CLAIMABLE_LEVEL, claim_mask,
+)
 from app.models.balance import Balance, Transaction, TxType, CurrencyType
 
 router = APIRouter(prefix="/battlepass", tags=["battlepass"])
@@ -44,32 +49,80 @@ class SeasonProgress(BaseModel):
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 async def _get_or_create_progress(
-    user_id: int, season: BattlePassSeason, db: AsyncSession
+    user_id: int, season: "ActiveSeason", db: AsyncSession
 ) -> UserBattlePass:
-    result = await db.execute(
-        select(UserBattlePass).where(
-            UserBattlePass.user_id == user_id,
-            UserBattlePass.season_id == season.id,
-        )
+    query = select(UserBattlePass).where(
+        UserBattlePass.user_id == user_id,
+        UserBattlePass.season_id == season.id,
     )
-    ubp = result.scalar_one_or_none()
+    ubp = (await db.execute(query)).scalar_one_or_none()
     if ubp is None:
-        ubp = UserBattlePass(user_id=user_id, season_id=season.id)
-        db.add(ubp)
-        await db.flush()
+        # A concurrent first request may insert the row first: keep theirs
+        await db.execute(
+            pg_insert(UserBattlePass)
+            .values(user_id=user_id, season_id=season.id)
+            .on_conflict_do_nothing(constraint="uq_user_battlepass_user_season")
+        )
+        ubp = (await db.execute(query)).scalar_one()
     return ubp
 
 
-async def _active_season(db: AsyncSession) -> BattlePassSeason | None:
+@dataclass(frozen=True)
+class ActiveSeason:
+    """Detached copy of the active BattlePassSeason, safe to share across sessions."""
+    id: int
+    name: str
+    total_levels: int
+    xp_per_level: int
+    starts_at: datetime.datetime
+    ends_at: datetime.datetime
+
+
+SEASON_CACHE_TTL = 60.0  # seconds
+
+# (valid_until, season): reused until the TTL runs out or the season ends,
+# or a scheduled one starts, whichever comes first
+_season_cache: tuple[datetime.datetime, ActiveSeason | None] | None = None
+
+
+def invalidate_season_cache():
+    global _season_cache
+    _season_cache = None
+
+
+async def _active_season(db: AsyncSession) -> ActiveSeason | None:
+    global _season_cache
     now = datetime.datetime.now(datetime.timezone.utc)
+    if _season_cache is not None and now < _season_cache[0]:
+        return _season_cache[1]
+
     result = await db.execute(
         select(BattlePassSeason).where(
             BattlePassSeason.is_active == True,
             BattlePassSeason.starts_at <= now,
             BattlePassSeason.ends_at >= now,
-        ).order_by(BattlePassSeason.id.desc())
+        ).order_by(BattlePassSeason.id.desc()).limit(1)
     )
-    return result.scalar_one_or_none()
+    row = result.scalar_one_or_none()
+    valid_until = now + datetime.timedelta(seconds=SEASON_CACHE_TTL)
+    season = None
+    if row is not None:
+        season = ActiveSeason(
+            id=row.id, name=row.name, total_levels=row.total_levels,
+            xp_per_level=row.xp_per_level, starts_at=row.starts_at, ends_at=row.ends_at,
+        )
+        valid_until = min(valid_until, season.ends_at)
+    else:
+        next_start = await db.scalar(
+            select(func.min(BattlePassSeason.starts_at)).where(
+                BattlePassSeason.is_active == True,
+                BattlePassSeason.starts_at > now,
+            )
+        )
+        if next_start is not None:
+            valid_until = min(valid_until, next_start)
+    _season_cache = (valid_until, season)
+    return season
 
 
 # ── Endpoints ─────────────────────────────────────────────────────────────────
@@ -92,7 +145,6 @@ async def get_season(
         .order_by(BattlePassLevel.level)
     )
     levels = levels_result.scalars().all()
-    claimed_set = set(int(x) for x in ubp.claimed_levels.split(",") if x.strip())
 
     xp_to_next = season.xp_per_level - ubp.current_xp
     progress_pct = (ubp.current_xp / season.xp_per_level * 100) if season.xp_per_level else 0
@@ -114,7 +166,7 @@ async def get_season(
                 free_reward=lv.free_reward,
                 free_reward_icon=lv.free_reward_icon,
                 free_reward_amount=lv.free_reward_amount,
-                claimed=lv.level in claimed_set,
+                claimed=ubp.is_claimed(lv.level),
             )
             for lv in levels
         ],
@@ -136,10 +188,8 @@ async def claim_reward(
 
     if level > ubp.current_level:
         raise HTTPException(status_code=400, detail="Level not reached yet")
-
-    claimed_set = set(int(x) for x in ubp.claimed_levels.split(",") if x.strip())
-    if level in claimed_set:
-        raise HTTPException(status_code=409, detail="Already claimed")
+    if not 1 <= level <= MAX_CLAIMABLE_LEVEL:
+        raise HTTPException(status_code=400, detail="Invalid level")
 
     # Find reward
     lv_result = await db.execute(
@@ -152,6 +202,20 @@ async def claim_reward(
     if not lv:
         raise HTTPException(status_code=404, detail="Level reward not found")
 
+    # Mark claimed: set the level's bit only if it is still clear, so of two
+    # concurrent claims exactly one gets a row back
+    column, mask = claim_mask(level)
+    bits = getattr(UserBattlePass, column)
+    claimed = await db.execute(
+        update(UserBattlePass)
+        .where(UserBattlePass.id == ubp.id, bits.op("&")(mask) == 0)
+        .values({column: bits.op("|")(mask)})
+        .returning(UserBattlePass.id)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.scalar_one_or_none() is None:
+        raise HTTPException(status_code=409, detail="Already claimed")
+
     # Grant reward
     reward_granted = None
     if lv.free_reward_amount > 0:
@@ -169,9 +233,6 @@ async def claim_reward(
             ))
             reward_granted = f"+{lv.free_reward_amount} RR"
 
-    # Mark claimed
-    claimed_set.add(level)
-    ubp.claimed_levels = ",".join(str(x) for x in sorted(claimed_set))
     await db.commit()
 
     return {
@@ -185,21 +246,50 @@ async def claim_reward(
 # ── Internal: grant XP after hand ────────────────────────────────────────────
 
 async def grant_xp(user_id: int, xp: int, db: AsyncSession):
-    """Add XP to user's battle pass progress. Called from game_manager."""
-    season = await _active_season(db)
-    if not season:
-        return
-
-    ubp = await _get_or_create_progress(user_id, season, db)
-    ubp.current_xp += xp
-    ubp.total_xp_earned += xp
+    """Add XP to user's battle pass progress."""
+    await grant_xp_many({user_id: xp}, db)
 
-    # Level up loop
-    while ubp.current_xp >= season.xp_per_level and ubp.current_level < season.total_levels:
-        ubp.current_xp -= season.xp_per_level
-        ubp.current_level += 1
 
-    await db.flush()
+async def grant_xp_many(xp_by_user: dict[int, int], db: AsyncSession) -> ActiveSeason | None:
+    """
+    Add XP for many users in one INSERT ... ON CONFLICT DO UPDATE.
+    Level-ups are computed in the statement: each full xp_per_level of
+    accumulated XP is one level, up to the season's last level (where XP
+    keeps accumulating). Returns the season credited, if any.
+    """
+    season = await _active_season(db)
+    if not season or not xp_by_user:
+        return season
+    per_level, top = season.xp_per_level, season.total_levels
+
+    rows = []
+    for uid, xp in sorted(xp_by_user.items()):  # fixed order: concurrent grants lock rows alike
+        gained = min(xp // per_level, top - 1)
+        rows.append({
+            "user_id": uid, "season_id": season.id,
+            "current_level": 1 + gained,
+            "current_xp": xp - gained * per_level,
+            "total_xp_earned": xp,
+            "claimed_lo": 0,
+            "claimed_hi": 0,
+        })
+
+    stmt = pg_insert(UserBattlePass).values(rows)
+    xp = stmt.excluded.total_xp_earned  # the XP granted by this call
+    # SET expressions all see the row as it was before the update
+    gained = func.least(
+        (UserBattlePass.current_xp + xp) // per_level, top - UserBattlePass.current_level,
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        constraint="uq_user_battlepass_user_season",
+        set_={
+            "current_level": UserBattlePass.current_level + gained,
+            "current_xp": UserBattlePass.current_xp + xp - gained * per_level,
+            "total_xp_earned": UserBattlePass.total_xp_earned + xp,
+            "updated_at": func.now(),
+        },
+    ))
+    return season
 
 
 async def seed_season_1(db: AsyncSession):
@@ -220,6 +310,7 @@ async def seed_season_1(db: AsyncSession):
     )
     db.add(season)
     await db.flush()
+    invalidate_season_cache()
 
     # Define rewards for all 50 levels
     rewards = []
@@ -1,20 +1,40 @@
 """
-Internal API for bot-to-backend communication.
-Not exposed to users — protected by X-Internal-Key header.
+Internal API for bot-to-backend and worker-to-worker communication.
+Not exposed to users (nginx does not proxy /api/internal/). Bot endpoints
+are protected by the X-Internal-Key header, engine forwarding between
+workers by X-Worker-Key.
 """
+import hmac
+
 from fastapi import APIRouter, Depends, HTTPException, Header
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings, Settings
 from app.database import get_db
 from app.models.user import User
 from app.models.balance import Balance, Transaction, TxType, CurrencyType
+from app.models.table import PokerTable, TablePlayer
+from app.models.tournament import Tournament, TournamentPlayer
+from app import game_manager, sharding
 
 router = APIRouter(prefix="/internal", tags=["internal"])
 
 
-def verify_internal(x_internal_key: str = Header(default="")):
-    if x_internal_key != "bot-internal":
+def verify_internal(
+    x_internal_key: str = Header(default=""),
+    settings: Settings = Depends(get_settings),
+):
+    if not hmac.compare_digest(x_internal_key, settings.internal_key):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def verify_worker(
+    x_worker_key: str = Header(default=""),
+    settings: Settings = Depends(get_settings),
+):
+    """Worker-to-worker calls (app.sharding); refused unless WORKER_SECRET is set."""
+    if not settings.worker_secret or not hmac.compare_digest(x_worker_key, settings.worker_secret):
         raise HTTPException(status_code=403, detail="Forbidden")
 
 
@@ -30,6 +50,14 @@ class ListenerCreditRequest(BaseModel):
     ton_tx_hash: str
 
 
+class EngineJoinRequest(BaseModel):
+    user_id: int
+
+
+class EngineLeaveRequest(BaseModel):
+    user_id: int
+
+
 @router.post("/adjust_balance", dependencies=[Depends(verify_internal)])
 async def adjust_balance(body: AdjustBalanceRequest, db: AsyncSession = Depends(get_db)):
     """Adjust user RR balance. Used by bot for buy/sell operations."""
@@ -95,3 +123,69 @@ async def listener_credit(body: ListenerCreditRequest, db: AsyncSession = Depend
     db.add(tx)
     await db.flush()
     return {"status": "credited", "new_balance": float(balance.amount)}
+
+
+async def _seat_from_db(table_id: int, user_id: int, db: AsyncSession) -> dict | None:
+    """A player's seat, stack and the table's blinds as recorded in the database."""
+    result = await db.execute(
+        select(TablePlayer, PokerTable)
+        .join(PokerTable, PokerTable.id == TablePlayer.table_id)
+        .where(TablePlayer.table_id == table_id, TablePlayer.user_id == user_id)
+    )
+    row = result.first()
+    if row is not None:
+        tp, table = row
+        return {
+            "seat": tp.seat,
+            "stack": float(tp.stack),
+            "small_blind": float(table.small_blind),
+            "big_blind": float(table.big_blind),
+            # FUN tables have 0% rake
+            "rake_override": 0.0 if table.currency == CurrencyType.FUN else None,
+        }
+
+    # Tournament tables are virtual: the seat is on the TournamentPlayer row
+    from app.api.tournaments import engine_seat_params
+    result = await db.execute(
+        select(TournamentPlayer, Tournament)
+        .join(Tournament, Tournament.id == TournamentPlayer.tournament_id)
+        .where(
+            TournamentPlayer.table_id == table_id,
+            TournamentPlayer.user_id == user_id,
+            TournamentPlayer.is_eliminated == False,
+        )
+    )
+    row = result.first()
+    if row is not None:
+        tp, tournament = row
+        return {"seat": tp.seat, **engine_seat_params(tournament)}
+    return None
+
+
+@router.post("/tables/{table_id}/join", dependencies=[Depends(verify_worker)])
+async def engine_join(table_id: int, body: EngineJoinRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Seat a player in this worker's engine. Forwarded by the worker that took
+    the REST join; seat and stack come from the committed seat row, never
+    from the request.
+    """
+    # A join forwarded just before a takeover must not start a second engine
+    if not await sharding.still_owns(table_id):
+        raise HTTPException(status_code=409, detail="Table is owned by another worker")
+    seat = await _seat_from_db(table_id, body.user_id, db)
+    if seat is None:
+        raise HTTPException(status_code=404, detail="Player is not seated at this table")
+    try:
+        await game_manager.player_joined(table_id=table_id, user_id=body.user_id, **seat)
+    except sharding.NotOwner:
+        raise HTTPException(status_code=409, detail="Table is owned by another worker")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok"}
+
+
+@router.post("/tables/{table_id}/leave", dependencies=[Depends(verify_worker)])
+async def engine_leave(table_id: int, body: EngineLeaveRequest):
+    """Remove a player from this worker's engine; returns the stack they leave with."""
+    remaining = await game_manager.player_left(table_id, body.user_id)
+    return {"status": "ok", "remaining": remaining}
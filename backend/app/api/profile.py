@@ -1,7 +1,7 @@
 """Profile API: real stats from PlayerStats table, leaderboard."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -9,6 +9,8 @@ from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.balance import Transaction, TxType
 from app.models.shop import PlayerStats
+from app.game.money import to_float
+from app import leaderboards
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -47,6 +49,26 @@ class LeaderboardEntry(BaseModel):
     total_chips_won: float
     level: int
     xp: int
+    score: float
+
+
+class LeaderboardRank(BaseModel):
+    board: str
+    rank: int | None  # None until the player is on the board
+    score: float
+    total: int
+
+
+def _score(board: str, score: float) -> float:
+    return to_float(int(score)) if board in leaderboards.CHIP_BOARDS else int(score)
+
+
+async def _board_key(board: str, db: AsyncSession) -> str | None:
+    if board not in leaderboards.BOARDS:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown board, use one of: {', '.join(leaderboards.BOARDS)}"
+        )
+    return await leaderboards.board_key(board, db)
 
 
 @router.get("/me", response_model=ProfileResponse)
@@ -103,27 +125,53 @@ async def get_profile(
 
 @router.get("/leaderboard", response_model=list[LeaderboardEntry])
 async def get_leaderboard(
-    limit: int = 50,
+    board: str = "chips",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
 ):
-    """Top players by total chips won."""
+    """Top players on a board (chips, hands_won, xp, weekly, season), a page at a time."""
+    key = await _board_key(board, db)
+    if key is None:
+        return []
+    ranked = await leaderboards.top(key, offset, limit)
+    if not ranked:
+        return []
+
     result = await db.execute(
-        select(PlayerStats, User)
-        .join(User, PlayerStats.user_id == User.id)
-        .order_by(desc(PlayerStats.total_chips_won))
-        .limit(limit)
+        select(User, PlayerStats)
+        .outerjoin(PlayerStats, PlayerStats.user_id == User.id)
+        .where(User.id.in_([uid for uid, _ in ranked]))
     )
-    rows = result.all()
+    rows = {u.id: (u, stats) for u, stats in result.all()}
     out = []
-    for rank, (stats, u) in enumerate(rows, start=1):
+    for rank, (uid, score) in enumerate(ranked, start=offset + 1):
+        if uid not in rows:
+            continue
+        u, stats = rows[uid]
         out.append(LeaderboardEntry(
             rank=rank,
             user_id=u.id,
             username=u.username,
             first_name=u.first_name,
-            hands_won=stats.hands_won,
-            total_chips_won=float(stats.total_chips_won),
-            level=stats.level,
-            xp=stats.xp,
+            hands_won=stats.hands_won if stats else 0,
+            total_chips_won=float(stats.total_chips_won) if stats else 0,
+            level=stats.level if stats else 1,
+            xp=stats.xp if stats else 0,
+            score=_score(board, score),
         ))
     return out
+
+
+@router.get("/leaderboard/me", response_model=LeaderboardRank)
+async def get_my_rank(
+    board: str = "chips",
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """The current player's rank on a board."""
+    key = await _board_key(board, db)
+    if key is None:
+        return LeaderboardRank(board=board, rank=None, score=0, total=0)
+    rank, score, total = await leaderboards.rank(key, user.id)
+    return LeaderboardRank(board=board, rank=rank, score=_score(board, score), total=total)
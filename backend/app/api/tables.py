@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy import select
@@ -7,7 +9,10 @@ from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.table import PokerTable, TablePlayer, TableStatus
 from app.models.balance import Balance, Transaction, TxType, CurrencyType
-from app import game_manager
+from app import sharding
+from app.game.engine import MAX_SEATS
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tables", tags=["tables"])
 
@@ -88,6 +93,9 @@ async def create_table(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid currency, use 'chip' or 'fun'")
 
+    if not 2 <= body.max_players <= MAX_SEATS:
+        raise HTTPException(status_code=400, detail=f"max_players must be 2-{MAX_SEATS}")
+
     table = PokerTable(
         name=body.name,
         currency=cur,
@@ -159,6 +167,9 @@ async def join_table(
     if table.current_players >= table.max_players:
         raise HTTPException(status_code=400, detail="Table is full")
 
+    if not 0 <= body.seat < table.max_players:
+        raise HTTPException(status_code=400, detail="Invalid seat")
+
     if body.buy_in < float(table.min_buy_in) or body.buy_in > float(table.max_buy_in):
         raise HTTPException(status_code=400, detail="Buy-in out of range")
 
@@ -205,23 +216,53 @@ async def join_table(
     db.add(tp)
     table.current_players += 1
 
-    await db.flush()
+    # Commit before seating: a remote owner reads the seat row itself
+    await db.commit()
 
     # FUN tables have 0% rake
     rake_override = 0.0 if cur == CurrencyType.FUN else None
-    await game_manager.player_joined(
-        table_id=table_id,
-        user_id=user.id,
-        seat=body.seat,
-        stack=body.buy_in,
-        small_blind=float(table.small_blind),
-        big_blind=float(table.big_blind),
-        rake_override=rake_override,
-    )
+    try:
+        await sharding.player_joined(
+            table_id=table_id,
+            user_id=user.id,
+            seat=body.seat,
+            stack=body.buy_in,
+            small_blind=float(table.small_blind),
+            big_blind=float(table.big_blind),
+            rake_override=rake_override,
+        )
+    except Exception as e:
+        logger.error(f"Seating user {user.id} at table {table_id} failed: {e}")
+        await _undo_join(db, table, tp, user, body.buy_in)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=503, detail="Could not join the table, try again")
 
     return {"status": "joined", "seat": body.seat, "stack": body.buy_in}
 
 
+async def _undo_join(db: AsyncSession, table: PokerTable, tp: TablePlayer, user: User, buy_in: float):
+    """Unseat and refund a committed join whose engine seating failed."""
+    try:
+        await sharding.player_left(table.id, user.id)
+    except Exception:
+        pass  # the engine may never have seated them
+    cur = table.currency
+    balance = user.balance
+    _set_balance_for_currency(balance, cur, _get_balance_for_currency(balance, cur) + buy_in)
+    db.add(Transaction(
+        user_id=user.id,
+        currency=cur,
+        tx_type=TxType.CASH_OUT,
+        amount=buy_in,
+        balance_after=_get_balance_for_currency(balance, cur),
+        reference=f"table:{table.id}",
+    ))
+    table.current_players = max(0, table.current_players - 1)
+    await db.delete(tp)
+    await db.commit()
+
+
 @router.post("/{table_id}/leave")
 async def leave_table(
     table_id: int,
@@ -241,7 +282,20 @@ async def leave_table(
     table = table_result.scalar_one()
     cur = table.currency
 
-    engine_stack = await game_manager.player_left(table_id, user.id)
+    engine_stack = await sharding.player_left(table_id, user.id)
+
+    # Queued stack writes for the table have landed by now; a player who
+    # busted in the last hand is already unseated
+    result = await db.execute(
+        select(TablePlayer)
+        .where(TablePlayer.table_id == table_id, TablePlayer.user_id == user.id)
+        .execution_options(populate_existing=True)
+    )
+    tp = result.scalar_one_or_none()
+    if not tp:
+        return {"status": "left", "returned": 0.0}
+    await db.refresh(table)
+
     remaining_stack = engine_stack if engine_stack > 0 else float(tp.stack)
 
     balance = user.balance
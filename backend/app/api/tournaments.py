@@ -316,6 +316,7 @@ async def _finish_tournament(tournament_id: int, db: AsyncSession):
     prize_pool = float(tournament.prize_pool)
     structure = _prize_structure(len(players))
 
+    winners: list[int] = []
     for i, tp in enumerate(players):
         if i < len(structure):
             prize = round(prize_pool * structure[i], 4)
@@ -345,32 +346,45 @@ async def _finish_tournament(tournament_id: int, db: AsyncSession):
                 stats.tournaments_played = (stats.tournaments_played or 0) + 1
                 if tp.finish_position == 1:
                     stats.tournaments_won = (stats.tournaments_won or 0) + 1
+                    winners.append(tp.user_id)
 
     await db.flush()
+
+    # Stats written outside the hand event path get their achievements checked here
+    from app.api.achievements import check_and_award
+    for user_id in winners:
+        await check_and_award(user_id, db, {"tournaments_won"})
     logger.info(f"Tournament {tournament_id} finished, prizes distributed")
 
 
+def engine_seat_params(tournament: Tournament) -> dict:
+    """Stack, blinds and rake every seat of a tournament's tables is dealt with."""
+    return {
+        "stack": float(tournament.starting_stack),
+        "small_blind": float(tournament.buy_in) * 0.01,
+        "big_blind": float(tournament.buy_in) * 0.02,
+        "rake_override": 0.0,  # no rake in tournaments
+    }
+
+
 async def _launch_tournament_tables(
     tournament_id: int,
     assignments: list[tuple[int, int, int]],
     tournament: Tournament,
 ):
-    """Create game engines for each tournament table."""
-    from app.game_manager import get_or_create_engine, player_joined
+    """Create game engines for each tournament table, on the workers that own them."""
+    from app import sharding
 
     tables: dict[int, list[tuple[int, int]]] = {}
     for user_id, table_id, seat in assignments:
         tables.setdefault(table_id, []).append((user_id, seat))
 
+    params = engine_seat_params(tournament)
     for table_id, players in tables.items():
         for user_id, seat in players:
-            await player_joined(
-                table_id=table_id,
-                user_id=user_id,
-                seat=seat,
-                stack=float(tournament.starting_stack),
-                small_blind=float(tournament.buy_in) * 0.01,
-                big_blind=float(tournament.buy_in) * 0.02,
-                rake_override=0.0,  # no rake in tournaments
-            )
+            try:
+                await sharding.player_joined(table_id=table_id, user_id=user_id, seat=seat, **params)
+            except Exception as e:
+                logger.error(f"Tournament {tournament_id}: failed to seat user {user_id} "
+                             f"at table {table_id}: {e}")
         logger.info(f"Tournament {tournament_id}: table {table_id} launched with {len(players)} players")
@@ -23,6 +23,31 @@ class Settings(BaseSettings):
     rake_percent: float = 3.0
     debug: bool = False
 
+    # WebSocket fan-out: per-socket outbound queue size, and what to do when
+    # a client falls that far behind ("latest" = skip to a fresh snapshot,
+    # "disconnect" = close the socket)
+    ws_send_queue_size: int = 64
+    ws_slow_consumer_policy: str = "latest"
+
+    # Sharding: run WORKER_COUNT backend processes, each with its own
+    # WORKER_ID (0-based); WORKER_URLS lists their internal base URLs in id
+    # order. Tables are assigned to workers through Redis. 1 = no sharding.
+    worker_id: int = 0
+    worker_count: int = 1
+    worker_urls: str = ""
+    # Shared secret for worker-to-worker calls (X-Worker-Key); required with
+    # WORKER_COUNT > 1, the forwarding endpoints refuse everything without it
+    worker_secret: str = ""
+
+    # Key the bot and TON listener send as X-Internal-Key
+    internal_key: str = "bot-internal"
+
+    # Engine snapshots, written after every state change and restored on
+    # startup: "redis", "disk" (under engine_snapshot_dir) or "off"; opt in,
+    # and use "redis" with WORKER_COUNT > 1 so tables can move between workers
+    engine_snapshots: str = "off"
+    engine_snapshot_dir: str = "/app/snapshots"
+
     # Exchange rates — RR per 1 unit of crypto
     # Inverse: 1 RR = rate_usdt_per_rr USDT, 1 RR = rate_ton_per_rr TON
     rate_usdt_per_rr: float = 0.0227   # 1 RR = 0.0227 USDT  → 1 USDT ≈ 44 RR
@@ -40,6 +65,10 @@ class Settings(BaseSettings):
             return []
         return [int(x.strip()) for x in self.admin_ids.split(",") if x.strip()]
 
+    @property
+    def worker_url_list(self) -> list[str]:
+        return [x.strip().rstrip("/") for x in self.worker_urls.split(",") if x.strip()]
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,94 @@
+"""
+Where engine snapshots (app.game.snapshot) are kept between restarts.
+
+ENGINE_SNAPSHOTS selects the backend: "redis" (one key per table, shared by
+all workers so a table can move between them), "disk" (one file per table
+under ENGINE_SNAPSHOT_DIR, for single-host deployments) or "off", the
+default. Disk I/O runs in a thread so it never stalls the event loop.
+"""
+import asyncio
+import logging
+import os
+
+from app.config import get_settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "poker:engine:{}"
+_SUFFIX = ".snap"
+
+
+def _backend() -> str:
+    return get_settings().engine_snapshots
+
+
+def enabled() -> bool:
+    return _backend() != "off"
+
+
+def _path(table_id: int) -> str:
+    return os.path.join(get_settings().engine_snapshot_dir, f"{table_id}{_SUFFIX}")
+
+
+def _write_file(table_id: int, data: bytes):
+    path = _path(table_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)  # readers never see a half-written snapshot
+
+
+def _read_file(table_id: int) -> bytes | None:
+    try:
+        with open(_path(table_id), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+async def save(table_id: int, data: bytes):
+    backend = _backend()
+    if backend == "redis":
+        await get_redis().set(REDIS_KEY.format(table_id), data)
+    elif backend == "disk":
+        await asyncio.to_thread(_write_file, table_id, data)
+
+
+async def load(table_id: int) -> bytes | None:
+    backend = _backend()
+    if backend == "redis":
+        return await get_redis().get(REDIS_KEY.format(table_id))
+    if backend == "disk":
+        return await asyncio.to_thread(_read_file, table_id)
+    return None
+
+
+async def delete(table_id: int):
+    backend = _backend()
+    if backend == "redis":
+        await get_redis().delete(REDIS_KEY.format(table_id))
+    elif backend == "disk":
+        try:
+            await asyncio.to_thread(os.remove, _path(table_id))
+        except FileNotFoundError:
+            pass
+
+
+async def table_ids() -> list[int]:
+    """Tables that have a stored snapshot."""
+    backend = _backend()
+    if backend == "redis":
+        prefix = REDIS_KEY.format("")
+        return [
+            int(key[len(prefix):])
+            async for key in get_redis().scan_iter(match=REDIS_KEY.format("*"))
+        ]
+    if backend == "disk":
+        directory = get_settings().engine_snapshot_dir
+        if not os.path.isdir(directory):
+            return []
+        names = await asyncio.to_thread(os.listdir, directory)
+        return [int(n[:-len(_SUFFIX)]) for n in names if n.endswith(_SUFFIX)]
+    return []
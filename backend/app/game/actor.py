@@ -0,0 +1,104 @@
+"""
+Per-table actor: one asyncio task applies every engine mutation in order.
+
+WebSocket messages, REST joins/leaves and timers all submit commands
+(coroutine functions taking the engine) to the table's queue instead of
+touching the engine directly, so two callers can never interleave at an
+await inside a hand. Broadcasts requested while commands run are coalesced:
+the latest state is flushed once the queue is drained, unless the engine
+asks for one to go out at once.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from app.game.engine import GameEngine
+
+logger = logging.getLogger(__name__)
+
+Command = Callable[[GameEngine], Awaitable[Any]]
+
+
+class TableActor:
+    def __init__(
+        self,
+        table_id: int,
+        engine: GameEngine,
+        flush: Callable[[int, dict], Awaitable],
+    ):
+        self.table_id = table_id
+        self.engine = engine
+        self._flush = flush  # async (table_id, state), sends a state to clients
+        self._queue: asyncio.Queue[tuple[Command, asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._pending_state: dict | None = None
+        self._current: asyncio.Future | None = None  # future of the running command
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    async def call(self, command: Command) -> Any:
+        """Run command(engine) on the actor and return its result."""
+        if self._task is not None and asyncio.current_task() is self._task:
+            # Already inside a command: run inline, queueing would deadlock
+            return await command(self.engine)
+        return await self.submit(command)
+
+    def submit(self, command: Command) -> asyncio.Future:
+        """Queue command(engine) without waiting; the future gets its result."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((command, future))
+        return future
+
+    async def publish(self, table_id: int, state: dict, flush: bool = False):
+        """
+        Engine broadcast callback: keep the latest state for the next flush.
+        flush=True sends it right away, for states clients must see even
+        though the same command moves on past them.
+        """
+        self._pending_state = state
+        if flush or asyncio.current_task() is not self._task:
+            await self._flush_pending()
+
+    async def flush_now(self):
+        """Send the pending state now instead of after the queue drains."""
+        await self._flush_pending()
+
+    async def _flush_pending(self):
+        state, self._pending_state = self._pending_state, None
+        if state is None:
+            return
+        try:
+            await self._flush(self.table_id, state)
+        except Exception as e:
+            logger.error(f"Broadcast failed for table {self.table_id}: {e}")
+
+    async def _run(self):
+        while True:
+            command, future = await self._queue.get()
+            self._current = future
+            try:
+                result = await command(self.engine)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            if self._queue.empty():
+                await self._flush_pending()
+
+    def stop(self):
+        """Stop the actor; the running and queued commands' callers see them cancelled."""
+        if self._current is not None and not self._current.done():
+            self._current.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
@@ -1,8 +1,15 @@
-"""Standard 52-card deck with shuffle and deal."""
-import random
-from dataclasses import dataclass
+"""
+Standard 52-card deck with shuffle and deal.
+
+Cards are plain ints 0..51 encoded as (rank - 2) * 4 + suit. Rank, suit and
+bit lookups go through precomputed 52-entry tables, and a set of cards can be
+packed into a 64-bit mask. Client-facing dicts come from a cached table and
+are only built at the serialization boundary.
+"""
 from enum import IntEnum
 
+from app.game.rng import DeckRng, SecureRng
+
 
 class Suit(IntEnum):
     CLUBS = 0
@@ -35,45 +42,90 @@ RANK_SYMBOLS = {
 }
 
 
-@dataclass(frozen=True)
-class Card:
-    rank: Rank
-    suit: Suit
+Card = int  # card id 0..51
+
+CARD_RANK: list[int] = [c // 4 + 2 for c in range(52)]  # rank value 2..14
+CARD_SUIT: list[int] = [c % 4 for c in range(52)]
+CARD_BIT: list[int] = [1 << c for c in range(52)]
+CARD_STR: list[str] = [
+    f"{RANK_SYMBOLS[Rank(CARD_RANK[c])]}{SUIT_SYMBOLS[Suit(CARD_SUIT[c])]}" for c in range(52)
+]
+# Shared, read-only serialized form of each card
+CARD_DICTS: list[dict] = [
+    {"rank": CARD_RANK[c], "suit": CARD_SUIT[c], "display": CARD_STR[c]} for c in range(52)
+]
+
+_FULL_DECK: list[Card] = list(range(52))
+
+
+def make_card(rank: Rank | int, suit: Suit | int) -> Card:
+    return (int(rank) - 2) * 4 + int(suit)
+
 
-    def __str__(self) -> str:
-        return f"{RANK_SYMBOLS[self.rank]}{SUIT_SYMBOLS[self.suit]}"
+def card_str(card: Card) -> str:
+    return CARD_STR[card]
 
-    def __repr__(self) -> str:
-        return str(self)
 
-    def to_dict(self) -> dict:
-        return {"rank": self.rank.value, "suit": self.suit.value, "display": str(self)}
+def cards_to_dicts(cards: list[Card]) -> list[dict]:
+    return [CARD_DICTS[c] for c in cards]
+
+
+def hand_mask(cards: list[Card]) -> int:
+    """Pack cards into a 64-bit mask (bit n set = card n present)."""
+    mask = 0
+    for c in cards:
+        mask |= CARD_BIT[c]
+    return mask
 
 
 class Deck:
-    def __init__(self):
-        self._cards: list[Card] = []
-        self.reset()
+    """
+    Cursor-based deck over a preallocated bytearray of card ids.
+
+    Cards are shuffled lazily with a partial Fisher-Yates: before cards are
+    handed out, each cursor slot is swapped with a uniformly chosen undealt
+    card. Only the cards actually dealt get shuffled, and reset() is O(1).
+    Randomness comes from `rng` (a buffered CSPRNG unless one is injected).
+    """
+
+    def __init__(self, rng: DeckRng | None = None):
+        self.rng = rng or SecureRng()
+        self._cards = bytearray(_FULL_DECK)
+        self._pos = 0
 
     def reset(self):
-        self._cards = [Card(rank=r, suit=s) for s in Suit for r in Rank]
-        random.shuffle(self._cards)
+        # Any permutation is a valid starting point for the lazy shuffle
+        self._pos = 0
+
+    def _shuffle_range(self, start: int, stop: int):
+        cards = self._cards
+        randbelow = self.rng.randbelow
+        for i in range(start, stop):
+            j = i + randbelow(52 - i)
+            cards[i], cards[j] = cards[j], cards[i]
+
+    def shuffle(self):
+        """Eagerly shuffle all undealt cards (full Fisher-Yates)."""
+        self._shuffle_range(self._pos, 52)
 
     def deal(self, count: int = 1) -> list[Card]:
-        if count > len(self._cards):
+        pos = self._pos
+        end = pos + count
+        if end > 52:
             raise ValueError("Not enough cards in deck")
-        dealt = self._cards[:count]
-        self._cards = self._cards[count:]
-        return dealt
+        self._shuffle_range(pos, end)
+        self._pos = end
+        return list(self._cards[pos:end])
 
     def deal_one(self) -> Card:
         return self.deal(1)[0]
 
     def burn(self):
         """Burn top card (discard without revealing)."""
-        if self._cards:
-            self._cards.pop(0)
+        if self._pos < 52:
+            self._shuffle_range(self._pos, self._pos + 1)
+            self._pos += 1
 
     @property
     def remaining(self) -> int:
-        return len(self._cards)
+        return 52 - self._pos
@@ -2,19 +2,31 @@
 Texas Hold'em game engine.
 Full cycle: preflop -> flop -> turn -> river -> showdown.
 Supports side pots, all-in, rake, and turn timers.
+
+All chip amounts inside the engine (stacks, bets, blinds, pots, rake) are
+ints in minor units (see app.game.money); they are converted to floats only
+in client-facing payloads.
 """
 import asyncio
+import logging
 import time
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Callable, Awaitable
 
-from app.game.deck import Deck, Card
-from app.game.hand_evaluator import evaluate_hand, HandRank
+from app.game.deck import Deck, Card, cards_to_dicts
+from app.game.equity import calculate_equity_async
+from app.game.hand_evaluator import PreparedBoard, strength_rank
+from app.game.money import percent_to_bps, rake_for, split_evenly, to_float
 from app.game.player_fsm import PlayerState, PlayerStatus
 from app.game.pot import PotManager
+from app.game.rng import DeckRng
 from app.game.table_fsm import Street, next_street
 
+logger = logging.getLogger(__name__)
+
+MAX_SEATS = 10  # fixed seat array size; seats are 0..MAX_SEATS-1
+
 
 class ActionType(str, Enum):
     FOLD = "fold"
@@ -29,14 +41,14 @@ class ActionType(str, Enum):
 class GameAction:
     user_id: int
     action: ActionType
-    amount: float = 0
+    amount: int = 0  # minor units
 
 
 @dataclass
 class HandResult:
     winners: list[dict]  # [{user_id, amount, hand_rank, cards}]
     pots: list[dict]
-    rake: float
+    rake: int
     community_cards: list[dict]
 
 
@@ -46,45 +58,91 @@ class GameEngine:
     def __init__(
         self,
         table_id: int,
-        small_blind: float,
-        big_blind: float,
+        small_blind: int,
+        big_blind: int,
         rake_percent: float = 3.0,
         turn_timeout: float = 30.0,
         broadcast: Callable[..., Awaitable] | None = None,
         on_hand_end: Callable[..., Awaitable] | None = None,
+        rng: DeckRng | None = None,
+        clock: Callable[[], float] = time.time,
     ):
         self.table_id = table_id
         self.small_blind = small_blind
         self.big_blind = big_blind
         self.rake_percent = rake_percent
+        self._rake_bps = percent_to_bps(rake_percent)
         self.turn_timeout = turn_timeout
         self.broadcast = broadcast  # async callback to push state to clients
-        self.on_hand_end = on_hand_end  # called with (table_id, rake_amount, winners)
+        self.on_hand_end = on_hand_end  # called with (table_id, rake, winners), minor units
+        self.clock = clock  # wall clock for turn deadlines; injectable for simulations
 
         self.players: dict[int, PlayerState] = {}  # user_id -> PlayerState
-        self.deck = Deck()
+        self.seats: list[PlayerState | None] = [None] * MAX_SEATS  # same players, by seat
+        self.deck = Deck(rng)  # per-engine RNG; CSPRNG unless a seeded one is injected
         self.pot_manager = PotManager()
         self.community_cards: list[Card] = []
         self.street: Street = Street.PREFLOP
         self.dealer_seat: int = 0
+        self.sb_seat: int | None = None
+        self.bb_seat: int | None = None
         self.current_player_id: int | None = None
-        self.current_bet: float = 0
-        self.min_raise: float = 0
+        self.current_bet: int = 0
+        self.min_raise: int = 0
         self.hand_in_progress: bool = False
         self._action_order: list[int] = []
         self._action_index: int = 0
         self._players_acted: set[int] = set()
+        # Per-hand counters, updated as players bet, fold, go all-in or leave
+        self._active_count: int = 0
+        self._all_in_count: int = 0
+        self._folded_count: int = 0
+        self._pending_to_act: int = 0  # active players yet to act since the last raise
         self._turn_deadline: float = 0
+        self.equities: dict[int, dict] = {}  # user_id -> all-in equity while running out
+        self.last_action: dict | None = None  # result of the latest accepted action this hand
 
     # ── Player management ──
 
-    def add_player(self, user_id: int, seat: int, stack: float):
-        self.players[user_id] = PlayerState(user_id=user_id, seat=seat, stack=stack)
-
-    def remove_player(self, user_id: int) -> float:
-        """Remove player, return remaining stack."""
+    def add_player(self, user_id: int, seat: int, stack: int):
+        if not 0 <= seat < MAX_SEATS:
+            raise ValueError(f"Seat {seat} out of range")
+        if self.seats[seat] is not None:
+            raise ValueError(f"Seat {seat} is taken")
+        player = PlayerState(user_id=user_id, seat=seat, stack=stack)
+        if self.hand_in_progress:
+            # Dealt in from the next hand
+            player.status = PlayerStatus.SITTING_OUT
+        self.players[user_id] = player
+        self.seats[seat] = player
+
+    async def remove_player(self, user_id: int) -> int:
+        """Remove player, return remaining stack (minor units).
+
+        A player leaving on their turn folds first, so the action moves on
+        (or the round or hand ends) instead of waiting on an empty seat.
+        """
+        if self.hand_in_progress and user_id == self.current_player_id:
+            await self.process_action(GameAction(user_id=user_id, action=ActionType.FOLD))
         player = self.players.pop(user_id, None)
-        return player.stack if player else 0
+        if not player:
+            return 0
+        self.seats[player.seat] = None
+        if self.hand_in_progress:
+            if player.status == PlayerStatus.ACTIVE:
+                self._active_count -= 1
+                if player.user_id not in self._players_acted:
+                    self._pending_to_act -= 1
+            elif player.status == PlayerStatus.ALL_IN:
+                self._all_in_count -= 1
+            elif player.status == PlayerStatus.FOLDED:
+                self._folded_count -= 1
+        return player.stack
+
+    @property
+    def turn_deadline(self) -> float:
+        """Clock time at which the current turn times out."""
+        return self._turn_deadline
 
     def seated_count(self) -> int:
         return len(self.players)
@@ -93,19 +151,24 @@ class GameEngine:
 
     async def start_hand(self):
         """Start a new hand. Requires at least 2 players."""
-        active = [p for p in self.players.values() if p.stack > 0]
+        active = [p for p in self.seats if p is not None and p.stack > 0]
         if len(active) < 2:
             return
 
         self.hand_in_progress = True
         self.community_cards = []
+        self.equities = {}
+        self.last_action = None
         self.pot_manager.reset()
         self.street = Street.PREFLOP
         self.current_bet = 0
 
-        # Reset players
+        # Reset players; busted ones sit out
         for p in self.players.values():
             p.reset_for_new_hand()
+        self._active_count = len(active)
+        self._all_in_count = 0
+        self._folded_count = 0
 
         # Advance dealer
         self._advance_dealer()
@@ -113,22 +176,19 @@ class GameEngine:
         # Shuffle and deal
         self.deck.reset()
         for p in active:
-            p.hole_cards = self.deck.deal(2)
+            p.deal_hole_cards(self.deck.deal(2))
 
         # Post blinds
         sb_player, bb_player = self._get_blind_players()
-        sb_actual = sb_player.bet(self.small_blind)
-        bb_actual = bb_player.bet(self.big_blind)
-        self.pot_manager.add_bet(sb_player.user_id, sb_actual)
-        self.pot_manager.add_bet(bb_player.user_id, bb_actual)
+        self.sb_seat, self.bb_seat = sb_player.seat, bb_player.seat
+        self._bet(sb_player, self.small_blind)
+        self._bet(bb_player, self.big_blind)
         self.current_bet = self.big_blind
         self.min_raise = self.big_blind
 
         # Set action order (UTG first preflop)
         self._build_action_order(after_bb=True)
-        self._action_index = 0
-        self._players_acted.clear()
-        self._set_current_player()
+        self._start_betting_round()
 
         await self._broadcast_state()
 
@@ -147,8 +207,11 @@ class GameEngine:
         result = self._apply_action(player, action)
         if "error" in result:
             return result
+        self.last_action = result
 
-        self._players_acted.add(player.user_id)
+        if player.user_id not in self._players_acted:
+            self._players_acted.add(player.user_id)
+            self._pending_to_act -= 1
 
         # Check if betting round is over
         if self._is_round_over():
@@ -160,49 +223,47 @@ class GameEngine:
         return result
 
     def get_state(self, for_user_id: int | None = None) -> dict:
-        """Get current game state. Cards hidden unless showdown or own cards."""
-        is_showdown = self.street == Street.SHOWDOWN
-
-        players_data = []
-        for p in sorted(self.players.values(), key=lambda x: x.seat):
-            reveal = is_showdown or (for_user_id and p.user_id == for_user_id)
-            players_data.append(p.to_dict(reveal=reveal))
+        """
+        Public table state, shared by every viewer: hole cards are only shown
+        at showdown. With for_user_id, that player's private overlay is added.
+        """
+        if for_user_id is not None:
+            return {**self.get_state(), **self.get_private_state(for_user_id)}
 
-        # Resolve SB/BB seats from blind players
-        sb_seat: int | None = None
-        bb_seat: int | None = None
-        if self.hand_in_progress:
-            try:
-                sb_p, bb_p = self._get_blind_players()
-                sb_seat = sb_p.seat
-                bb_seat = bb_p.seat
-            except Exception:
-                pass
-
-        dealer_player = next(
-            (p for p in self.players.values() if p.seat == self.dealer_seat), None
-        )
+        is_showdown = self.street == Street.SHOWDOWN
+        players_data = [p.to_dict(reveal=is_showdown) for p in self.seats if p is not None]
 
         return {
             "table_id": self.table_id,
             "street": self.street.value,
-            "community_cards": [c.to_dict() for c in self.community_cards],
-            "pot": self.pot_manager.total,
+            "community_cards": cards_to_dicts(self.community_cards),
+            "pot": to_float(self.pot_manager.total),
             "pots": self.pot_manager.get_pots_display(),
-            "current_bet": self.current_bet,
+            "current_bet": to_float(self.current_bet),
             "current_player": self.current_player_id,
             "players": players_data,
             "hand_in_progress": self.hand_in_progress,
             "turn_timeout": self.turn_timeout,
             "turn_deadline": self._turn_deadline,
+            "equities": self.equities,
+            "last_action": self.last_action,
             # Dealer / blind indicators for frontend
             "dealer_seat": self.dealer_seat,
-            "sb_seat": sb_seat,
-            "bb_seat": bb_seat,
+            "sb_seat": self.sb_seat if self.hand_in_progress else None,
+            "bb_seat": self.bb_seat if self.hand_in_progress else None,
         }
 
+    def get_private_state(self, user_id: int) -> dict:
+        """Per-viewer overlay on the public state: own hole cards and made hand."""
+        private = {"your_user_id": user_id}
+        player = self.players.get(user_id)
+        if player and player.hole_cards:
+            private["your_cards"] = cards_to_dicts(player.hole_cards)
+            private["your_hand"] = player.hand.description
+        return private
+
     def get_valid_actions(self, user_id: int) -> list[dict]:
-        """Return valid actions for a player."""
+        """Return valid actions for a player (amounts as client-facing floats)."""
         if user_id != self.current_player_id:
             return []
 
@@ -217,7 +278,7 @@ class GameEngine:
             actions.append({"action": ActionType.CHECK.value})
         else:
             call_amount = min(to_call, player.stack)
-            actions.append({"action": ActionType.CALL.value, "amount": call_amount})
+            actions.append({"action": ActionType.CALL.value, "amount": to_float(call_amount)})
 
         # Can raise if has more than call amount
         if player.stack > to_call:
@@ -225,13 +286,13 @@ class GameEngine:
             max_raise_to = player.current_bet + player.stack
             actions.append({
                 "action": ActionType.RAISE.value,
-                "min": min_raise_to,
-                "max": max_raise_to,
+                "min": to_float(min_raise_to),
+                "max": to_float(max_raise_to),
             })
 
         # All-in is always available
         if player.stack > 0:
-            actions.append({"action": ActionType.ALL_IN.value, "amount": player.stack})
+            actions.append({"action": ActionType.ALL_IN.value, "amount": to_float(player.stack)})
 
         return actions
 
@@ -240,6 +301,8 @@ class GameEngine:
     def _apply_action(self, player: PlayerState, action: GameAction) -> dict:
         if action.action == ActionType.FOLD:
             player.fold()
+            self._active_count -= 1
+            self._folded_count += 1
             return {"action": "fold", "user_id": player.user_id}
 
         elif action.action == ActionType.CHECK:
@@ -249,77 +312,90 @@ class GameEngine:
 
         elif action.action == ActionType.CALL:
             to_call = self.current_bet - player.current_bet
-            actual = player.bet(to_call)
-            self.pot_manager.add_bet(player.user_id, actual)
-            return {"action": "call", "user_id": player.user_id, "amount": actual}
+            actual = self._bet(player, to_call)
+            return {"action": "call", "user_id": player.user_id, "amount": to_float(actual)}
 
         elif action.action == ActionType.RAISE:
             raise_to = action.amount
             if raise_to < self.current_bet + self.min_raise:
                 # Allow if it's an all-in
                 if raise_to != player.current_bet + player.stack:
-                    return {"error": f"Minimum raise to {self.current_bet + self.min_raise}"}
+                    return {"error": f"Minimum raise to {to_float(self.current_bet + self.min_raise)}"}
 
             raise_by = raise_to - self.current_bet
             if raise_by > self.min_raise:
                 self.min_raise = raise_by
 
             to_put = raise_to - player.current_bet
-            actual = player.bet(to_put)
-            self.pot_manager.add_bet(player.user_id, actual)
+            actual = self._bet(player, to_put)
             self.current_bet = player.current_bet
+            self._reopen_action(player)
 
-            # Reset acted players (everyone needs to act again)
-            self._players_acted = {player.user_id}
-
-            return {"action": "raise", "user_id": player.user_id, "amount": actual, "raise_to": self.current_bet}
+            return {
+                "action": "raise", "user_id": player.user_id,
+                "amount": to_float(actual), "raise_to": to_float(self.current_bet),
+            }
 
         elif action.action == ActionType.ALL_IN:
-            remaining = player.stack
-            actual = player.bet(remaining)
-            self.pot_manager.add_bet(player.user_id, actual)
+            actual = self._bet(player, player.stack)
 
             if player.current_bet > self.current_bet:
                 raise_by = player.current_bet - self.current_bet
                 if raise_by > self.min_raise:
                     self.min_raise = raise_by
                 self.current_bet = player.current_bet
-                self._players_acted = {player.user_id}
+                self._reopen_action(player)
 
-            return {"action": "all_in", "user_id": player.user_id, "amount": actual}
+            return {"action": "all_in", "user_id": player.user_id, "amount": to_float(actual)}
 
         return {"error": "Invalid action"}
 
+    def _bet(self, player: PlayerState, amount: int) -> int:
+        """Move chips into the pot, counting the player out if it puts them all-in."""
+        was_active = player.status == PlayerStatus.ACTIVE
+        actual = player.bet(amount)
+        self.pot_manager.add_bet(player.user_id, actual)
+        if was_active and player.status == PlayerStatus.ALL_IN:
+            self._active_count -= 1
+            self._all_in_count += 1
+        return actual
+
+    def _reopen_action(self, raiser: PlayerState):
+        """After a raise every other active player has to act again."""
+        self._players_acted = {raiser.user_id}
+        self._pending_to_act = self._active_count - (raiser.status == PlayerStatus.ACTIVE)
+
+    def _start_betting_round(self):
+        self._action_index = 0
+        self._players_acted.clear()
+        self._pending_to_act = self._active_count
+        self._set_current_player()
+
     def _is_round_over(self) -> bool:
         """Betting round ends when all active players have acted and bets are equal."""
-        active = [p for p in self.players.values() if p.status == PlayerStatus.ACTIVE]
-        not_folded = [
-            p for p in self.players.values()
-            if p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
-        ]
-
         # Everyone folded except one
-        if len(not_folded) <= 1:
+        if self._active_count + self._all_in_count <= 1:
             return True
 
         # No active players left (all are all-in or folded)
-        if len(active) == 0:
+        if self._active_count == 0:
             return True
 
-        # All active players must have acted and matched the current bet
-        for p in active:
-            if p.user_id not in self._players_acted:
-                return False
-            if p.current_bet != self.current_bet:
-                return False
+        # Last active player with nothing to call has nobody left to bet against
+        if self._active_count == 1:
+            last = next(p for p in self.seats if p is not None and p.status == PlayerStatus.ACTIVE)
+            if last.current_bet >= self.current_bet:
+                return True
 
-        return True
+        # Every raise re-opens the action, so once all active players have
+        # acted since the last one they have all matched the current bet
+        return self._pending_to_act == 0
 
     async def _end_betting_round(self):
         """Collect bets and advance to next street or showdown."""
         active_ids = [
-            p.user_id for p in self.players.values()
-            if p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
+            p.user_id for p in self.seats
+            if p is not None and p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
         ]
         self.pot_manager.collect_bets(active_ids)
 
@@ -330,17 +406,11 @@ class GameEngine:
         self.min_raise = self.big_blind
 
         # Check if hand should end
-        active_can_act = [p for p in self.players.values() if p.status == PlayerStatus.ACTIVE]
-        not_folded = [
-            p for p in self.players.values()
-            if p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
-        ]
-
-        if len(not_folded) <= 1:
+        if self._active_count + self._all_in_count <= 1:
             await self._end_hand()
             return
 
-        if len(active_can_act) <= 1:
+        if self._active_count <= 1:
             # Run out remaining community cards
             await self._deal_remaining_streets()
             await self._showdown()
@@ -355,40 +425,73 @@ class GameEngine:
         self.street = next_s
         self._deal_community_cards()
         self._build_action_order(after_bb=False)
-        self._action_index = 0
-        self._players_acted.clear()
-        self._set_current_player()
+        self._start_betting_round()
         await self._broadcast_state()
 
     def _deal_community_cards(self):
         if self.street == Street.FLOP:
             self.deck.burn()
-            self.community_cards.extend(self.deck.deal(3))
+            self._add_community_cards(self.deck.deal(3))
         elif self.street in (Street.TURN, Street.RIVER):
             self.deck.burn()
-            self.community_cards.extend(self.deck.deal(1))
+            self._add_community_cards(self.deck.deal(1))
+
+    def _add_community_cards(self, cards: list[Card]):
+        """Put cards on the board and update each live hand's tracker."""
+        self.community_cards.extend(cards)
+        for p in self.players.values():
+            if p.hole_cards:
+                p.hand.add(cards)
 
     async def _deal_remaining_streets(self):
         """Deal remaining community cards when all players are all-in."""
+        await self._broadcast_equities()
         while len(self.community_cards) < 5:
             self.deck.burn()
             if len(self.community_cards) == 0:
-                self.community_cards.extend(self.deck.deal(3))
+                self._add_community_cards(self.deck.deal(3))
             else:
-                self.community_cards.extend(self.deck.deal(1))
+                self._add_community_cards(self.deck.deal(1))
+
+    async def _broadcast_equities(self):
+        """Push all-in equities to clients before the board is run out."""
+        if not self.broadcast:
+            return
+        contenders = [
+            p for p in self.players.values()
+            if p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN) and p.hole_cards
+        ]
+        if len(contenders) < 2:
+            return
+        try:
+            results = await calculate_equity_async(
+                [p.hole_cards for p in contenders], self.community_cards
+            )
+        except Exception as e:
+            logger.error(f"Equity calculation failed for table {self.table_id}: {e}")
+            return
+        self.equities = {p.user_id: r.to_dict() for p, r in zip(contenders, results)}
+        # The run-out and showdown follow in the same command; without a
+        # flush this state would be coalesced away before clients saw it
+        await self._broadcast_state(flush=True)
 
     async def _showdown(self):
         self.street = Street.SHOWDOWN
         not_folded = [
-            p for p in self.players.values()
-            if p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
+            p for p in self.seats
+            if p is not None and p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
         ]
 
-        # Evaluate hands
-        hand_results: dict[int, tuple[HandRank, list[int]]] = {}
-        for p in not_folded:
-            all_cards = p.hole_cards + self.community_cards
-            hand_results[p.user_id] = evaluate_hand(all_cards)
+        # Score every hand once against the shared board
+        board = PreparedBoard(self.community_cards)
+        scores: dict[int, int] = {p.user_id: board.evaluate(p.hole_cards) for p in not_folded}
+
+        # Group players by strength, strongest first; each pot is won by the
+        # first group that has an eligible player
+        by_strength: dict[int, list[int]] = {}
+        for uid, score in scores.items():
+            by_strength.setdefault(score, []).append(uid)
+        ranked = [by_strength[s] for s in sorted(by_strength, reverse=True)]
 
         # Distribute pots
         total_rake = 0
@@ -398,27 +501,29 @@ class GameEngine:
             if pot.amount <= 0:
                 continue
 
-            eligible = [uid for uid in pot.eligible_players if uid in hand_results]
-            if not eligible:
+            eligible = set(pot.eligible_players)
+            pot_winners = []
+            for group in ranked:
+                pot_winners = [uid for uid in group if uid in eligible]
+                if pot_winners:
+                    break
+            if not pot_winners:
                 continue
 
-            # Find best hand among eligible
-            best_hand = max(hand_results[uid] for uid in eligible)
-            pot_winners = [uid for uid in eligible if hand_results[uid] == best_hand]
-
             # Rake
-            rake = pot.amount * (self.rake_percent / 100)
-            distributable = pot.amount - rake
+            rake = rake_for(pot.amount, self._rake_bps)
             total_rake += rake
 
-            share = distributable / len(pot_winners)
-            for uid in pot_winners:
+            # Odd chips go to the winners closest to the left of the button
+            pot_winners.sort(key=self._seat_order_from_button)
+            shares = split_evenly(pot.amount - rake, len(pot_winners))
+            for uid, share in zip(pot_winners, shares):
                 self.players[uid].stack += share
                 winners.append({
                     "user_id": uid,
                     "amount": share,
-                    "hand_rank": hand_results[uid][0].name,
-                    "cards": [c.to_dict() for c in self.players[uid].hole_cards],
+                    "hand_rank": strength_rank(scores[uid]).name,
+                    "cards": cards_to_dicts(self.players[uid].hole_cards),
                 })
 
         self.hand_in_progress = False
@@ -429,16 +534,16 @@ class GameEngine:
     async def _end_hand(self):
         """End hand when only one player remains (everyone else folded)."""
         not_folded = [
-            p for p in self.players.values()
-            if p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
+            p for p in self.seats
+            if p is not None and p.status in (PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
         ]
 
-        rake = 0.0
+        rake = 0
         winners = []
         if len(not_folded) == 1:
             winner = not_folded[0]
             total = self.pot_manager.total
-            rake = total * (self.rake_percent / 100)
+            rake = rake_for(total, self._rake_bps)
             winnings = total - rake
             winner.stack += winnings
             winners = [{"user_id": winner.user_id, "amount": winnings}]
@@ -448,81 +553,50 @@ class GameEngine:
         if self.on_hand_end:
             await self.on_hand_end(self.table_id, rake, winners)
 
+    def _seat_order_from_button(self, user_id: int) -> tuple[bool, int]:
+        """Sort key: seats clockwise starting left of the dealer button."""
+        seat = self.players[user_id].seat
+        return seat <= self.dealer_seat, seat
+
+    def _next_seat(self, seat: int, status: PlayerStatus) -> PlayerState | None:
+        """First player clockwise after `seat` (wrapping to itself) with `status`."""
+        for i in range(1, MAX_SEATS + 1):
+            p = self.seats[(seat + i) % MAX_SEATS]
+            if p is not None and p.status == status:
+                return p
+        return None
+
     def _advance_dealer(self):
-        seats = sorted(p.seat for p in self.players.values() if p.stack > 0)
-        if not seats:
-            return
-        try:
-            idx = seats.index(self.dealer_seat)
-            self.dealer_seat = seats[(idx + 1) % len(seats)]
-        except ValueError:
-            self.dealer_seat = seats[0]
+        # Called right after the reset, so ACTIVE means "has chips"
+        dealer = self._next_seat(self.dealer_seat, PlayerStatus.ACTIVE)
+        if dealer:
+            self.dealer_seat = dealer.seat
 
     def _get_blind_players(self) -> tuple[PlayerState, PlayerState]:
         """Get SB and BB players based on dealer position."""
-        active = sorted(
-            [p for p in self.players.values() if p.stack > 0],
-            key=lambda p: p.seat,
-        )
-        seats = [p.seat for p in active]
-        dealer_idx = 0
-        for i, s in enumerate(seats):
-            if s >= self.dealer_seat:
-                dealer_idx = i
-                break
-
-        n = len(active)
-        if n == 2:
+        dealer = self.seats[self.dealer_seat]
+        if self._active_count == 2:
             # Heads-up: dealer is SB
-            sb_idx = dealer_idx
-            bb_idx = (dealer_idx + 1) % n
+            sb = dealer
         else:
-            sb_idx = (dealer_idx + 1) % n
-            bb_idx = (dealer_idx + 2) % n
-
-        return active[sb_idx], active[bb_idx]
+            sb = self._next_seat(self.dealer_seat, PlayerStatus.ACTIVE)
+        return sb, self._next_seat(sb.seat, PlayerStatus.ACTIVE)
 
     def _build_action_order(self, after_bb: bool):
         """Build the order of action for current street."""
-        active = sorted(
-            [p for p in self.players.values() if p.status == PlayerStatus.ACTIVE],
-            key=lambda p: p.seat,
-        )
-        seats = [p.seat for p in active]
-        user_ids = [p.user_id for p in active]
-
-        if not seats:
-            self._action_order = []
-            return
-
-        if after_bb:
-            # Preflop: start after BB
-            _, bb = self._get_blind_players()
-            try:
-                bb_idx = seats.index(bb.seat)
-                start = (bb_idx + 1) % len(seats)
-            except ValueError:
-                start = 0
-        else:
-            # Post-flop: start after dealer
-            dealer_idx = 0
-            for i, s in enumerate(seats):
-                if s >= self.dealer_seat:
-                    dealer_idx = i
-                    break
-            start = (dealer_idx + 1) % len(seats)
-
+        # Preflop starts after the BB, later streets after the button
+        start = self.bb_seat if after_bb else self.dealer_seat
         order = []
-        for i in range(len(seats)):
-            idx = (start + i) % len(seats)
-            order.append(user_ids[idx])
-
+        for i in range(1, MAX_SEATS + 1):
+            p = self.seats[(start + i) % MAX_SEATS]
+            if p is not None and p.status == PlayerStatus.ACTIVE:
+                order.append(p.user_id)
         self._action_order = order
 
     def _set_current_player(self):
         if self._action_index < len(self._action_order):
             self.current_player_id = self._action_order[self._action_index]
-            self._turn_deadline = time.time() + self.turn_timeout
+            self._turn_deadline = self.clock() + self.turn_timeout
         else:
             self.current_player_id = None
 
@@ -534,7 +608,7 @@ class GameEngine:
             player = self.players.get(uid)
             if player and player.can_act:
                 self.current_player_id = uid
-                self._turn_deadline = time.time() + self.turn_timeout
+                self._turn_deadline = self.clock() + self.turn_timeout
                 return
 
         self.current_player_id = None
@@ -544,6 +618,12 @@ class GameEngine:
         if self.current_player_id == user_id:
             await self.process_action(GameAction(user_id=user_id, action=ActionType.FOLD))
 
-    async def _broadcast_state(self):
-        if self.broadcast:
+    async def _broadcast_state(self, flush: bool = False):
+        """Push state to clients. With flush=True the callback must send it
+        at once rather than coalesce it with the states that follow."""
+        if not self.broadcast:
+            return
+        if flush:
+            await self.broadcast(self.table_id, self.get_state(), flush=True)
+        else:
             await self.broadcast(self.table_id, self.get_state())
@@ -0,0 +1,127 @@
+"""
+All-in equity calculator built on the lookup-table hand evaluator.
+
+Given known hole cards for N players and a partial board, returns each
+player's win / tie probability. Board run-outs are enumerated exhaustively
+when there are few of them (turn, flop, small fields) and sampled with a
+seeded Monte Carlo otherwise (preflop). The async entry point runs the work
+in a process pool so it never blocks the event loop.
+"""
+import asyncio
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import combinations
+from math import comb
+
+from app.game.deck import Card, CARD_BIT, hand_mask
+from app.game.hand_evaluator import PreparedBoard
+
+EXHAUSTIVE_LIMIT = 2_000  # enumerate every run-out up to this many boards
+DEFAULT_SAMPLES = 1_000   # Monte Carlo budget above the limit
+
+
+@dataclass
+class PlayerEquity:
+    win: float     # probability of winning outright
+    tie: float     # probability of splitting the pot
+    equity: float  # expected share of the pot (win + split fractions)
+
+    def to_dict(self) -> dict:
+        return {"win": round(self.win, 4), "tie": round(self.tie, 4), "equity": round(self.equity, 4)}
+
+
+def calculate_equity(
+    hole_cards: list[list[Card]],
+    board: list[Card] | None = None,
+    samples: int = DEFAULT_SAMPLES,
+    seed: int | None = None,
+    exhaustive_limit: int = EXHAUSTIVE_LIMIT,
+) -> list[PlayerEquity]:
+    """
+    Compute equities for each hand in `hole_cards` (same order).
+    Monte Carlo is seeded with `seed`, or with the dead-card mask when omitted,
+    so the same spot always reports the same numbers.
+    """
+    board = list(board or [])
+    if len(hole_cards) < 2:
+        raise ValueError("Need at least 2 players")
+    if any(len(h) != 2 for h in hole_cards):
+        raise ValueError("Each player needs exactly 2 hole cards")
+    if len(board) > 5:
+        raise ValueError("Board has at most 5 cards")
+
+    known = board + [c for h in hole_cards for c in h]
+    dead = hand_mask(known)
+    if dead.bit_count() != len(known):
+        raise ValueError("Duplicate cards")
+
+    live = [c for c in range(52) if not dead & CARD_BIT[c]]
+    missing = 5 - len(board)
+    total = comb(len(live), missing)
+
+    if total <= exhaustive_limit:
+        runouts = combinations(live, missing)
+    else:
+        rng = random.Random(dead if seed is None else seed)
+        total = samples
+        runouts = (rng.sample(live, missing) for _ in range(samples))
+
+    n = len(hole_cards)
+    wins = [0] * n
+    ties = [0] * n
+    shares = [0.0] * n
+
+    for runout in runouts:
+        prepared = PreparedBoard(board + list(runout))
+        scores = [prepared.evaluate(h) for h in hole_cards]
+        best = max(scores)
+        winners = [i for i, s in enumerate(scores) if s == best]
+        if len(winners) == 1:
+            wins[winners[0]] += 1
+            shares[winners[0]] += 1
+        else:
+            split = 1 / len(winners)
+            for i in winners:
+                ties[i] += 1
+                shares[i] += split
+
+    return [
+        PlayerEquity(win=wins[i] / total, tie=ties[i] / total, equity=shares[i] / total)
+        for i in range(n)
+    ]
+
+
+# ── Process pool ──
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _pool
+
+
+async def calculate_equity_async(
+    hole_cards: list[list[Card]],
+    board: list[Card] | None = None,
+    samples: int = DEFAULT_SAMPLES,
+    seed: int | None = None,
+) -> list[PlayerEquity]:
+    """`calculate_equity` in the shared process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_pool(),
+        partial(calculate_equity, hole_cards, board, samples=samples, seed=seed),
+    )
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,7 +1,21 @@
-"""Texas Hold'em hand evaluator. Evaluates best 5-card hand from 7 cards."""
-from itertools import combinations
+"""
+Texas Hold'em hand evaluator. Evaluates the best 5-card hand from 5-7 cards.
+
+Hands are scored through precomputed lookup tables built once at import:
+  - a flush table indexed by the 13-bit rank mask of a single suit
+  - a rank table keyed by the rank multiset (base-5 digit per rank count)
+
+Both tables hold one packed integer strength: the HandRank in the high bits
+followed by up to five 4-bit kickers. A bigger integer is always a better hand,
+so strengths compare directly. `evaluate_hand` keeps the historic
+(HandRank, kickers) result by decoding the packed value.
+
+`evaluate_batch` scores NumPy arrays of card ids with the same tables for
+offline analytics; NumPy is only imported when it is called.
+"""
 from enum import IntEnum
-from app.game.deck import Card, Rank
+from functools import lru_cache
+from app.game.deck import Card, CARD_RANK
 
 
 class HandRank(IntEnum):
@@ -17,88 +31,338 @@ class HandRank(IntEnum):
     ROYAL_FLUSH = 9
 
 
-def evaluate_hand(cards: list[Card]) -> tuple[HandRank, list[int]]:
+# Number of significant kickers stored for each category
+_KICKER_COUNT = {
+    HandRank.HIGH_CARD: 5,
+    HandRank.ONE_PAIR: 4,
+    HandRank.TWO_PAIR: 3,
+    HandRank.THREE_OF_A_KIND: 3,
+    HandRank.STRAIGHT: 1,
+    HandRank.FLUSH: 5,
+    HandRank.FULL_HOUSE: 2,
+    HandRank.FOUR_OF_A_KIND: 2,
+    HandRank.STRAIGHT_FLUSH: 1,
+    HandRank.ROYAL_FLUSH: 1,
+}
+
+CATEGORY_SHIFT = 20  # 5 kickers x 4 bits
+
+HAND_NAMES = {
+    HandRank.HIGH_CARD: "High Card",
+    HandRank.ONE_PAIR: "One Pair",
+    HandRank.TWO_PAIR: "Two Pair",
+    HandRank.THREE_OF_A_KIND: "Three of a Kind",
+    HandRank.STRAIGHT: "Straight",
+    HandRank.FLUSH: "Flush",
+    HandRank.FULL_HOUSE: "Full House",
+    HandRank.FOUR_OF_A_KIND: "Four of a Kind",
+    HandRank.STRAIGHT_FLUSH: "Straight Flush",
+    HandRank.ROYAL_FLUSH: "Royal Flush",
+}
+
+_RANK_NAMES = {
+    2: "Two", 3: "Three", 4: "Four", 5: "Five", 6: "Six", 7: "Seven", 8: "Eight",
+    9: "Nine", 10: "Ten", 11: "Jack", 12: "Queen", 13: "King", 14: "Ace",
+}
+_RANK_PLURALS = {r: ("Sixes" if r == 6 else f"{name}s") for r, name in _RANK_NAMES.items()}
+
+# Rank index 0..12 (deuce..ace) -> base-5 digit weight for the multiset key
+_RANK_KEY = [5 ** i for i in range(13)]
+_WHEEL_MASK = (1 << 12) | 0b1111  # A-2-3-4-5
+
+# Per card id: multiset key contribution and bit within its suit's rank mask
+_CARD_KEY = [_RANK_KEY[CARD_RANK[c] - 2] for c in range(52)]
+_CARD_RANK_BIT = [1 << (CARD_RANK[c] - 2) for c in range(52)]
+
+
+def _pack(rank: HandRank, kickers: list[int]) -> int:
+    value = int(rank)
+    for i in range(5):
+        value = (value << 4) | (kickers[i] if i < len(kickers) else 0)
+    return value
+
+
+def _straight_high(mask: int) -> int:
+    """Highest straight (as rank value 5..14) contained in a 13-bit rank mask, or 0."""
+    for top in range(12, 3, -1):
+        window = 0b11111 << (top - 4)
+        if mask & window == window:
+            return top + 2
+    if mask & _WHEEL_MASK == _WHEEL_MASK:
+        return 5
+    return 0
+
+
+def _top_ranks(mask: int, n: int) -> list[int]:
+    out = []
+    for i in range(12, -1, -1):
+        if mask >> i & 1:
+            out.append(i + 2)
+            if len(out) == n:
+                break
+    return out
+
+
+def _build_flush_table() -> list[int]:
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if mask.bit_count() < 5:
+            continue
+        high = _straight_high(mask)
+        if high == 14:
+            table[mask] = _pack(HandRank.ROYAL_FLUSH, [14])
+        elif high:
+            table[mask] = _pack(HandRank.STRAIGHT_FLUSH, [high])
+        else:
+            table[mask] = _pack(HandRank.FLUSH, _top_ranks(mask, 5))
+    return table
+
+
+def _score_counts(counts: list[int]) -> int:
+    """Best non-flush strength for a rank-count vector (index 0 = deuce)."""
+    quads, trips, pairs, present = [], [], [], 0
+    for i in range(12, -1, -1):
+        c = counts[i]
+        if c:
+            present |= 1 << i
+            if c == 4:
+                quads.append(i + 2)
+            elif c == 3:
+                trips.append(i + 2)
+            elif c == 2:
+                pairs.append(i + 2)
+
+    def best_other(exclude: set[int], n: int) -> list[int]:
+        return [r for r in _top_ranks(present, 7) if r not in exclude][:n]
+
+    if quads:
+        return _pack(HandRank.FOUR_OF_A_KIND, [quads[0]] + best_other({quads[0]}, 1))
+    if trips and (len(trips) > 1 or pairs):
+        second = max(trips[1] if len(trips) > 1 else 0, pairs[0] if pairs else 0)
+        return _pack(HandRank.FULL_HOUSE, [trips[0], second])
+    high = _straight_high(present)
+    if high:
+        return _pack(HandRank.STRAIGHT, [high])
+    if trips:
+        return _pack(HandRank.THREE_OF_A_KIND, [trips[0]] + best_other({trips[0]}, 2))
+    if len(pairs) >= 2:
+        return _pack(HandRank.TWO_PAIR, pairs[:2] + best_other(set(pairs[:2]), 1))
+    if pairs:
+        return _pack(HandRank.ONE_PAIR, [pairs[0]] + best_other({pairs[0]}, 3))
+    return _pack(HandRank.HIGH_CARD, _top_ranks(present, 5))
+
+
+def _build_rank_table() -> dict[int, int]:
+    """All rank multisets of 1 to 7 cards (at most 4 of a rank).
+
+    Partial hands (fewer than 5 cards) are only used by HandTracker before
+    the flop; `evaluate_strength` still requires 5 to 7 cards.
     """
-    Evaluate the best 5-card hand from a list of 5-7 cards.
-    Returns (HandRank, kickers) where kickers is used for tie-breaking.
-    Higher kicker values = better hand.
+    table: dict[int, int] = {}
+    counts = [0] * 13
+
+    def fill(rank: int, left: int, key: int, total: int):
+        if rank == 13:
+            if total:
+                table[key] = _score_counts(counts)
+            return
+        for c in range(min(4, left) + 1):
+            counts[rank] = c
+            fill(rank + 1, left - c, key + c * _RANK_KEY[rank], total + c)
+        counts[rank] = 0
+
+    fill(0, 7, 0, 0)
+    return table
+
+
+_FLUSH_TABLE = _build_flush_table()
+_RANK_TABLE = _build_rank_table()
+
+
+def evaluate_strength(cards: list[Card]) -> int:
+    """
+    Score 5-7 cards as a single integer. Higher value = better hand.
+    Use `decode_strength` to get back (HandRank, kickers).
+    """
+    if not 5 <= len(cards) <= 7:
+        raise ValueError("Need 5 to 7 cards")
+
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    for c in cards:
+        key += _CARD_KEY[c]
+        suit_masks[c & 3] |= _CARD_RANK_BIT[c]
+
+    best = _RANK_TABLE[key]
+    for mask in suit_masks:
+        flush = _FLUSH_TABLE[mask]
+        if flush > best:
+            best = flush
+    return best
+
+
+class PreparedBoard:
+    """
+    Community cards folded into the evaluator's key and suit masks once, so
+    each player's hand is scored by adding only their hole cards. Used at
+    showdown and for equity run-outs, where many hands share one board.
+    """
+
+    __slots__ = ("size", "key", "suit_masks", "flush_suits")
+
+    def __init__(self, board: list[Card], hole_size: int = 2):
+        self.size = len(board)
+        self.key = 0
+        self.suit_masks = [0, 0, 0, 0]
+        for c in board:
+            self.key += _CARD_KEY[c]
+            self.suit_masks[c & 3] |= _CARD_RANK_BIT[c]
+        # Only suits that can still reach five cards need a flush lookup
+        self.flush_suits = [
+            s for s in range(4) if self.suit_masks[s].bit_count() + hole_size >= 5
+        ]
+
+    def evaluate(self, hole_cards: list[Card]) -> int:
+        """Strength of hole cards + board, same scale as `evaluate_strength`."""
+        if not 5 <= self.size + len(hole_cards) <= 7:
+            raise ValueError("Need 5 to 7 cards")
+
+        key = self.key
+        for c in hole_cards:
+            key += _CARD_KEY[c]
+        best = _RANK_TABLE[key]
+
+        for suit in self.flush_suits:
+            mask = self.suit_masks[suit]
+            for c in hole_cards:
+                if c & 3 == suit:
+                    mask |= _CARD_RANK_BIT[c]
+            flush = _FLUSH_TABLE[mask]
+            if flush > best:
+                best = flush
+        return best
+
+
+class HandTracker:
     """
-    if len(cards) < 5:
-        raise ValueError("Need at least 5 cards")
+    Running rank/suit counters for one player's hole cards plus the board
+    dealt so far. Cards are added as they are dealt and the strength and
+    description are cached, so reading the current made hand is O(1).
+    """
+
+    __slots__ = ("key", "suit_masks", "count", "strength", "description")
 
-    best_rank = HandRank.HIGH_CARD
-    best_kickers: list[int] = []
+    def __init__(self, cards: list[Card] | None = None):
+        self.reset(cards)
 
-    for combo in combinations(cards, 5):
-        hand_rank, kickers = _evaluate_five(list(combo))
-        if (hand_rank, kickers) > (best_rank, best_kickers):
-            best_rank = hand_rank
-            best_kickers = kickers
+    def reset(self, cards: list[Card] | None = None):
+        self.key = 0
+        self.suit_masks = [0, 0, 0, 0]
+        self.count = 0
+        self.strength = 0
+        self.description = ""
+        if cards:
+            self.add(cards)
 
-    return best_rank, best_kickers
+    def add(self, cards: list[Card]):
+        if self.count + len(cards) > 7:
+            raise ValueError("A hand has at most 7 cards")
+        for c in cards:
+            self.key += _CARD_KEY[c]
+            self.suit_masks[c & 3] |= _CARD_RANK_BIT[c]
+        self.count += len(cards)
 
+        best = _RANK_TABLE[self.key]
+        if self.count >= 5:
+            for mask in self.suit_masks:
+                flush = _FLUSH_TABLE[mask]
+                if flush > best:
+                    best = flush
+        self.strength = best
+        self.description = describe_strength(best)
 
-def _evaluate_five(cards: list[Card]) -> tuple[HandRank, list[int]]:
-    """Evaluate exactly 5 cards."""
-    ranks = sorted([c.rank.value for c in cards], reverse=True)
-    suits = [c.suit for c in cards]
 
-    is_flush = len(set(suits)) == 1
-    is_straight, straight_high = _check_straight(ranks)
+_BATCH_CHUNK = 1 << 18  # rows per vectorized pass, bounds temporary memory
 
-    # Count rank occurrences
-    rank_counts: dict[int, int] = {}
-    for r in ranks:
-        rank_counts[r] = rank_counts.get(r, 0) + 1
 
-    counts = sorted(rank_counts.values(), reverse=True)
-    # Sort ranks by count then by rank value (for kicker ordering)
-    sorted_by_count = sorted(rank_counts.keys(), key=lambda r: (rank_counts[r], r), reverse=True)
+@lru_cache()
+def _batch_tables():
+    import numpy as np
 
-    if is_straight and is_flush:
-        if straight_high == Rank.ACE.value:
-            return HandRank.ROYAL_FLUSH, [straight_high]
-        return HandRank.STRAIGHT_FLUSH, [straight_high]
+    keys = sorted(_RANK_TABLE)
+    return (
+        np.array(keys, dtype=np.int64),
+        np.array([_RANK_TABLE[k] for k in keys], dtype=np.int32),
+        np.array(_FLUSH_TABLE, dtype=np.int32),
+        np.array(_CARD_KEY, dtype=np.int64),
+        np.array(_CARD_RANK_BIT, dtype=np.int32),
+    )
 
-    if counts == [4, 1]:
-        return HandRank.FOUR_OF_A_KIND, sorted_by_count
 
-    if counts == [3, 2]:
-        return HandRank.FULL_HOUSE, sorted_by_count
+def evaluate_batch(hands):
+    """
+    Vectorized `evaluate_strength` over an (N, 5..7) integer array of card ids.
+    Returns an int32 array of N strengths. Hands must not contain duplicate cards.
+    """
+    import numpy as np
 
-    if is_flush:
-        return HandRank.FLUSH, ranks
+    hands = np.asarray(hands)
+    if hands.ndim != 2 or not 5 <= hands.shape[1] <= 7:
+        raise ValueError("Expected an (N, 5..7) array of card ids")
+    if hands.size and (hands.min() < 0 or hands.max() > 51):
+        raise ValueError("Card ids must be in 0..51")
 
-    if is_straight:
-        return HandRank.STRAIGHT, [straight_high]
+    keys, values, flush_table, card_key, card_bit = _batch_tables()
+    out = np.empty(len(hands), dtype=np.int32)
 
-    if counts == [3, 1, 1]:
-        return HandRank.THREE_OF_A_KIND, sorted_by_count
+    for start in range(0, len(hands), _BATCH_CHUNK):
+        ids = hands[start:start + _BATCH_CHUNK].astype(np.intp, copy=False)
+        best = values[np.searchsorted(keys, card_key[ids].sum(axis=1))]
+        suits = ids & 3
+        bits = card_bit[ids]
+        for suit in range(4):
+            # Ranks within one suit are distinct, so the sum equals the OR
+            mask = np.where(suits == suit, bits, 0).sum(axis=1)
+            np.maximum(best, flush_table[mask], out=best)
+        out[start:start + len(ids)] = best
 
-    if counts == [2, 2, 1]:
-        return HandRank.TWO_PAIR, sorted_by_count
+    return out
 
-    if counts == [2, 1, 1, 1]:
-        return HandRank.ONE_PAIR, sorted_by_count
 
-    return HandRank.HIGH_CARD, ranks
+def strength_rank(strength: int) -> HandRank:
+    return HandRank(strength >> CATEGORY_SHIFT)
 
 
-def _check_straight(ranks: list[int]) -> tuple[bool, int]:
-    """Check if sorted ranks form a straight. Handle A-2-3-4-5 (wheel)."""
-    unique = sorted(set(ranks), reverse=True)
-    if len(unique) != 5:
-        return False, 0
+def decode_strength(strength: int) -> tuple[HandRank, list[int]]:
+    """Unpack an integer strength into (HandRank, kickers)."""
+    rank = HandRank(strength >> CATEGORY_SHIFT)
+    kickers = [(strength >> (16 - 4 * i)) & 0xF for i in range(_KICKER_COUNT[rank])]
+    return rank, kickers
 
-    # Normal straight
-    if unique[0] - unique[4] == 4:
-        return True, unique[0]
 
-    # Wheel: A-2-3-4-5
-    if unique == [14, 5, 4, 3, 2]:
-        return True, 5  # 5-high straight
+def describe_strength(strength: int) -> str:
+    """Human-readable made hand, e.g. "Two Pair, Kings and Sevens"."""
+    rank, kickers = decode_strength(strength)
+    name = HAND_NAMES[rank]
+    top = kickers[0] if kickers else 0
+    if not top or rank == HandRank.ROYAL_FLUSH:
+        return name
+    if rank == HandRank.TWO_PAIR:
+        return f"{name}, {_RANK_PLURALS[top]} and {_RANK_PLURALS[kickers[1]]}"
+    if rank == HandRank.FULL_HOUSE:
+        return f"{name}, {_RANK_PLURALS[top]} over {_RANK_PLURALS[kickers[1]]}"
+    if rank in (HandRank.ONE_PAIR, HandRank.THREE_OF_A_KIND, HandRank.FOUR_OF_A_KIND):
+        return f"{name}, {_RANK_PLURALS[top]}"
+    return f"{name}, {_RANK_NAMES[top]} High"
 
-    return False, 0
+
+def evaluate_hand(cards: list[Card]) -> tuple[HandRank, list[int]]:
+    """
+    Evaluate the best 5-card hand from a list of 5-7 cards.
+    Returns (HandRank, kickers) where kickers is used for tie-breaking.
+    Higher kicker values = better hand.
+    """
+    return decode_strength(evaluate_strength(cards))
 
 
 def compare_hands(
@@ -0,0 +1,43 @@
+"""
+Chip amounts as exact integers in minor units.
+
+Chips are stored as Numeric(18, 4), so one chip is 10_000 minor units. The
+engine, pots and rake math only ever see ints; amounts are converted at the
+boundaries: to_minor() for DB and request values, to_major() (Decimal) for
+DB writes and to_float() for JSON payloads.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+MINOR_PER_UNIT = 10_000
+_MINOR_EXP = -4  # Decimal exponent matching MINOR_PER_UNIT
+
+
+def to_minor(value: float | int | str | Decimal) -> int:
+    """Convert a chip amount to minor units, rounding half up."""
+    return int((Decimal(str(value)) * MINOR_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_major(minor: int) -> Decimal:
+    """Exact Decimal chip amount for DB columns."""
+    return Decimal(minor).scaleb(_MINOR_EXP)
+
+
+def to_float(minor: int) -> float:
+    """Chip amount for JSON payloads."""
+    return minor / MINOR_PER_UNIT
+
+
+def percent_to_bps(percent: float) -> int:
+    """Rake percent (e.g. 3.0) as integer basis points (300)."""
+    return int((Decimal(str(percent)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def rake_for(amount: int, rake_bps: int) -> int:
+    """Rake taken from a pot, rounded down to the minor unit."""
+    return amount * rake_bps // 10_000
+
+
+def split_evenly(amount: int, ways: int) -> list[int]:
+    """Split into `ways` shares; odd minor units go to the first shares."""
+    share, odd = divmod(amount, ways)
+    return [share + 1 if i < odd else share for i in range(ways)]
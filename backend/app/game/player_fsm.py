@@ -1,7 +1,9 @@
 """Player state within a hand."""
 from dataclasses import dataclass, field
 from enum import Enum
-from app.game.deck import Card
+from app.game.deck import Card, cards_to_dicts
+from app.game.hand_evaluator import HandTracker
+from app.game.money import to_float
 
 
 class PlayerStatus(str, Enum):
@@ -15,11 +17,13 @@ class PlayerStatus(str, Enum):
 class PlayerState:
     user_id: int
     seat: int
-    stack: float
+    stack: int  # minor units, like every amount below
     hole_cards: list[Card] = field(default_factory=list)
     status: PlayerStatus = PlayerStatus.ACTIVE
-    current_bet: float = 0
-    total_bet_this_hand: float = 0
+    current_bet: int = 0
+    total_bet_this_hand: int = 0
+    # Hole cards + board dealt so far, updated incrementally as cards come out
+    hand: HandTracker = field(default_factory=HandTracker)
 
     @property
     def is_active(self) -> bool:
@@ -29,7 +33,7 @@ class PlayerState:
     def can_act(self) -> bool:
         return self.status in (PlayerStatus.ACTIVE,)
 
-    def bet(self, amount: float) -> float:
+    def bet(self, amount: int) -> int:
         """Place a bet. Returns actual amount bet (may be less if all-in)."""
         actual = min(amount, self.stack)
         self.stack -= actual
@@ -39,9 +43,14 @@ class PlayerState:
             self.status = PlayerStatus.ALL_IN
         return actual
 
+    def deal_hole_cards(self, cards: list[Card]):
+        self.hole_cards = cards
+        self.hand.reset(cards)
+
     def fold(self):
         self.status = PlayerStatus.FOLDED
         self.hole_cards = []
+        self.hand.reset()
 
     def reset_for_new_round(self):
         """Reset bet tracking for new betting round (not new hand)."""
@@ -49,7 +58,9 @@ class PlayerState:
 
     def reset_for_new_hand(self):
         self.hole_cards = []
-        self.status = PlayerStatus.ACTIVE
+        self.hand.reset()
+        # Busted players sit the hand out instead of being dealt in as active
+        self.status = PlayerStatus.ACTIVE if self.stack > 0 else PlayerStatus.SITTING_OUT
         self.current_bet = 0
         self.total_bet_this_hand = 0
 
@@ -57,8 +68,9 @@ class PlayerState:
         return {
             "user_id": self.user_id,
             "seat": self.seat,
-            "stack": self.stack,
+            "stack": to_float(self.stack),
             "status": self.status.value,
-            "current_bet": self.current_bet,
-            "cards": [c.to_dict() for c in self.hole_cards] if reveal else [],
+            "current_bet": to_float(self.current_bet),
+            "cards": cards_to_dicts(self.hole_cards) if reveal else [],
+            "hand": self.hand.description if reveal else None,
         }
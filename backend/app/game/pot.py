@@ -1,23 +1,28 @@
-"""Pot management with side pot calculation for all-in scenarios."""
+"""Pot management with side pot calculation for all-in scenarios.
+
+Amounts are ints in minor units (see app.game.money).
+"""
 from dataclasses import dataclass, field
 
+from app.game.money import to_float
+
 
 @dataclass
 class Pot:
-    amount: float = 0
-    eligible_players: list[int] = field(default_factory=list)  # user_ids
+    amount: int = 0
+    eligible_players: frozenset[int] = field(default_factory=frozenset)  # user_ids
 
 
 class PotManager:
     def __init__(self):
-        self.pots: list[Pot] = [Pot()]
-        self._player_bets: dict[int, float] = {}  # user_id -> total bet this round
+        self.pots: list[Pot] = []
+        self._player_bets: dict[int, int] = {}  # user_id -> total bet this round
 
     @property
-    def total(self) -> float:
+    def total(self) -> int:
         return sum(p.amount for p in self.pots)
 
-    def add_bet(self, user_id: int, amount: float):
+    def add_bet(self, user_id: int, amount: int):
         """Track a bet from a player."""
         self._player_bets[user_id] = self._player_bets.get(user_id, 0) + amount
 
@@ -25,57 +30,57 @@ class PotManager:
         """
         Called at end of betting round. Distributes bets into main pot and side pots.
         Handles all-in players who bet less than others.
+
+        Bets are sorted once and swept from the highest level down, growing
+        the eligible set as it goes. Pots with the same eligible players,
+        from this street or earlier ones, are merged into one.
         """
         if not self._player_bets:
             return
 
-        # Sort players by their bet amount
-        sorted_bets = sorted(self._player_bets.items(), key=lambda x: x[1])
-
-        remaining_bets = dict(self._player_bets)
-        prev_level = 0
-
-        new_pots: list[Pot] = []
-
-        for user_id, bet_amount in sorted_bets:
-            level = bet_amount
-            if level <= prev_level:
-                continue
-
-            diff = level - prev_level
-            pot = Pot()
-
-            for pid, pbet in remaining_bets.items():
-                contribution = min(pbet, diff)
-                pot.amount += contribution
-                remaining_bets[pid] = pbet - contribution
-
-            # All players who bet at least this level are eligible
-            pot.eligible_players = [
-                pid for pid, orig_bet in self._player_bets.items()
-                if orig_bet >= level and pid in active_player_ids
-            ]
-
-            if pot.amount > 0:
-                new_pots.append(pot)
-
-            prev_level = level
-
-        # Merge into existing pots
-        if new_pots:
-            # Add to main pot first
-            if self.pots and self.pots[-1].amount == 0:
-                self.pots.pop()
-            self.pots.extend(new_pots)
+        active = frozenset(active_player_ids)
+        bets = sorted(self._player_bets.items(), key=lambda x: x[1], reverse=True)
+
+        # (eligible, amount) per bet level, highest level first
+        layers: list[tuple[frozenset[int], int]] = []
+        eligible: set[int] = set()
+        i = 0
+        while i < len(bets):
+            level = bets[i][1]
+            # Everyone who bet exactly this level joins the eligible set
+            while i < len(bets) and bets[i][1] == level:
+                if bets[i][0] in active:
+                    eligible.add(bets[i][0])
+                i += 1
+            lower = bets[i][1] if i < len(bets) else 0
+            # The first i players all put in at least `level`
+            amount = (level - lower) * i
+            if amount > 0:
+                layers.append((frozenset(eligible), amount))
+
+        # Folded players can no longer win earlier pots either
+        for pot in self.pots:
+            pot.eligible_players = pot.eligible_players & active
+
+        merged: dict[frozenset[int], Pot] = {}
+        pots: list[Pot] = []
+        for pot in self.pots + [Pot(amount, elig) for elig, amount in reversed(layers)]:
+            existing = merged.get(pot.eligible_players)
+            if existing is None:
+                merged[pot.eligible_players] = pot
+                pots.append(pot)
+            else:
+                existing.amount += pot.amount
+        self.pots = [p for p in pots if p.amount > 0]
 
         self._player_bets.clear()
 
     def get_pots_display(self) -> list[dict]:
         return [
-            {"amount": p.amount, "eligible": p.eligible_players}
+            {"amount": to_float(p.amount), "eligible": sorted(p.eligible_players)}
             for p in self.pots if p.amount > 0
         ]
 
     def reset(self):
-        self.pots = [Pot()]
+        self.pots = []
         self._player_bets.clear()
@@ -0,0 +1,75 @@
+"""
+Randomness sources for deck shuffles.
+
+Each GameEngine owns its own source:
+  - SecureRng: CSPRNG for real-money tables. Reads os.urandom in large
+    buffered chunks so a shuffle does not cost a syscall per card.
+  - SeededRng: reproducible stream for simulations, replays and load tests.
+"""
+import os
+import random
+from abc import ABC, abstractmethod
+
+DEFAULT_BUFFER_SIZE = 4096  # bytes of entropy fetched per os.urandom call
+
+
+class DeckRng(ABC):
+    """Source of uniform integers in [0, n)."""
+
+    @abstractmethod
+    def randbelow(self, n: int) -> int:
+        ...
+
+
+class SecureRng(DeckRng):
+    """os.urandom-backed CSPRNG with an internal byte buffer.
+
+    Values are drawn by rejection sampling, so they are unbiased for any n.
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self._buffer_size = buffer_size
+        self._buf = b""
+        self._pos = 0
+
+    def _take(self, count: int) -> bytes:
+        if self._pos + count > len(self._buf):
+            self._buf = os.urandom(max(self._buffer_size, count))
+            self._pos = 0
+        chunk = self._buf[self._pos:self._pos + count]
+        self._pos += count
+        return chunk
+
+    def randbelow(self, n: int) -> int:
+        if n <= 0:
+            raise ValueError("n must be positive")
+        if n <= 256:
+            # Fast path for deck sizes: one byte per attempt
+            limit = 256 - 256 % n
+            while True:
+                if self._pos >= len(self._buf):
+                    self._buf = os.urandom(self._buffer_size)
+                    self._pos = 0
+                b = self._buf[self._pos]
+                self._pos += 1
+                if b < limit:
+                    return b % n
+
+        nbytes = (n.bit_length() + 7) // 8
+        space = 1 << (8 * nbytes)
+        limit = space - space % n
+        while True:
+            value = int.from_bytes(self._take(nbytes), "big")
+            if value < limit:
+                return value % n
+
+
+class SeededRng(DeckRng):
+    """Deterministic stream: the same seed always deals the same decks."""
+
+    def __init__(self, seed: int | str | bytes | None = None):
+        self.seed = seed
+        self._random = random.Random(seed)
+
+    def randbelow(self, n: int) -> int:
+        return self._random.randrange(n)
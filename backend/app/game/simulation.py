@@ -0,0 +1,242 @@
+"""
+Headless GameEngine simulation for load and correctness testing.
+
+Drives the real start_hand / process_action / handle_timeout code paths with
+no broadcasts, no DB and no wall clock: bots pick from get_valid_actions,
+decks are seeded and time comes from a manual clock. After every action the
+harness checks engine invariants (chip conservation, valid turn order,
+non-negative stacks) and records any violation in the report.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from app.game.engine import GameEngine, GameAction, ActionType
+from app.game.money import to_minor, to_float
+from app.game.player_fsm import PlayerStatus
+from app.game.rng import SeededRng
+
+# (engine, user_id, valid actions, rng) -> action, or None to let the turn time out
+BotPolicy = Callable[[GameEngine, int, list[dict], random.Random], GameAction | None]
+
+MAX_ACTIONS_PER_HAND = 1_000
+
+
+def _pick(user_id: int, option: dict, amount: float | None = None) -> GameAction:
+    if amount is None:
+        amount = option.get("amount", 0)
+    return GameAction(user_id=user_id, action=ActionType(option["action"]), amount=to_minor(amount))
+
+
+def passive_policy(engine, user_id, actions, rng) -> GameAction:
+    """Check when possible, otherwise call."""
+    by_type = {a["action"]: a for a in actions}
+    option = by_type.get("check") or by_type.get("call") or by_type["fold"]
+    return _pick(user_id, option)
+
+
+def random_policy(engine, user_id, actions, rng) -> GameAction:
+    """Mostly check/call, sometimes fold, min-raise or shove."""
+    weights = {"fold": 1.0, "check": 6.0, "call": 6.0, "raise": 1.5, "all_in": 0.1}
+    option = rng.choices(actions, [weights[a["action"]] for a in actions])[0]
+    if option["action"] == "raise":
+        low, high = option["min"], option["max"]
+        amount = high if low >= high else (rng.uniform(low, high) if rng.random() < 0.1 else low)
+        return _pick(user_id, option, amount)
+    return _pick(user_id, option)
+
+
+def aggressive_policy(engine, user_id, actions, rng) -> GameAction:
+    """Raise whenever allowed, shove a tenth of the time."""
+    by_type = {a["action"]: a for a in actions}
+    if "all_in" in by_type and rng.random() < 0.1:
+        return _pick(user_id, by_type["all_in"])
+    if "raise" in by_type:
+        option = by_type["raise"]
+        return _pick(user_id, option, min(option["min"], option["max"]))
+    return _pick(user_id, by_type.get("call") or by_type.get("check") or by_type["fold"])
+
+
+def timeout_policy(rate: float, inner: BotPolicy = random_policy) -> BotPolicy:
+    """Wrap a policy so a fraction of turns time out (auto-fold)."""
+    def policy(engine, user_id, actions, rng):
+        if rng.random() < rate:
+            return None
+        return inner(engine, user_id, actions, rng)
+    return policy
+
+
+class ManualClock:
+    """Deterministic clock the harness advances by hand."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@dataclass
+class SimulationReport:
+    hands: int = 0
+    actions: int = 0
+    timeouts: int = 0
+    showdowns: int = 0
+    rebuys: int = 0
+    rake: int = 0  # minor units
+    elapsed: float = 0.0
+    violations: list[str] = field(default_factory=list)
+
+    @property
+    def hands_per_sec(self) -> float:
+        return self.hands / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hands:,} hands, {self.actions:,} actions, {self.timeouts:,} timeouts, "
+            f"{self.showdowns:,} showdowns in {self.elapsed:.2f}s "
+            f"({self.hands_per_sec:,.0f} hands/sec), rake {to_float(self.rake):,.2f}, "
+            f"violations: {len(self.violations)}"
+        )
+
+
+class Simulator:
+    """Plays hands on one GameEngine with bot players, checking invariants."""
+
+    def __init__(
+        self,
+        players: int = 6,
+        stack: float = 200,
+        small_blind: float = 1,
+        big_blind: float = 2,
+        rake_percent: float = 3.0,
+        policies: list[BotPolicy] | None = None,
+        seed: int = 0,
+        rebuy: bool = True,
+    ):
+        self.rng = random.Random(seed)
+        self.clock = ManualClock()
+        self.stack = to_minor(stack)
+        self.rebuy = rebuy
+        self.report = SimulationReport()
+        self.engine = GameEngine(
+            table_id=0,
+            small_blind=to_minor(small_blind),
+            big_blind=to_minor(big_blind),
+            rake_percent=rake_percent,
+            on_hand_end=self._on_hand_end,
+            rng=SeededRng(seed),
+            clock=self.clock,
+        )
+        policies = policies or [random_policy]
+        self.policies: dict[int, BotPolicy] = {}
+        for i in range(players):
+            user_id = i + 1
+            self.policies[user_id] = policies[i % len(policies)]
+            self.engine.add_player(user_id, seat=i, stack=self.stack)
+        self._seats = {uid: p.seat for uid, p in self.engine.players.items()}
+        self._bankroll = self.stack * players  # chips that must exist: stacks + rake
+        self._hand_over = False
+
+    async def _on_hand_end(self, table_id: int, rake: int, winners: list[dict]):
+        self.report.rake += rake
+        self._hand_over = True
+        if any("hand_rank" in w for w in winners):
+            self.report.showdowns += 1
+
+    def _violation(self, message: str):
+        self.report.violations.append(f"hand {self.report.hands}: {message}")
+
+    def _check_chips(self, hand_start_total: int):
+        engine = self.engine
+        in_front = sum(p.total_bet_this_hand for p in engine.players.values()) if engine.hand_in_progress else 0
+        total = sum(p.stack for p in engine.players.values()) + in_front
+        if engine.hand_in_progress and total != hand_start_total:
+            self._violation(f"chips not conserved mid-hand: {total} != {hand_start_total}")
+        if any(p.stack < 0 for p in engine.players.values()):
+            self._violation("negative stack")
+
+    def _check_counters(self):
+        engine = self.engine
+        if not engine.hand_in_progress:
+            return
+        statuses = [p.status for p in engine.players.values()]
+        counts = (
+            statuses.count(PlayerStatus.ACTIVE),
+            statuses.count(PlayerStatus.ALL_IN),
+            statuses.count(PlayerStatus.FOLDED),
+        )
+        tracked = (engine._active_count, engine._all_in_count, engine._folded_count)
+        if counts != tracked:
+            self._violation(f"status counters {tracked} != actual {counts}")
+
+    async def _reseat(self):
+        """Remove busted players (as the DB sync does) and optionally rebuy them."""
+        for uid, player in list(self.engine.players.items()):
+            if player.stack <= 0:
+                await self.engine.remove_player(uid)
+                if self.rebuy:
+                    self.engine.add_player(uid, seat=self._seats[uid], stack=self.stack)
+                    self._bankroll += self.stack
+                    self.report.rebuys += 1
+
+    async def _play_hand(self):
+        engine = self.engine
+        self._hand_over = False
+        hand_start_total = sum(p.stack for p in engine.players.values())
+        await engine.start_hand()
+        if not engine.hand_in_progress:
+            return False
+
+        for _ in range(MAX_ACTIONS_PER_HAND):
+            if not engine.hand_in_progress:
+                break
+            user_id = engine.current_player_id
+            player = engine.players.get(user_id) if user_id is not None else None
+            if player is None or not player.can_act:
+                self._violation(f"current player {user_id} cannot act")
+                return False
+
+            actions = engine.get_valid_actions(user_id)
+            action = self.policies[user_id](engine, user_id, actions, self.rng)
+            self.clock.advance(1.0)
+            if action is None:
+                self.clock.now = engine.turn_deadline
+                await engine.handle_timeout(user_id)
+                self.report.timeouts += 1
+            else:
+                result = await engine.process_action(action)
+                if "error" in result:
+                    self._violation(f"valid action rejected: {action} -> {result['error']}")
+                    return False
+            self.report.actions += 1
+            self._check_chips(hand_start_total)
+            self._check_counters()
+        else:
+            self._violation("hand did not finish")
+            return False
+
+        if not self._hand_over:
+            self._violation("hand ended without on_hand_end")
+        stacks = sum(p.stack for p in engine.players.values())
+        if stacks + self.report.rake != self._bankroll:
+            self._violation(f"chips not conserved: {stacks} + rake {self.report.rake} != {self._bankroll}")
+        self.report.hands += 1
+        return True
+
+    async def _run(self, hands: int):
+        for _ in range(hands):
+            await self._reseat()
+            if not await self._play_hand():
+                break
+
+    def run(self, hands: int) -> SimulationReport:
+        start = time.perf_counter()
+        asyncio.run(self._run(hands))
+        self.report.elapsed += time.perf_counter() - start
+        return self.report
@@ -0,0 +1,216 @@
+"""
+Compact binary snapshots of a GameEngine.
+
+A snapshot holds everything needed to carry on a table, mid-hand included:
+seats and stacks, hole cards, the deck order and cursor, board, pots and
+uncollected bets, street, action order and the turn deadline. It is a few
+hundred bytes of fixed-width little-endian fields, so it can be taken after
+every state change.
+
+Not captured: the engine's callbacks and clock (passed to load()) and the
+RNG. The deck shuffles lazily, so a fresh RNG only changes the order of
+cards not dealt yet; the dealt ones are restored exactly.
+
+Layout (version 1):
+
+    header    magic, version
+    table     ids, blinds, rake, timers, seats, street, betting counters
+    deck      cursor + 52 card ids
+    board     count + card ids
+    players   count + (user_id, seat, stack, status, bets, hole cards)
+    order     action order user_ids, then user_ids that acted this round
+    pots      count + (amount, eligible user_ids), then uncollected bets
+    extras    length + JSON (equities, last_action), usually empty
+"""
+import json
+import struct
+
+from app.game.engine import GameEngine
+from app.game.pot import Pot
+from app.game.player_fsm import PlayerState, PlayerStatus
+from app.game.table_fsm import STREET_ORDER
+
+MAGIC = b"PKSN"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+# table_id, small_blind, big_blind, rake_percent, turn_timeout, turn_deadline,
+# dealer_seat, sb_seat, bb_seat, street, hand_in_progress,
+# current_player_id, current_bet, min_raise,
+# action_index, active, all_in, folded, pending_to_act
+_TABLE = struct.Struct("<qqqdddbbbBBqqqBBBBb")
+_DECK = struct.Struct("<B52s")
+# user_id, seat, stack, status, current_bet, total_bet_this_hand, hole card count
+_PLAYER = struct.Struct("<qBqBqqB")
+_POT = struct.Struct("<qB")
+_BET = struct.Struct("<qq")
+_COUNT = struct.Struct("<B")
+_EXTRAS = struct.Struct("<H")
+
+_STATUSES = list(PlayerStatus)
+_NONE_SEAT = -1
+_NONE_PLAYER = -1
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _ids(ids) -> bytes:
+    ids = list(ids)
+    return _COUNT.pack(len(ids)) + struct.pack(f"<{len(ids)}q", *ids)
+
+
+def dump(engine: GameEngine) -> bytes:
+    """Serialize the engine's table and hand state."""
+    out = [_HEADER.pack(MAGIC, VERSION), _TABLE.pack(
+        engine.table_id, engine.small_blind, engine.big_blind,
+        engine.rake_percent, engine.turn_timeout, engine.turn_deadline,
+        engine.dealer_seat,
+        _NONE_SEAT if engine.sb_seat is None else engine.sb_seat,
+        _NONE_SEAT if engine.bb_seat is None else engine.bb_seat,
+        STREET_ORDER.index(engine.street), engine.hand_in_progress,
+        _NONE_PLAYER if engine.current_player_id is None else engine.current_player_id,
+        engine.current_bet, engine.min_raise,
+        engine._action_index, engine._active_count, engine._all_in_count,
+        engine._folded_count, engine._pending_to_act,
+    )]
+
+    deck = engine.deck
+    out.append(_DECK.pack(deck._pos, bytes(deck._cards)))
+    out.append(_COUNT.pack(len(engine.community_cards)) + bytes(engine.community_cards))
+
+    players = [p for p in engine.seats if p is not None]
+    out.append(_COUNT.pack(len(players)))
+    for p in players:
+        out.append(_PLAYER.pack(
+            p.user_id, p.seat, p.stack, _STATUSES.index(p.status),
+            p.current_bet, p.total_bet_this_hand, len(p.hole_cards),
+        ))
+        out.append(bytes(p.hole_cards))
+
+    out.append(_ids(engine._action_order))
+    out.append(_ids(sorted(engine._players_acted)))
+
+    pot_manager = engine.pot_manager
+    out.append(_COUNT.pack(len(pot_manager.pots)))
+    for pot in pot_manager.pots:
+        eligible = sorted(pot.eligible_players)
+        out.append(_POT.pack(pot.amount, len(eligible)))
+        out.append(struct.pack(f"<{len(eligible)}q", *eligible))
+    out.append(_COUNT.pack(len(pot_manager._player_bets)))
+    for uid, amount in pot_manager._player_bets.items():
+        out.append(_BET.pack(uid, amount))
+
+    extras = b""
+    if engine.equities or engine.last_action:
+        extras = json.dumps(
+            {"equities": engine.equities, "last_action": engine.last_action},
+            separators=(",", ":"),
+        ).encode()
+    out.append(_EXTRAS.pack(len(extras)) + extras)
+    return b"".join(out)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def take(self, n: int) -> bytes:
+        if self.pos + n > len(self.data):
+            raise struct.error("snapshot truncated")
+        chunk = bytes(self.data[self.pos:self.pos + n])
+        self.pos += n
+        return chunk
+
+    def ids(self) -> list[int]:
+        (n,) = self.unpack(_COUNT)
+        return list(self.unpack(struct.Struct(f"<{n}q")))
+
+
+def load(data: bytes, **engine_kwargs) -> GameEngine:
+    """
+    Rebuild an engine from dump() output. engine_kwargs are passed to
+    GameEngine (broadcast, on_hand_end, rng, clock).
+    """
+    try:
+        return _load(_Reader(data), engine_kwargs)
+    except (struct.error, IndexError, KeyError) as e:
+        raise SnapshotError(f"Corrupt engine snapshot: {e}") from e
+
+
+def _load(r: _Reader, engine_kwargs: dict) -> GameEngine:
+    magic, version = r.unpack(_HEADER)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot {magic!r} v{version}")
+
+    (table_id, small_blind, big_blind, rake_percent, turn_timeout, turn_deadline,
+     dealer_seat, sb_seat, bb_seat, street, hand_in_progress,
+     current_player_id, current_bet, min_raise,
+     action_index, active, all_in, folded, pending) = r.unpack(_TABLE)
+
+    engine = GameEngine(
+        table_id=table_id, small_blind=small_blind, big_blind=big_blind,
+        rake_percent=rake_percent, turn_timeout=turn_timeout, **engine_kwargs,
+    )
+    engine._turn_deadline = turn_deadline
+    engine.dealer_seat = dealer_seat
+    engine.sb_seat = None if sb_seat == _NONE_SEAT else sb_seat
+    engine.bb_seat = None if bb_seat == _NONE_SEAT else bb_seat
+    engine.street = STREET_ORDER[street]
+    engine.hand_in_progress = bool(hand_in_progress)
+    engine.current_player_id = None if current_player_id == _NONE_PLAYER else current_player_id
+    engine.current_bet = current_bet
+    engine.min_raise = min_raise
+    engine._action_index = action_index
+    engine._active_count = active
+    engine._all_in_count = all_in
+    engine._folded_count = folded
+    engine._pending_to_act = pending
+
+    deck_pos, cards = r.unpack(_DECK)
+    engine.deck._cards = bytearray(cards)
+    engine.deck._pos = deck_pos
+    (n,) = r.unpack(_COUNT)
+    engine.community_cards = list(r.take(n))
+
+    (n,) = r.unpack(_COUNT)
+    for _ in range(n):
+        uid, seat, stack, status, bet, total_bet, n_cards = r.unpack(_PLAYER)
+        player = PlayerState(
+            user_id=uid, seat=seat, stack=stack, status=_STATUSES[status],
+            current_bet=bet, total_bet_this_hand=total_bet,
+        )
+        hole = list(r.take(n_cards))
+        if hole:
+            player.hole_cards = hole
+            player.hand.reset(hole + engine.community_cards)
+        engine.players[uid] = player
+        engine.seats[seat] = player
+
+    engine._action_order = r.ids()
+    engine._players_acted = set(r.ids())
+
+    (n,) = r.unpack(_COUNT)
+    for _ in range(n):
+        amount, n_eligible = r.unpack(_POT)
+        eligible = r.unpack(struct.Struct(f"<{n_eligible}q"))
+        engine.pot_manager.pots.append(Pot(amount, frozenset(eligible)))
+    (n,) = r.unpack(_COUNT)
+    for _ in range(n):
+        uid, amount = r.unpack(_BET)
+        engine.pot_manager._player_bets[uid] = amount
+
+    (n,) = r.unpack(_EXTRAS)
+    if n:
+        extras = json.loads(r.take(n))
+        # JSON object keys come back as strings
+        engine.equities = {int(k): v for k, v in (extras["equities"] or {}).items()}
+        engine.last_action = extras["last_action"]
+    return engine
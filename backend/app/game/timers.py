@@ -0,0 +1,95 @@
+"""
+Hashed timer wheel shared by all tables.
+
+One loop task ticks every `resolution` seconds and fires the callbacks whose
+time has come. Timers are keyed (e.g. by (table_id, "turn")): arming a key
+replaces its previous timer, and arm / cancel are O(1) dict operations, so
+re-arming a turn timer on every action costs no task creation or
+cancellation. Callbacks are plain functions run on the loop task; anything
+slow should be handed off (e.g. submitted to a table actor).
+"""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Timer:
+    key: Hashable
+    when: float
+    tick: int  # absolute tick the timer fires on; slot = tick % slots
+    callback: Callable[[], None]
+
+
+class TimerWheel:
+    def __init__(
+        self,
+        resolution: float = 0.1,
+        slots: int = 512,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.resolution = resolution
+        self.clock = clock
+        self._slots: list[dict[Hashable, _Timer]] = [{} for _ in range(slots)]
+        self._timers: dict[Hashable, _Timer] = {}
+        self._tick = int(clock() / resolution)  # last tick processed
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._timers)
+
+    def arm(self, key: Hashable, when: float, callback: Callable[[], None]):
+        """Fire `callback` at clock time `when`, replacing any timer under `key`."""
+        self.cancel(key)
+        tick = max(math.ceil(when / self.resolution), self._tick + 1)
+        timer = _Timer(key, when, tick, callback)
+        self._slots[tick % len(self._slots)][key] = timer
+        self._timers[key] = timer
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._slots[timer.tick % len(self._slots)][key]
+        return True
+
+    def due(self, key: Hashable) -> float | None:
+        """When the timer under `key` fires, or None if not armed."""
+        timer = self._timers.get(key)
+        return timer.when if timer else None
+
+    def advance(self, now: float | None = None):
+        """Fire every timer due by `now`."""
+        target = int((self.clock() if now is None else now) / self.resolution)
+        n = len(self._slots)
+        # After a stall longer than a full turn, one pass over every slot is enough
+        for tick in range(max(self._tick + 1, target - n + 1), target + 1):
+            slot = self._slots[tick % n]
+            if not slot:
+                continue
+            for timer in [t for t in slot.values() if t.tick <= target]:
+                del slot[timer.key]
+                del self._timers[timer.key]
+                try:
+                    timer.callback()
+                except Exception as e:
+                    logger.error(f"Timer {timer.key!r} callback failed: {e}")
+        self._tick = max(self._tick, target)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.resolution)
+            self.advance()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
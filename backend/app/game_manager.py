@@ -2,11 +2,29 @@
 Manages active game engines for all tables.
 Bridges WebSocket events, REST API joins, and the game engine.
 Auto-creates engines on first join, auto-starts hands when 2+ players sit.
+
+Every engine mutation (WS actions, REST joins/leaves, turn timers, next-hand
+starts) runs as a command on the table's TableActor, one at a time.
+
+After each command batch the engine is snapshotted (app.game.snapshot) to
+the engine store, and stored tables are restored on startup or when this
+worker takes one over, so hands in progress survive restarts.
+
+Public functions take and return chip amounts in major units (as stored in
+the DB); engines work in integer minor units, converted here.
 """
 import asyncio
 import logging
-from sqlalchemy import select
+import time
+from decimal import InvalidOperation
+from app import engine_store, hand_events
+from app.game import snapshot
+from app.game.actor import TableActor
 from app.game.engine import GameEngine, GameAction, ActionType
+from app.game.player_fsm import PlayerStatus
+from app.game.money import to_major, to_minor, to_float
+from app.game.timers import TimerWheel
+from app.stack_sync import stack_sync
 from app.ws import manager as ws_manager
 from app.config import get_settings
 from app.database import async_session
@@ -16,11 +34,11 @@ logger = logging.getLogger(__name__)
 # Active game engines: table_id -> GameEngine
 _engines: dict[int, GameEngine] = {}
 
-# Pending "next hand" tasks so we can cancel them on shutdown
-_next_hand_tasks: dict[int, asyncio.Task] = {}
+# Table actors serializing engine mutations: table_id -> TableActor
+_actors: dict[int, TableActor] = {}
 
-# Turn timer tasks: table_id -> Task
-_turn_timer_tasks: dict[int, asyncio.Task] = {}
+# Turn timeouts and next-hand starts for every table, keyed (table_id, kind)
+_timers = TimerWheel()
 
 HAND_RESTART_DELAY = 5.0  # seconds between hands
 
@@ -29,6 +47,20 @@ async def _broadcast(table_id: int, state: dict):
     """Broadcast personalised state to all players at the table."""
     engine = _engines.get(table_id)
     await ws_manager.broadcast_to_table(table_id, state, engine=engine)
+    if engine is not None:
+        await _save_snapshot(table_id, engine)
+
+
+async def _save_snapshot(table_id: int, engine: GameEngine):
+    if not engine_store.enabled():
+        return
+    from app import sharding
+    try:
+        if not await sharding.save_snapshot(table_id, snapshot.dump(engine)):
+            logger.warning(f"Table {table_id} is owned by another worker now, dropping its engine")
+            drop_table(table_id)
+    except Exception as e:
+        logger.error(f"Failed to snapshot table {table_id}: {e}")
 
 
 def get_engine(table_id: int) -> GameEngine | None:
@@ -49,130 +81,258 @@ def get_or_create_engine(
     rake = rake_override if rake_override is not None else settings.rake_percent
     engine = GameEngine(
         table_id=table_id,
-        small_blind=small_blind,
-        big_blind=big_blind,
+        small_blind=to_minor(small_blind),
+        big_blind=to_minor(big_blind),
         rake_percent=rake,
-        broadcast=_broadcast,
         on_hand_end=_on_hand_end,
     )
-    _engines[table_id] = engine
+    _install(engine)
     logger.info(f"Engine created for table {table_id} ({small_blind}/{big_blind}, rake={rake}%)")
     return engine
 
 
-async def _on_hand_end(table_id: int, rake_amount: float, winners: list[dict]):
-    """Called by engine when a hand finishes. Syncs DB and schedules next hand."""
+def _install(engine: GameEngine):
+    actor = TableActor(engine.table_id, engine, flush=_broadcast)
+    engine.broadcast = actor.publish  # coalesced, flushed after each command batch
+    _engines[engine.table_id] = engine
+    _actors[engine.table_id] = actor
+
+
+async def restore_engine(table_id: int) -> GameEngine | None:
+    """Bring a table back from its stored snapshot, if it has one."""
+    if table_id in _engines:
+        return _engines[table_id]
+    from app import sharding
+    if sharding.enabled() and not await sharding.is_local(table_id):
+        return None
+    try:
+        data = await engine_store.load(table_id)
+        if data is None:
+            return None
+        engine = snapshot.load(data, on_hand_end=_on_hand_end)
+    except Exception as e:
+        logger.error(f"Failed to restore table {table_id}: {e}")
+        return None
+    if table_id in _engines:  # created while the snapshot was loading
+        return _engines[table_id]
+
+    _install(engine)
+    if engine.hand_in_progress:
+        _start_turn_timer(table_id)
+    elif engine.seated_count() >= 2:
+        _schedule_next_hand(table_id)
+    logger.info(f"Engine restored for table {table_id} ({engine.seated_count()} players, "
+                f"hand in progress: {engine.hand_in_progress})")
+    return engine
+
+
+async def restore_engines():
+    """On startup: restore every stored table this worker hosts."""
+    from app import sharding
+    try:
+        table_ids = await engine_store.table_ids()
+    except Exception as e:
+        logger.error(f"Failed to list engine snapshots: {e}")
+        return
+    for table_id in table_ids:
+        if await sharding.is_local(table_id):
+            await restore_engine(table_id)
+
+
+async def _on_hand_end(table_id: int, rake_amount: int, winners: list[dict]):
+    """Called by engine when a hand finishes. Syncs DB and schedules next hand.
+    rake_amount and winner amounts are in minor units. Player stats, XP and
+    achievements are applied off the hot path by the hand event consumer."""
+    from app import sharding
+    if not await sharding.still_owns(table_id):
+        # Taken over mid-hand: the new owner replays it from its snapshot
+        logger.warning(f"Table {table_id} was taken over, discarding the hand's results here")
+        drop_table(table_id)
+        return
     engine = _engines.get(table_id)
     if engine:
+        dealt_in = [uid for uid, p in engine.players.items() if p.status != PlayerStatus.SITTING_OUT]
+        await hand_events.publish(hand_events.HandCompleted.from_hand(table_id, dealt_in, winners))
         await _sync_stacks_to_db(table_id, engine)
     if rake_amount > 0:
         await _record_rake(table_id, rake_amount)
-    await _update_player_stats(table_id, winners)
     _schedule_next_hand(table_id)
 
 
 def remove_engine(table_id: int):
     _engines.pop(table_id, None)
-    task = _next_hand_tasks.pop(table_id, None)
-    if task:
-        task.cancel()
-    timer = _turn_timer_tasks.pop(table_id, None)
-    if timer:
-        timer.cancel()
+    actor = _actors.pop(table_id, None)
+    if actor:
+        actor.stop()
+    _timers.cancel((table_id, "next_hand"))
+    _timers.cancel((table_id, "turn"))
+
+
+def drop_table(table_id: int):
+    """Forget a table another worker has taken over; its clients reconnect there."""
+    remove_engine(table_id)
+    ws_manager.close_table(table_id)
 
 
 async def player_joined(table_id: int, user_id: int, seat: int, stack: float,
                          small_blind: float, big_blind: float,
                          rake_override: float | None = None):
-    """Called from tables API when a player joins. Wires them into the engine."""
-    engine = get_or_create_engine(table_id, small_blind, big_blind,
-                                   rake_override=rake_override)
-    engine.add_player(user_id, seat, stack)
-    logger.info(f"Player {user_id} joined table {table_id} seat {seat} stack {stack}")
-
-    await _broadcast(table_id, engine.get_state())
+    """Called from tables API when a player joins. Wires them into the engine.
+    Raises sharding.NotOwner if another worker owns the table."""
+    from app import sharding
+    if not await sharding.still_owns(table_id):
+        # Never start a second engine for a table hosted elsewhere
+        raise sharding.NotOwner(table_id)
+    await restore_engine(table_id)
+    get_or_create_engine(table_id, small_blind, big_blind, rake_override=rake_override)
+
+    async def _join(engine: GameEngine):
+        engine.add_player(user_id, seat, to_minor(stack))
+        logger.info(f"Player {user_id} joined table {table_id} seat {seat} stack {stack}")
+        await engine.broadcast(table_id, engine.get_state())
+
+        # Auto-start hand if 2+ players and no hand running
+        if engine.seated_count() >= 2 and not engine.hand_in_progress:
+            _schedule_next_hand(table_id, delay=3.0)
 
-    # Auto-start hand if 2+ players and no hand running
-    if engine.seated_count() >= 2 and not engine.hand_in_progress:
-        _schedule_next_hand(table_id, delay=3.0)
+    await _actors[table_id].call(_join)
 
 
 async def player_left(table_id: int, user_id: int) -> float:
     """Called from tables API when a player leaves. Returns remaining stack."""
-    engine = _engines.get(table_id)
-    if not engine:
+    await restore_engine(table_id)
+    actor = _actors.get(table_id)
+    if not actor:
         return 0
 
-    remaining = engine.remove_player(user_id)
-    logger.info(f"Player {user_id} left table {table_id}, stack returned: {remaining}")
+    async def _leave(engine: GameEngine) -> float:
+        remaining = to_float(await engine.remove_player(user_id))
+        logger.info(f"Player {user_id} left table {table_id}, stack returned: {remaining}")
+        # Leaving on their turn folds them: time the next player's turn
+        _start_turn_timer(table_id)
+        await engine.broadcast(table_id, engine.get_state())
+        return remaining
+
+    remaining = await actor.call(_leave)
 
-    await _broadcast(table_id, engine.get_state())
+    # The caller settles the seat row next: land queued stack writes (and the
+    # unseating of a player who just busted) before it reads them
+    try:
+        await stack_sync.flush()
+    except Exception:
+        pass  # logged and requeued by stack_sync
 
-    if engine.seated_count() == 0:
+    if actor.engine.seated_count() == 0 and _actors.get(table_id) is actor:
         remove_engine(table_id)
+        try:
+            await engine_store.delete(table_id)
+        except Exception as e:
+            logger.error(f"Failed to delete snapshot of table {table_id}: {e}")
+        from app import sharding
+        await sharding.release(table_id)
 
     return remaining
 
 
+def _submit(table_id: int, command):
+    """Queue a command on the table's actor without waiting (timer callbacks)."""
+    actor = _actors.get(table_id)
+    if actor:
+        actor.submit(command).add_done_callback(_log_command_failure)
+
+
+def _log_command_failure(future: asyncio.Future):
+    if not future.cancelled() and future.exception():
+        logger.error(f"Table command failed: {future.exception()}")
+
+
 def _schedule_next_hand(table_id: int, delay: float = HAND_RESTART_DELAY):
-    """Schedule the next hand after a delay."""
-    old = _next_hand_tasks.pop(table_id, None)
-    if old:
-        old.cancel()
-
-    async def _start():
-        await asyncio.sleep(delay)
-        engine = _engines.get(table_id)
-        if engine and engine.seated_count() >= 2 and not engine.hand_in_progress:
+    """Schedule the next hand after a delay (re-arming replaces a pending one)."""
+    async def _start_if_ready(engine: GameEngine):
+        if engine.seated_count() >= 2 and not engine.hand_in_progress:
             await engine.start_hand()
             _start_turn_timer(table_id)
 
-    _next_hand_tasks[table_id] = asyncio.create_task(_start())
+    _timers.arm((table_id, "next_hand"), time.time() + delay,
+                lambda: _submit(table_id, _start_if_ready))
 
 
 # ── Turn timer ──
 
 def _start_turn_timer(table_id: int):
-    """Start a timer for the current player's turn."""
-    old = _turn_timer_tasks.pop(table_id, None)
-    if old:
-        old.cancel()
-
+    """Arm the table's turn timer at the engine's current turn deadline."""
     engine = _engines.get(table_id)
     if not engine or not engine.hand_in_progress or not engine.current_player_id:
+        _timers.cancel((table_id, "turn"))
         return
 
-    user_id = engine.current_player_id
-    timeout = engine.turn_timeout
-
-    async def _timer():
-        await asyncio.sleep(timeout)
-        eng = _engines.get(table_id)
-        if eng and eng.current_player_id == user_id and eng.hand_in_progress:
-            logger.info(f"Turn timeout: auto-fold user {user_id} at table {table_id}")
-            await eng.handle_timeout(user_id)
-            if eng.hand_in_progress and eng.current_player_id:
-                _start_turn_timer(table_id)
-            elif not eng.hand_in_progress:
-                await _sync_stacks_to_db(table_id, eng)
-                _schedule_next_hand(table_id)
-
-    _turn_timer_tasks[table_id] = asyncio.create_task(_timer())
+    async def _expire(eng: GameEngine):
+        if not eng.hand_in_progress or not eng.current_player_id:
+            return
+        # The engine's deadline is the source of truth: if the turn moved on
+        # since the timer was armed, wait for the new deadline instead
+        if eng.clock() < eng.turn_deadline:
+            _start_turn_timer(table_id)
+            return
+        user_id = eng.current_player_id
+        deadline = eng.turn_deadline
+        logger.info(f"Turn timeout: auto-fold user {user_id} at table {table_id}")
+        await eng.handle_timeout(user_id)
+        if eng.hand_in_progress and eng.turn_deadline == deadline:
+            # Nothing moved: re-arming at the same past deadline would fire
+            # again on the next tick, forever
+            logger.error(f"Turn timeout for user {user_id} at table {table_id} did not advance the hand")
+            _timers.cancel((table_id, "turn"))
+            return
+        await _after_step(table_id, eng)
+
+    _timers.arm((table_id, "turn"), engine.turn_deadline,
+                lambda: _submit(table_id, _expire))
+
+
+def engine_stats() -> dict:
+    """Tables hosted, queued actor commands and pending timers, for monitoring."""
+    return {
+        "tables": len(_engines),
+        "commands_queued": sum(a.queued for a in _actors.values()),
+        "timers_pending": _timers.pending,
+    }
+
+
+async def _after_step(table_id: int, engine: GameEngine):
+    """Restart the turn timer, or wrap up if the action ended the hand."""
+    if engine.hand_in_progress and engine.current_player_id:
+        _start_turn_timer(table_id)
+    elif not engine.hand_in_progress:
+        await _sync_stacks_to_db(table_id, engine)
+        _schedule_next_hand(table_id)
 
 
 # ── WebSocket message handler ──
 
-async def handle_ws_message(table_id: int, user_id: int, data: dict) -> dict:
-    """Process incoming WebSocket message from a player."""
-    engine = _engines.get(table_id)
-    if not engine:
+async def handle_ws_message(table_id: int, user_id: int, data: dict) -> dict | None:
+    """Process incoming WebSocket message from a player. Returns the reply,
+    or None if it was already queued on the player's socket."""
+    await restore_engine(table_id)
+    actor = _actors.get(table_id)
+    if not actor:
         return {"error": "No active game at this table"}
 
+    async def _handle(engine: GameEngine) -> dict:
+        return await _handle_message(table_id, user_id, data, engine)
+
+    return await actor.call(_handle)
+
+
+async def _handle_message(table_id: int, user_id: int, data: dict, engine: GameEngine) -> dict | None:
     msg_type = data.get("type")
 
     if msg_type == "action":
         action_str = data.get("action", "")
-        amount = float(data.get("amount", 0))
+        try:
+            amount = to_minor(data.get("amount", 0) or 0)
+        except (InvalidOperation, TypeError, ValueError):
+            return {"error": "Invalid amount"}
 
         try:
             action_type = ActionType(action_str)
@@ -184,16 +344,17 @@ async def handle_ws_message(table_id: int, user_id: int, data: dict) -> dict:
         )
 
         if "error" not in result:
-            if engine.hand_in_progress and engine.current_player_id:
-                _start_turn_timer(table_id)
-            elif not engine.hand_in_progress:
-                await _sync_stacks_to_db(table_id, engine)
-                _schedule_next_hand(table_id)
+            await _after_step(table_id, engine)
 
         return result
 
-    elif msg_type == "get_state":
-        return engine.get_state(for_user_id=user_id)
+    elif msg_type in ("get_state", "resync"):
+        # Send what this command batch changed first, then queue the snapshot
+        # from inside the command so no later delta can get ahead of it
+        actor = _actors.get(table_id)
+        if actor is not None:
+            await actor.flush_now()
+        return ws_manager.send_snapshot(table_id, user_id, engine)
 
     elif msg_type == "get_actions":
         return {"actions": engine.get_valid_actions(user_id)}
@@ -211,54 +372,23 @@ async def handle_ws_message(table_id: int, user_id: int, data: dict) -> dict:
 # ── DB sync ──
 
 async def _sync_stacks_to_db(table_id: int, engine: GameEngine):
-    """Write engine player stacks back to DB after a hand ends.
-    Removes busted players (stack=0) from both engine and DB."""
-    from app.models.table import TablePlayer, PokerTable
-    from app.models.balance import Balance, Transaction, TxType, CurrencyType
-
-    busted_ids = []
-
-    try:
-        async with async_session() as session:
-            # Determine table currency
-            tbl_result = await session.execute(
-                select(PokerTable).where(PokerTable.id == table_id)
-            )
-            tbl = tbl_result.scalar_one_or_none()
-            is_fun = tbl and tbl.currency == CurrencyType.FUN
-
-            for uid, player in engine.players.items():
-                result = await session.execute(
-                    select(TablePlayer).where(
-                        TablePlayer.table_id == table_id,
-                        TablePlayer.user_id == uid,
-                    )
-                )
-                tp = result.scalar_one_or_none()
-                if not tp:
-                    continue
-
-                if player.stack <= 0:
-                    busted_ids.append(uid)
-                    await session.delete(tp)
-                else:
-                    tp.stack = player.stack
-
-            if busted_ids and tbl:
-                tbl.current_players = max(0, tbl.current_players - len(busted_ids))
-
-            await session.commit()
-            logger.info(f"Synced stacks for table {table_id}, busted: {busted_ids}")
-    except Exception as e:
-        logger.error(f"Failed to sync stacks for table {table_id}: {e}")
-
-    # Remove busted players from engine
+    """Queue engine player stacks for the DB after a hand ends (see app.stack_sync).
+    Busted players (stack=0) are removed from the engine now and unseated in the DB
+    with the next flush."""
+    if _engines.get(table_id) is not engine:
+        return  # dropped: this worker no longer writes the table's seats
+    busted_ids = [uid for uid, p in engine.players.items() if p.stack <= 0]
+    stack_sync.put(
+        table_id,
+        {uid: to_major(p.stack) for uid, p in engine.players.items() if p.stack > 0},
+        busted_ids,
+    )
     for uid in busted_ids:
-        engine.remove_player(uid)
+        await engine.remove_player(uid)
 
 
-async def _record_rake(table_id: int, rake_amount: float):
-    """Record rake as a system transaction."""
+async def _record_rake(table_id: int, rake_amount: int):
+    """Record rake (minor units) as a system transaction."""
     from app.models.balance import Transaction, TxType
 
     if rake_amount <= 0:
@@ -270,94 +400,12 @@ async def _record_rake(table_id: int, rake_amount: float):
             tx = Transaction(
                 user_id=0,
                 tx_type=TxType.RAKE,
-                amount=rake_amount,
+                amount=to_major(rake_amount),
                 balance_after=0,  # system account — tracked separately
                 reference=f"table:{table_id}",
             )
             session.add(tx)
             await session.commit()
-            logger.info(f"Rake recorded: {rake_amount:.4f} from table {table_id}")
+            logger.info(f"Rake recorded: {to_major(rake_amount)} from table {table_id}")
     except Exception as e:
         logger.error(f"Failed to record rake for table {table_id}: {e}")
-
-
-async def _update_player_stats(table_id: int, winners: list[dict]):
-    """Update PlayerStats for all participants after a hand ends.
-
-    winners: list of {user_id, amount, hand_rank, no_showdown}
-    All seated players get hands_played++; winners get hands_won++ etc.
-    Achievement conditions are re-evaluated after the update.
-    """
-    from sqlalchemy import select
-    from app.models.shop import PlayerStats
-    from app.api.achievements import check_and_award
-
-    engine = _engines.get(table_id)
-    if not engine:
-        return
-
-    winner_ids = {w["user_id"] for w in winners}
-    winner_map = {w["user_id"]: w for w in winners}
-
-    try:
-        async with async_session() as session:
-            for uid in list(engine.players.keys()):
-                result = await session.execute(
-                    select(PlayerStats).where(PlayerStats.user_id == uid)
-                )
-                stats = result.scalar_one_or_none()
-                if stats is None:
-                    stats = PlayerStats(user_id=uid)
-                    session.add(stats)
-                    await session.flush()
-
-                stats.hands_played = (stats.hands_played or 0) + 1
-
-                if uid in winner_ids:
-                    w = winner_map[uid]
-                    stats.hands_won = (stats.hands_won or 0) + 1
-                    amount = float(w.get("amount", 0))
-                    stats.total_chips_won = float(stats.total_chips_won or 0) + amount
-                    if amount > float(stats.biggest_pot_won or 0):
-                        stats.biggest_pot_won = amount
-
-                    if w.get("no_showdown"):
-                        stats.hands_won_no_showdown = (stats.hands_won_no_showdown or 0) + 1
-
-                    hand_rank = w.get("hand_rank", "")
-                    if hand_rank:
-                        # Track best hand (simple rank ordering)
-                        _HAND_ORDER = [
-                            "High Card", "One Pair", "Two Pair", "Three of a Kind",
-                            "Straight", "Flush", "Full House", "Four of a Kind",
-                            "Straight Flush", "Royal Flush",
-                        ]
-                        current_best = stats.best_hand or ""
-                        curr_idx = _HAND_ORDER.index(current_best) if current_best in _HAND_ORDER else -1
-                        new_idx = _HAND_ORDER.index(hand_rank) if hand_rank in _HAND_ORDER else -1
-                        if new_idx > curr_idx:
-                            stats.best_hand = hand_rank
-
-                # XP per hand played + win bonus
-                _XP_HAND = 15
-                _XP_WIN  = 25
-                xp_gain = _XP_HAND + (_XP_WIN if uid in winner_ids else 0)
-                stats.xp = (stats.xp or 0) + xp_gain
-                from app.api.achievements import _calc_level
-                stats.level = _calc_level(stats.xp)
-
-                # Battle pass XP
-                from app.api.battlepass import grant_xp as bp_grant_xp
-                await bp_grant_xp(uid, xp_gain, session)
-
-            await session.flush()
-
-            # Check achievements for all participants
-            for uid in list(engine.players.keys()):
-                newly = await check_and_award(uid, session)
-                if newly:
-                    logger.info(f"User {uid} unlocked achievements: {newly}")
-
-            await session.commit()
-    except Exception as e:
-        logger.error(f"Failed to update player stats for table {table_id}: {e}")
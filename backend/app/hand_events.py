@@ -0,0 +1,413 @@
+"""
+Hand-end event pipeline.
+
+When a hand finishes, game_manager publishes a compact HandCompleted event
+to a Redis stream and moves on. A consumer (one per worker, sharing a
+consumer group) reads the stream in micro-batches, aggregates the events
+per player and applies them in one transaction: a bulk upsert of
+PlayerStats, then battle pass XP and achievement checks once per player
+per batch rather than once per hand, then the leaderboards. Entries are acknowledged only after
+the transaction commits, so a crash replays them instead of losing them.
+Delivery is at least once: the transaction also records the stream ids it
+applied (AppliedHandEvent) and skips ids already recorded, so a replayed
+entry, or one whose acknowledgement was lost, is never counted twice.
+An entry that keeps failing on its own is moved to a dead-letter stream
+after MAX_DELIVERIES attempts so it can't hold up the events behind it.
+"""
+import asyncio
+import datetime
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import delete, func
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import leaderboards
+from app.config import get_settings
+from app.database import async_session
+from app.game.hand_evaluator import HandRank
+from app.game.money import to_major, to_minor
+from app.models.shop import AppliedHandEvent, PlayerStats
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "poker:hand_events"
+GROUP = "player-stats"
+STREAM_MAXLEN = 100_000  # approximate cap; consumed entries beyond it are trimmed
+BATCH_SIZE = 200
+BLOCK_MS = 1000
+DEAD_LETTER_KEY = "poker:hand_events:dead"
+MAX_DELIVERIES = 10  # attempts before an entry is dead-lettered
+RETRY_MAX_DELAY = 30  # seconds, cap for the backoff between failed attempts
+ACK_ATTEMPTS = 3
+APPLIED_RETENTION = 7 * 24 * 3600  # seconds an applied entry id is remembered
+PRUNE_INTERVAL = 3600
+# Database or Redis being unreachable says nothing about the entry itself;
+# these are retried forever rather than counted towards dead-lettering
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, RedisError, OSError, asyncio.TimeoutError)
+
+# PlayerStats.best_hand values, indexed by HandRank
+HAND_NAMES = [
+    "High Card", "One Pair", "Two Pair", "Three of a Kind",
+    "Straight", "Flush", "Full House", "Four of a Kind",
+    "Straight Flush", "Royal Flush",
+]
+NO_SHOWDOWN = -1  # winner rank when everyone else folded
+
+
+@dataclass
+class HandCompleted:
+    table_id: int
+    players: list[int]  # user_ids dealt into the hand
+    # (user_id, amount won in minor units, HandRank value or NO_SHOWDOWN)
+    winners: list[tuple[int, int, int]] = field(default_factory=list)
+
+    @classmethod
+    def from_hand(cls, table_id: int, players: list[int], winners: list[dict]) -> "HandCompleted":
+        """Build from the engine's on_hand_end winners."""
+        return cls(table_id, players, [
+            (w["user_id"], w["amount"],
+             HandRank[w["hand_rank"]].value if "hand_rank" in w else NO_SHOWDOWN)
+            for w in winners
+        ])
+
+    def encode(self) -> bytes:
+        return json.dumps(
+            [self.table_id, self.players, self.winners], separators=(",", ":")
+        ).encode()
+
+    @classmethod
+    def decode(cls, data: bytes) -> "HandCompleted":
+        table_id, players, winners = json.loads(data)
+        return cls(table_id, players, [tuple(w) for w in winners])
+
+
+async def publish(event: HandCompleted):
+    """Queue a finished hand for the stats consumer."""
+    try:
+        await get_redis().xadd(
+            STREAM_KEY, {"e": event.encode()}, maxlen=STREAM_MAXLEN, approximate=True
+        )
+    except Exception as e:
+        # Don't drop the hand: apply it here, the slow way
+        logger.error(f"Failed to queue hand event for table {event.table_id}, applying inline: {e}")
+        try:
+            await apply_batch([event])
+        except Exception as e:
+            logger.error(f"Failed to update player stats for table {event.table_id}: {e}")
+
+
+@dataclass
+class _PlayerDelta:
+    hands_played: int = 0
+    hands_won: int = 0
+    hands_won_no_showdown: int = 0
+    chips_won: int = 0  # minor units
+    biggest_pot: int = 0
+    best_rank: int = -1
+    xp: int = 0
+
+    def changed_fields(self) -> set[str]:
+        """PlayerStats fields this delta moves, for picking achievements to re-check."""
+        changed = {"hands_played"}
+        if self.hands_won:
+            changed |= {"hands_won", "total_chips_won", "biggest_pot_won"}
+        if self.hands_won_no_showdown:
+            changed.add("hands_won_no_showdown")
+        if self.best_rank >= 0:
+            changed.add("best_hand")
+        return changed
+
+
+def _aggregate(events: list[HandCompleted]) -> dict[int, _PlayerDelta]:
+    from app.api.battlepass import XP_PER_HAND, XP_WIN_BONUS
+
+    deltas: dict[int, _PlayerDelta] = {}
+    for event in events:
+        # A player can win several pots (main and side pots) in one hand
+        winners: dict[int, tuple[int, int]] = {}
+        for uid, amount, rank in event.winners:
+            total, best = winners.get(uid, (0, NO_SHOWDOWN))
+            winners[uid] = (total + amount, max(best, rank))
+        for uid in event.players:
+            d = deltas.setdefault(uid, _PlayerDelta())
+            d.hands_played += 1
+            d.xp += XP_PER_HAND
+            won = winners.get(uid)
+            if won is None:
+                continue
+            amount, rank = won
+            d.hands_won += 1
+            d.xp += XP_WIN_BONUS
+            d.chips_won += amount
+            d.biggest_pot = max(d.biggest_pot, amount)
+            if rank == NO_SHOWDOWN:
+                d.hands_won_no_showdown += 1
+            else:
+                d.best_rank = max(d.best_rank, rank)
+    return deltas
+
+
+async def _claim_entries(session, entry_ids: list[str]) -> set[str]:
+    """Record entry ids as applied in this transaction; the ones not recorded before."""
+    stmt = (
+        pg_insert(AppliedHandEvent)
+        .values([{"entry_id": entry_id} for entry_id in entry_ids])
+        .on_conflict_do_nothing(index_elements=[AppliedHandEvent.entry_id])
+        .returning(AppliedHandEvent.entry_id)
+    )
+    return set((await session.scalars(stmt)).all())
+
+
+async def apply_batch(events: list[HandCompleted], entry_ids: list[str] | None = None):
+    """
+    Apply a batch of finished hands to stats, battle pass and achievements.
+    With entry_ids (the events' stream ids), events whose id was applied
+    before are skipped.
+    """
+    async with async_session() as session:
+        if entry_ids:
+            fresh = await _claim_entries(session, entry_ids)
+            if len(fresh) < len(entry_ids):
+                logger.info(f"Skipping {len(entry_ids) - len(fresh)} hand events applied before")
+            events = [event for entry_id, event in zip(entry_ids, events) if entry_id in fresh]
+        deltas = _aggregate(events)
+        if not deltas:
+            await session.commit()
+            return
+        season, totals = await _apply_deltas(session, deltas)
+        await session.commit()
+
+    try:
+        await leaderboards.record(
+            totals,
+            weekly_chips={uid: d.chips_won for uid, d in deltas.items()},
+            season_xp={uid: d.xp for uid, d in deltas.items()},
+            season_id=season.id if season else None,
+        )
+    except Exception as e:
+        # Stats are committed; a leaderboard rebuild catches the boards up
+        logger.error(f"Failed to update leaderboards: {e}")
+    logger.info(f"Applied {len(events)} hands for {len(deltas)} players")
+
+
+async def _apply_deltas(session, deltas: dict[int, _PlayerDelta]):
+    """
+    Write the deltas in the caller's transaction. Returns the active season
+    and each player's all-time (chips in minor units, hands won, XP).
+    """
+    from app.api.achievements import _calc_level, check_and_award
+    from app.api.battlepass import grant_xp_many
+
+    rows = [
+        {
+            "user_id": uid,
+            "hands_played": d.hands_played,
+            "hands_won": d.hands_won,
+            "hands_won_no_showdown": d.hands_won_no_showdown,
+            "total_chips_won": to_major(d.chips_won),
+            "biggest_pot_won": to_major(d.biggest_pot),
+            "best_hand": HAND_NAMES[d.best_rank] if d.best_rank >= 0 else None,
+            "xp": d.xp,
+        }
+        for uid, d in sorted(deltas.items())  # fixed order: concurrent batches lock rows alike
+    ]
+    stmt = pg_insert(PlayerStats)
+    ex = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PlayerStats.user_id],
+        set_={
+            "hands_played": func.coalesce(PlayerStats.hands_played, 0) + ex.hands_played,
+            "hands_won": func.coalesce(PlayerStats.hands_won, 0) + ex.hands_won,
+            "hands_won_no_showdown":
+                func.coalesce(PlayerStats.hands_won_no_showdown, 0) + ex.hands_won_no_showdown,
+            "total_chips_won": func.coalesce(PlayerStats.total_chips_won, 0) + ex.total_chips_won,
+            "biggest_pot_won": func.greatest(PlayerStats.biggest_pot_won, ex.biggest_pot_won),
+            "xp": func.coalesce(PlayerStats.xp, 0) + ex.xp,
+            "updated_at": func.now(),
+        },
+    ).returning(PlayerStats)
+
+    result = await session.scalars(stmt, rows, execution_options={"populate_existing": True})
+    updated = result.all()
+    for stats in updated:
+        d = deltas[stats.user_id]
+        # Best hand and level are derived in Python; only changed rows get written
+        if d.best_rank >= 0:
+            current = HAND_NAMES.index(stats.best_hand) if stats.best_hand in HAND_NAMES else -1
+            if d.best_rank > current:
+                stats.best_hand = HAND_NAMES[d.best_rank]
+        level = _calc_level(stats.xp)
+        if stats.level != level:
+            stats.level = level
+
+    season = await grant_xp_many({uid: d.xp for uid, d in deltas.items()}, session)
+
+    for uid, d in deltas.items():
+        newly = await check_and_award(uid, session, d.changed_fields())
+        if newly:
+            logger.info(f"User {uid} unlocked achievements: {newly}")
+
+    # Read before commit expires them; XP includes achievement rewards
+    totals = {
+        stats.user_id: (to_minor(stats.total_chips_won or 0), stats.hands_won or 0, stats.xp or 0)
+        for stats in updated
+    }
+    return season, totals
+
+
+async def _prune_applied():
+    """Forget applied entry ids old enough that their entries can't come back."""
+    async with async_session() as session:
+        await session.execute(
+            delete(AppliedHandEvent).where(
+                AppliedHandEvent.applied_at < func.now() - datetime.timedelta(seconds=APPLIED_RETENTION)
+            )
+        )
+        await session.commit()
+
+
+async def _ensure_group(r):
+    try:
+        await r.xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _dead_letter(r, entry_id: bytes, fields: dict, reason: str):
+    """Park an entry that cannot be applied and acknowledge it."""
+    await r.xadd(
+        DEAD_LETTER_KEY,
+        {"e": fields.get(b"e", b""), "id": entry_id, "error": reason[:500]},
+        maxlen=STREAM_MAXLEN, approximate=True,
+    )
+    await r.xack(STREAM_KEY, GROUP, entry_id)
+    logger.error(f"Hand event {entry_id!r} moved to {DEAD_LETTER_KEY}: {reason}")
+
+
+def _entry_key(entry_id) -> str:
+    return entry_id.decode() if isinstance(entry_id, bytes) else str(entry_id)
+
+
+async def _ack(r, *entry_ids) -> bool:
+    """
+    Acknowledge applied entries, retrying a few times. False if it still
+    fails: the entries stay pending and are skipped as applied when re-read.
+    """
+    for attempt in range(ACK_ATTEMPTS):
+        try:
+            await r.xack(STREAM_KEY, GROUP, *entry_ids)
+            return True
+        except _TRANSIENT_ERRORS as e:
+            if attempt == ACK_ATTEMPTS - 1:
+                logger.error(f"Failed to acknowledge {len(entry_ids)} applied hand events: {e}")
+                return False
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+
+async def _apply_entries(r, consumer: str, entries: list) -> bool:
+    """
+    Apply and acknowledge a batch of stream entries. If the batch fails, the
+    entries are applied one at a time so one bad entry can't hold up the
+    rest; an entry that has failed MAX_DELIVERIES times, for a reason other
+    than the database or Redis being unreachable, is dead-lettered.
+    Returns False if any entry is left pending for a retry.
+    """
+    decoded = []
+    for entry_id, fields in entries:
+        try:
+            decoded.append((entry_id, fields, HandCompleted.decode(fields[b"e"])))
+        except (KeyError, TypeError, ValueError) as e:
+            await _dead_letter(r, entry_id, fields, f"malformed: {e}")
+    if not decoded:
+        return True
+
+    # Only the apply is retried entry by entry; once it has committed, a
+    # failed acknowledgement is retried on its own
+    try:
+        await apply_batch(
+            [event for _, _, event in decoded],
+            [_entry_key(entry_id) for entry_id, _, _ in decoded],
+        )
+    except Exception as e:
+        if len(decoded) == 1:
+            failed = [(decoded[0][0], decoded[0][1], e)]
+        else:
+            logger.error(f"Hand event batch of {len(decoded)} failed, applying one by one: {e}")
+            failed = []
+    else:
+        return await _ack(r, *[entry_id for entry_id, _, _ in decoded])
+
+    acked = True
+    if not failed:
+        for entry_id, fields, event in decoded:
+            try:
+                await apply_batch([event], [_entry_key(entry_id)])
+            except Exception as e:
+                failed.append((entry_id, fields, e))
+            else:
+                acked = await _ack(r, entry_id) and acked
+        if not failed:
+            return acked
+
+    pending = await r.xpending_range(
+        STREAM_KEY, GROUP, min=failed[0][0], max=failed[-1][0],
+        count=len(decoded), consumername=consumer,
+    )
+    deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+    done = acked
+    for entry_id, fields, e in failed:
+        if not isinstance(e, _TRANSIENT_ERRORS) and deliveries.get(entry_id, 1) >= MAX_DELIVERIES:
+            await _dead_letter(r, entry_id, fields, str(e))
+        else:
+            logger.error(f"Hand event {entry_id!r} failed, will retry: {e}")
+            done = False
+    return done
+
+
+async def run_consumer():
+    """Consume hand events in micro-batches until cancelled."""
+    r = get_redis()
+    consumer = f"worker-{get_settings().worker_id}"
+    group_ready = False
+    # Entries read but not acknowledged before a restart (or a failed
+    # batch) come first
+    backlog = True
+    delay = 1
+    pruned_at = 0.0
+    while True:
+        try:
+            if not group_ready:
+                await _ensure_group(r)
+                group_ready = True
+
+            if time.monotonic() - pruned_at > PRUNE_INTERVAL:
+                pruned_at = time.monotonic()
+                await _prune_applied()
+
+            response = await r.xreadgroup(
+                GROUP, consumer, {STREAM_KEY: "0" if backlog else ">"},
+                count=BATCH_SIZE, block=None if backlog else BLOCK_MS,
+            )
+            entries = response[0][1] if response else []
+            if not entries:
+                backlog = False
+                continue
+
+            if await _apply_entries(r, consumer, entries):
+                delay = 1
+                continue
+            backlog = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Hand event consumer failed, retrying in {delay}s: {e}")
+            backlog = True
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RETRY_MAX_DELAY)
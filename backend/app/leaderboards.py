@@ -0,0 +1,183 @@
+"""
+Leaderboards kept in Redis sorted sets.
+
+Each board is one sorted set of user_id -> score, updated by the hand event
+consumer after each batch commits, so reading the top N or one player's
+rank is O(log N) instead of a sort over player_stats. The all-time boards
+are set to the committed PlayerStats values (achievement XP included); the
+weekly and season boards are bumped with ZINCRBY.
+
+Boards:
+    chips       total chips won, all time (minor units)
+    hands_won   hands won, all time
+    xp          XP, all time
+    weekly      chips won this ISO week (minor units), kept a few weeks
+    season      battle pass XP earned in the active season
+
+rebuild() repopulates the all-time boards from PlayerStats and the season
+board from UserBattlePass. The weekly board has no source to rebuild from
+and is left as it is. Updates landing while a rebuild runs can be lost
+when the rebuilt set replaces the live one: all-time scores catch up on the
+player's next hand, the season board on the next rebuild.
+"""
+import datetime
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.game.money import to_minor
+from app.models.battlepass import UserBattlePass
+from app.models.shop import PlayerStats
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+BOARDS = ("chips", "hands_won", "xp", "weekly", "season")
+CHIP_BOARDS = {"chips", "weekly"}  # scores in minor units
+_ALL_TIME = {"chips": "total_chips_won", "hands_won": "hands_won", "xp": "xp"}
+
+KEY = "poker:lb:{}"
+WEEKLY_TTL = 5 * 7 * 24 * 3600  # seconds a weekly board outlives its week
+REBUILD_LOCK_KEY = "poker:lb:rebuild"
+REBUILD_LOCK_TTL = 300
+REBUILD_CHUNK = 5000
+
+
+def _week_key(now: datetime.datetime | None = None) -> str:
+    year, week, _ = (now or datetime.datetime.now(datetime.timezone.utc)).isocalendar()
+    return KEY.format(f"weekly:{year}-W{week:02d}")
+
+
+def _season_key(season_id: int) -> str:
+    return KEY.format(f"season:{season_id}")
+
+
+async def board_key(board: str, db: AsyncSession) -> str | None:
+    """Redis key of a board right now; None for the season board out of season."""
+    if board in _ALL_TIME:
+        return KEY.format(board)
+    if board == "weekly":
+        return _week_key()
+    from app.api.battlepass import _active_season
+    season = await _active_season(db)
+    return _season_key(season.id) if season else None
+
+
+async def record(
+    totals: dict[int, tuple[int, int, int]],
+    weekly_chips: dict[int, int],
+    season_xp: dict[int, int],
+    season_id: int | None = None,
+):
+    """
+    Update every board for one applied batch, in a single round trip.
+
+    totals holds each player's all-time (chips won in minor units, hands
+    won, XP) as committed; they only ever grow, so ZADD GT keeps a batch
+    that commits late from setting a board back. weekly_chips and
+    season_xp are this batch's increments.
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    for i, board in enumerate(("chips", "hands_won", "xp")):
+        mapping = {uid: values[i] for uid, values in totals.items() if values[i]}
+        if mapping:
+            pipe.zadd(KEY.format(board), mapping, gt=True)
+
+    week = _week_key()
+    for key, increments in (
+        (week, weekly_chips),
+        (_season_key(season_id) if season_id is not None else None, season_xp),
+    ):
+        if key is None:
+            continue
+        for uid, amount in increments.items():
+            if amount:
+                pipe.zincrby(key, amount, uid)
+    if any(weekly_chips.values()):
+        pipe.expire(week, WEEKLY_TTL)
+    await pipe.execute()
+
+
+async def top(key: str, offset: int, limit: int) -> list[tuple[int, float]]:
+    """(user_id, score) from rank offset + 1 down, highest score first."""
+    rows = await get_redis().zrevrange(key, offset, offset + limit - 1, withscores=True)
+    return [(int(uid), score) for uid, score in rows]
+
+
+async def rank(key: str, user_id: int) -> tuple[int | None, float, int]:
+    """A player's 1-based rank (None if not on the board), score and board size."""
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.zrevrank(key, user_id)
+    pipe.zscore(key, user_id)
+    pipe.zcard(key)
+    position, score, total = await pipe.execute()
+    return (None if position is None else position + 1), score or 0, total
+
+
+async def _replace(key: str, rows):
+    """Fill a fresh set from async chunks of (user_id, score), then swap it in."""
+    r = get_redis()
+    tmp = f"{key}:rebuilding"
+    await r.delete(tmp)
+    count = 0
+    async for chunk in rows:
+        mapping = {uid: score for uid, score in chunk if score}
+        if mapping:
+            await r.zadd(tmp, mapping)
+            count += len(mapping)
+    if count:
+        await r.rename(tmp, key)
+    else:
+        await r.delete(key)
+    return count
+
+
+async def rebuild(db: AsyncSession) -> dict[str, int]:
+    """Repopulate the all-time and season boards from the database."""
+    counts = {}
+    for board, field in _ALL_TIME.items():
+        column = getattr(PlayerStats, field)
+        result = await db.stream(
+            select(PlayerStats.user_id, column).execution_options(yield_per=REBUILD_CHUNK)
+        )
+
+        async def chunks(result=result, board=board):
+            async for partition in result.partitions():
+                if board in CHIP_BOARDS:
+                    yield [(uid, to_minor(v or 0)) for uid, v in partition]
+                else:
+                    yield [(uid, v or 0) for uid, v in partition]
+
+        counts[board] = await _replace(KEY.format(board), chunks())
+
+    from app.api.battlepass import _active_season
+    season = await _active_season(db)
+    if season is not None:
+        result = await db.stream(
+            select(UserBattlePass.user_id, UserBattlePass.total_xp_earned)
+            .where(UserBattlePass.season_id == season.id)
+            .execution_options(yield_per=REBUILD_CHUNK)
+        )
+
+        async def season_chunks():
+            async for partition in result.partitions():
+                yield [(uid, v or 0) for uid, v in partition]
+
+        counts["season"] = await _replace(_season_key(season.id), season_chunks())
+
+    logger.info(f"Rebuilt leaderboards: {counts}")
+    return counts
+
+
+async def rebuild_if_missing(db: AsyncSession):
+    """Rebuild on startup when Redis has no boards, from one worker only."""
+    r = get_redis()
+    if await r.exists(KEY.format("chips")):
+        return
+    if not await r.set(REBUILD_LOCK_KEY, 1, nx=True, ex=REBUILD_LOCK_TTL):
+        return  # another worker is on it
+    try:
+        await rebuild(db)
+    finally:
+        await r.delete(REBUILD_LOCK_KEY)
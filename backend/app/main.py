@@ -13,7 +13,12 @@ from app.database import engine, Base, async_session
 from app.api import api_router
 from app.api.deps import validate_init_data
 from app.ws import manager as ws_manager
-from app.game_manager import handle_ws_message
+from app.game_manager import handle_ws_message, restore_engines
+from app import sharding
+from app.redis_client import close_redis
+from app.stack_sync import stack_sync
+from app.hand_events import run_consumer as run_hand_event_consumer
+from app.game.equity import shutdown_pool as shutdown_equity_pool
 from app.ton.ton_listener import poll_deposits
 from app.ton.ton_withdraw import process_pending_withdrawals
 
@@ -34,6 +39,17 @@ async def lifespan(app: FastAPI):
     async with _session_factory() as _db:
         await seed_season_1(_db)
 
+    # Fill the Redis leaderboards if they are gone (first run, flushed Redis)
+    from app.leaderboards import rebuild_if_missing
+    async with _session_factory() as _db:
+        try:
+            await rebuild_if_missing(_db)
+        except Exception as e:
+            logger.error(f"Leaderboard rebuild failed: {e}")
+
+    # Pick up tables (and hands in progress) from before the restart
+    await restore_engines()
+
     # Start TON deposit listener
     deposit_task = asyncio.create_task(poll_deposits())
 
@@ -45,11 +61,23 @@ async def lifespan(app: FastAPI):
 
     withdrawal_task = asyncio.create_task(_withdrawal_loop())
 
+    # Apply finished hands to player stats, XP and achievements in batches
+    hand_event_task = asyncio.create_task(run_hand_event_consumer())
+
+    # Report liveness and table count so other workers can route to us
+    heartbeat_task = asyncio.create_task(sharding.run_heartbeat()) if sharding.enabled() else None
+
     yield
 
     # Shutdown
     deposit_task.cancel()
     withdrawal_task.cancel()
+    hand_event_task.cancel()
+    if heartbeat_task:
+        heartbeat_task.cancel()
+    await stack_sync.close()
+    shutdown_equity_pool()
+    await close_redis()
     await engine.dispose()
 
 
@@ -123,6 +151,12 @@ async def websocket_table(
         await websocket.close(code=4003, reason="Internal error")
         return
 
+    # The table's engine may live on another worker: relay the socket there
+    owner = await sharding.owner_of(table_id)
+    if owner != cfg.worker_id:
+        await sharding.proxy_websocket(websocket, table_id, init_data, owner)
+        return
+
     await ws_manager.connect(table_id, user_id, websocket)
     logger.info(f"WS authenticated: tg={telegram_id} user_id={user_id} table={table_id}")
 
@@ -132,14 +166,16 @@ async def websocket_table(
             try:
                 data = json.loads(raw)
             except json.JSONDecodeError:
-                await websocket.send_json({"error": "Invalid JSON"})
+                await ws_manager.send_to_player(table_id, user_id, {"error": "Invalid JSON"})
                 continue
 
             result = await handle_ws_message(table_id, user_id, data)
-            await websocket.send_json(result)
+            # Through the socket's queue, so replies stay ordered with broadcasts
+            if result is not None:
+                await ws_manager.send_to_player(table_id, user_id, result)
 
     except WebSocketDisconnect:
-        ws_manager.disconnect(table_id, user_id)
+        ws_manager.disconnect(table_id, user_id, websocket)
     except Exception as e:
         logger.error(f"WS error: {e}")
-        ws_manager.disconnect(table_id, user_id)
+        ws_manager.disconnect(table_id, user_id, websocket)
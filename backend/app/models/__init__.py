@@ -2,7 +2,7 @@ from app.models.user import User
 from app.models.balance import Balance, Transaction
 from app.models.table import PokerTable, TablePlayer
 from app.models.tournament import Tournament, TournamentPlayer
-from app.models.shop import ShopItem, UserInventory, PlayerStats
+from app.models.shop import ShopItem, UserInventory, PlayerStats, AppliedHandEvent
 from app.models.achievement import Achievement, UserAchievement
 from app.models.clan import Clan, ClanMember
 from app.models.battlepass import BattlePassSeason, BattlePassLevel, UserBattlePass
@@ -11,7 +11,7 @@ __all__ = [
     "User", "Balance", "Transaction",
     "PokerTable", "TablePlayer",
     "Tournament", "TournamentPlayer",
-    "ShopItem", "UserInventory", "PlayerStats",
+    "ShopItem", "UserInventory", "PlayerStats", "AppliedHandEvent",
     "Achievement", "UserAchievement",
     "Clan", "ClanMember",
     "BattlePassSeason", "BattlePassLevel", "UserBattlePass",
@@ -1,6 +1,8 @@
 """Battle Pass season model and per-user progress."""
 import datetime
-from sqlalchemy import Integer, String, Numeric, DateTime, ForeignKey, Boolean, func, Text
+from sqlalchemy import (
+    BigInteger, Integer, String, Numeric, DateTime, ForeignKey, Boolean, func, UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -40,6 +42,9 @@ class BattlePassLevel(Base):
 class UserBattlePass(Base):
     """Per-user progress in the current season."""
     __tablename__ = "user_battlepass"
+    __table_args__ = (
+        UniqueConstraint("user_id", "season_id", name="uq_user_battlepass_user_season"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True, nullable=False)
@@ -47,8 +52,28 @@ class UserBattlePass(Base):
     current_level: Mapped[int] = mapped_column(Integer, default=1)
     current_xp: Mapped[int] = mapped_column(Integer, default=0)
     total_xp_earned: Mapped[int] = mapped_column(Integer, default=0)
-    # Comma-separated list of claimed level numbers
-    claimed_levels: Mapped[str] = mapped_column(Text, default="")
+    # Claimed levels as a bitmap: level n is bit (n - 1) % 64 of claimed_lo
+    # for levels 1-64 and of claimed_hi for 65-128 (signed, so bit 63 is the sign)
+    claimed_lo: Mapped[int] = mapped_column(BigInteger, default=0)
+    claimed_hi: Mapped[int] = mapped_column(BigInteger, default=0)
     updated_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+    def is_claimed(self, level: int) -> bool:
+        if not 1 <= level <= MAX_CLAIMABLE_LEVEL:
+            return False
+        bits = self.claimed_lo if level <= 64 else self.claimed_hi
+        return bool((bits or 0) >> ((level - 1) % 64) & 1)
+
+
+MAX_CLAIMABLE_LEVEL = 128
+
+
+def claim_mask(level: int) -> tuple[str, int]:
+    """(column name, signed 64-bit mask) of a level's bit in the claimed bitmap."""
+    word, bit = divmod(level - 1, 64)
+    mask = 1 << bit
+    if bit == 63:
+        mask -= 1 << 64  # as a signed BIGINT
+    return ("claimed_lo", "claimed_hi")[word], mask
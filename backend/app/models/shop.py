@@ -86,3 +86,13 @@ class PlayerStats(Base):
     updated_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+class AppliedHandEvent(Base):
+    """Hand event stream entries already applied to PlayerStats (app.hand_events)."""
+    __tablename__ = "applied_hand_events"
+
+    entry_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    applied_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
@@ -0,0 +1,20 @@
+"""Shared async Redis connection (REDIS_URL), created on first use."""
+import redis.asyncio as redis
+
+from app.config import get_settings
+
+_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.from_url(get_settings().redis_url)
+    return _client
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
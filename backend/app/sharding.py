@@ -0,0 +1,309 @@
+"""
+Table sharding across worker processes.
+
+With WORKER_COUNT > 1 each table's engine lives on exactly one worker. The
+table -> worker map is a Redis hash; a table is claimed by the least-loaded
+live worker the first time it is needed, and taken over the same way if its
+owner stops sending heartbeats. Calls that land on another worker are
+forwarded to the owner: REST join/leave over the internal API, WebSocket
+connections by proxying the socket.
+
+Every claim bumps the table's epoch. A worker remembers the epoch it holds
+each table under and writes snapshots only while owner and epoch still
+match, so a worker that stalled long enough to be taken over finds out on
+its next write (or heartbeat) and drops its stale engine instead of
+overwriting the new owner's state.
+
+With the default single worker everything is local and Redis is not used.
+"""
+import asyncio
+import logging
+
+import httpx
+import websockets
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app import engine_store, game_manager
+from app.config import get_settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+OWNER_KEY = "poker:table_owner"      # hash: table_id -> worker_id
+EPOCH_KEY = "poker:table_epoch"      # hash: table_id -> claims so far
+LOAD_KEY = "poker:worker_tables"     # hash: worker_id -> tables hosted
+ALIVE_KEY = "poker:worker_alive:{}"  # per-worker heartbeat, expires when it dies
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TTL = 15
+
+# Set the owner if it is still `expected` (or unset), bumping the epoch;
+# returns {owner, epoch} after the call
+_CLAIM = """
+local cur = redis.call('HGET', KEYS[1], ARGV[1])
+if cur == false or cur == ARGV[2] then
+  redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+  return {ARGV[3], redis.call('HINCRBY', KEYS[2], ARGV[1], 1)}
+end
+return {cur, redis.call('HGET', KEYS[2], ARGV[1]) or 0}
+"""
+
+# SET the snapshot only if the table is still held by ARGV[2] at epoch ARGV[3]
+_FENCED_SAVE = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2]
+   or tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or 0) ~= tonumber(ARGV[3]) then
+  return 0
+end
+redis.call('SET', KEYS[3], ARGV[4])
+return 1
+"""
+
+# Drop the mapping only if this worker still owns the table
+_RELEASE = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+  return redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+# Tables this worker owns: table_id -> epoch it claimed or found them at
+_held: dict[int, int] = {}
+
+
+class NotOwner(Exception):
+    """This worker does not own the table (any more); re-resolve the owner."""
+
+
+def enabled() -> bool:
+    return get_settings().worker_count > 1
+
+
+async def _live_workers() -> list[int]:
+    cfg = get_settings()
+    ids = list(range(cfg.worker_count))
+    alive = await get_redis().mget([ALIVE_KEY.format(i) for i in ids])
+    return [i for i, flag in zip(ids, alive) if flag or i == cfg.worker_id]
+
+
+async def _least_loaded() -> int:
+    live = await _live_workers()
+    loads = await get_redis().hgetall(LOAD_KEY)
+    load = {int(k): int(v) for k, v in loads.items()}
+    return min(live, key=lambda i: (load.get(i, 0), i))
+
+
+async def owner_of(table_id: int) -> int:
+    """Worker hosting the table, claiming it for a live worker if needed."""
+    cfg = get_settings()
+    if not enabled():
+        return cfg.worker_id
+
+    r = get_redis()
+    pipe = r.pipeline(transaction=True)
+    pipe.hget(OWNER_KEY, table_id)
+    pipe.hget(EPOCH_KEY, table_id)
+    current, epoch = await pipe.execute()
+    if current is not None:
+        owner = int(current)
+        if owner == cfg.worker_id or await r.exists(ALIVE_KEY.format(owner)):
+            return _observe(table_id, owner, int(epoch or 0))
+        logger.warning(f"Worker {owner} is down, reassigning table {table_id}")
+
+    expected = current if current is not None else ""
+    target = await _least_loaded()
+    owner, epoch = await r.eval(_CLAIM, 2, OWNER_KEY, EPOCH_KEY, table_id, expected, target)
+    return _observe(table_id, int(owner), int(epoch))
+
+
+def _observe(table_id: int, owner: int, epoch: int) -> int:
+    """Track what this worker holds; drop an engine left from an earlier tenure."""
+    held = _held.get(table_id)
+    if owner != get_settings().worker_id:
+        if held is not None:
+            _lost(table_id)
+    elif held != epoch:
+        if held is not None:
+            # Taken over and handed back since: the local engine is stale
+            _lost(table_id)
+        _held[table_id] = epoch
+    return owner
+
+
+def _lost(table_id: int):
+    _held.pop(table_id, None)
+    if game_manager.get_engine(table_id) is not None:
+        logger.warning(f"Table {table_id} was taken over by another worker, dropping its engine")
+        game_manager.drop_table(table_id)
+
+
+async def still_owns(table_id: int) -> bool:
+    """Whether this worker still holds the table at the epoch it claimed it."""
+    if not enabled():
+        return True
+    epoch = _held.get(table_id)
+    if epoch is None:
+        return await owner_of(table_id) == get_settings().worker_id
+    pipe = get_redis().pipeline(transaction=True)
+    pipe.hget(OWNER_KEY, table_id)
+    pipe.hget(EPOCH_KEY, table_id)
+    owner, current = await pipe.execute()
+    return owner is not None and int(owner) == get_settings().worker_id and int(current or 0) == epoch
+
+
+async def save_snapshot(table_id: int, data: bytes) -> bool:
+    """
+    engine_store.save, fenced by ownership: False (and nothing written) if
+    another worker has taken the table over.
+    """
+    if not enabled():
+        await engine_store.save(table_id, data)
+        return True
+    if table_id not in _held and not await still_owns(table_id):
+        return False
+    if get_settings().engine_snapshots != "redis":
+        # No shared store to fence atomically: check, then write
+        if not await still_owns(table_id):
+            return False
+        await engine_store.save(table_id, data)
+        return True
+    saved = await get_redis().eval(
+        _FENCED_SAVE, 3, OWNER_KEY, EPOCH_KEY, engine_store.REDIS_KEY.format(table_id),
+        table_id, get_settings().worker_id, _held[table_id], data,
+    )
+    return bool(saved)
+
+
+async def is_local(table_id: int) -> bool:
+    return await owner_of(table_id) == get_settings().worker_id
+
+
+async def release(table_id: int):
+    """Forget ownership of a table this worker no longer hosts."""
+    if enabled():
+        _held.pop(table_id, None)
+        await get_redis().eval(_RELEASE, 1, OWNER_KEY, table_id, get_settings().worker_id)
+
+
+async def run_heartbeat():
+    """Keep this worker marked alive and publish how many tables it hosts."""
+    cfg = get_settings()
+    r = get_redis()
+    while True:
+        try:
+            await r.set(ALIVE_KEY.format(cfg.worker_id), 1, ex=HEARTBEAT_TTL)
+            await r.hset(LOAD_KEY, cfg.worker_id, game_manager.engine_stats()["tables"])
+            await _check_held()
+        except Exception as e:
+            logger.error(f"Worker heartbeat failed: {e}")
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+async def _check_held():
+    """Drop every table another worker has claimed since this one took it."""
+    table_ids = list(_held)
+    if not table_ids:
+        return
+    pipe = get_redis().pipeline(transaction=True)
+    pipe.hmget(OWNER_KEY, table_ids)
+    pipe.hmget(EPOCH_KEY, table_ids)
+    owners, epochs = await pipe.execute()
+    for table_id, owner, epoch in zip(table_ids, owners, epochs):
+        if owner is not None and int(owner) == get_settings().worker_id:
+            if _held.get(table_id) not in (None, int(epoch or 0)):
+                _lost(table_id)
+        elif table_id in _held:
+            _lost(table_id)
+
+
+async def worker_loads() -> dict[int, int]:
+    """Tables hosted per worker, as last reported."""
+    if not enabled():
+        return {get_settings().worker_id: game_manager.engine_stats()["tables"]}
+    loads = await get_redis().hgetall(LOAD_KEY)
+    return {int(k): int(v) for k, v in loads.items()}
+
+
+# ── Forwarding ──
+
+def _worker_url(worker_id: int) -> str:
+    return get_settings().worker_url_list[worker_id]
+
+
+async def _forward(worker_id: int, path: str, payload: dict) -> dict:
+    async with httpx.AsyncClient(base_url=_worker_url(worker_id), timeout=10.0) as client:
+        resp = await client.post(path, json=payload, headers={"X-Worker-Key": get_settings().worker_secret})
+        resp.raise_for_status()
+        return resp.json()
+
+
+async def player_joined(table_id: int, user_id: int, seat: int, stack: float,
+                        small_blind: float, big_blind: float,
+                        rake_override: float | None = None):
+    """
+    game_manager.player_joined on the table's owner. Another worker is only
+    sent the user_id, so the seat row must be committed before calling this.
+    """
+    owner = await owner_of(table_id)
+    if owner == get_settings().worker_id:
+        await game_manager.player_joined(
+            table_id=table_id, user_id=user_id, seat=seat, stack=stack,
+            small_blind=small_blind, big_blind=big_blind, rake_override=rake_override,
+        )
+        return
+    # The owner reads the seat and stack from the committed seat row
+    try:
+        await _forward(owner, f"/api/internal/tables/{table_id}/join", {"user_id": user_id})
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 409:
+            raise
+        # The table moved while the request was in flight: ask its new owner
+        logger.warning(f"Worker {owner} no longer owns table {table_id}, re-resolving")
+        owner = await owner_of(table_id)
+        if owner == get_settings().worker_id:
+            await game_manager.player_joined(
+                table_id=table_id, user_id=user_id, seat=seat, stack=stack,
+                small_blind=small_blind, big_blind=big_blind, rake_override=rake_override,
+            )
+        else:
+            await _forward(owner, f"/api/internal/tables/{table_id}/join", {"user_id": user_id})
+
+
+async def player_left(table_id: int, user_id: int) -> float:
+    """game_manager.player_left on the table's owner."""
+    owner = await owner_of(table_id)
+    if owner == get_settings().worker_id:
+        return await game_manager.player_left(table_id, user_id)
+    result = await _forward(owner, f"/api/internal/tables/{table_id}/leave", {"user_id": user_id})
+    return result["remaining"]
+
+
+async def proxy_websocket(websocket: WebSocket, table_id: int, init_data: str, owner: int):
+    """Pipe a client's table socket to the owning worker's endpoint."""
+    base = _worker_url(owner).replace("http", "ws", 1)
+    url = f"{base}/ws/table/{table_id}?{httpx.QueryParams(initData=init_data)}"
+    await websocket.accept()
+    try:
+        async with websockets.connect(url) as upstream:
+            async def client_to_owner():
+                while True:
+                    await upstream.send(await websocket.receive_text())
+
+            async def owner_to_client():
+                async for message in upstream:
+                    await websocket.send_text(message)
+
+            tasks = [asyncio.create_task(client_to_owner()), asyncio.create_task(owner_to_client())]
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                task.cancel()
+            if upstream.close_code:
+                # Pass auth failures and slow-consumer closes through to the client
+                await websocket.close(code=upstream.close_code)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WS proxy to worker {owner} failed for table {table_id}: {e}")
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
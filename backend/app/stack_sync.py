@@ -0,0 +1,142 @@
+"""
+Write-behind queue for table stacks.
+
+After each hand game_manager queues the table's stacks and busted players
+here instead of writing them straight away. Pending writes are coalesced
+(a table's latest stacks replace earlier ones) and flushed for all tables
+in one transaction: a bulk UPDATE ... FROM (VALUES ...) for stacks, a bulk
+DELETE for busted players' seats and one UPDATE of the tables' player
+counts, however many tables and players are involved.
+"""
+import asyncio
+import logging
+from collections import Counter
+from decimal import Decimal
+
+from sqlalchemy import Integer, Numeric, column, delete, func, tuple_, update, values
+
+from app.database import async_session
+from app.models.table import PokerTable, TablePlayer
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.5  # seconds a write may wait to be batched with others
+MAX_PENDING_TABLES = 50  # flush early once this many tables are waiting
+
+
+class StackSyncQueue:
+    def __init__(self, interval: float = FLUSH_INTERVAL, max_tables: int = MAX_PENDING_TABLES):
+        self.interval = interval
+        self.max_tables = max_tables
+        self._stacks: dict[int, dict[int, Decimal]] = {}  # table_id -> user_id -> stack
+        self._busted: dict[int, set[int]] = {}  # table_id -> user_ids to unseat
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._stacks.keys() | self._busted.keys())
+
+    def put(self, table_id: int, stacks: dict[int, Decimal], busted: list[int] | None = None):
+        """Queue a table's current stacks (major units) and players to unseat."""
+        table_stacks = self._stacks.setdefault(table_id, {})
+        table_stacks.update(stacks)
+        if busted:
+            self._busted.setdefault(table_id, set()).update(busted)
+            for uid in busted:
+                table_stacks.pop(uid, None)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if self.pending >= self.max_tables:
+            self._wake.set()
+
+    async def flush(self):
+        """Write everything queued so far in one transaction."""
+        async with self._lock:
+            stacks, self._stacks = self._stacks, {}
+            busted, self._busted = self._busted, {}
+            if not stacks and not busted:
+                return
+            try:
+                await self._write(stacks, busted)
+            except Exception as e:
+                logger.error(f"Stack sync failed for tables {sorted(stacks.keys() | busted.keys())}: {e}")
+                self._requeue(stacks, busted)
+                raise
+
+    def _requeue(self, stacks: dict[int, dict[int, Decimal]], busted: dict[int, set[int]]):
+        # Writes queued since the failed flush are newer and win
+        for table_id, table_stacks in stacks.items():
+            self._stacks[table_id] = {**table_stacks, **self._stacks.get(table_id, {})}
+        for table_id, uids in busted.items():
+            self._busted.setdefault(table_id, set()).update(uids)
+
+    @staticmethod
+    async def _write(stacks: dict[int, dict[int, Decimal]], busted: dict[int, set[int]]):
+        rows = [
+            (table_id, uid, stack)
+            for table_id, table_stacks in stacks.items()
+            for uid, stack in table_stacks.items()
+        ]
+        pairs = [(table_id, uid) for table_id, uids in busted.items() for uid in uids]
+
+        async with async_session() as session:
+            if rows:
+                # Rendered inline so Postgres sees typed literals, not untyped parameters
+                v = values(
+                    column("table_id", Integer), column("user_id", Integer),
+                    column("stack", Numeric(18, 4)),
+                    name="v", literal_binds=True,
+                ).data(rows)
+                await session.execute(
+                    update(TablePlayer)
+                    .where(TablePlayer.table_id == v.c.table_id, TablePlayer.user_id == v.c.user_id)
+                    .values(stack=v.c.stack)
+                )
+
+            if pairs:
+                result = await session.execute(
+                    delete(TablePlayer)
+                    .where(tuple_(TablePlayer.table_id, TablePlayer.user_id).in_(pairs))
+                    .returning(TablePlayer.table_id)
+                )
+                removed = Counter(result.scalars().all())
+                if removed:
+                    n = values(
+                        column("id", Integer), column("n", Integer),
+                        name="n", literal_binds=True,
+                    ).data(list(removed.items()))
+                    await session.execute(
+                        update(PokerTable)
+                        .where(PokerTable.id == n.c.id)
+                        .values(current_players=func.greatest(0, PokerTable.current_players - n.c.n))
+                    )
+
+            await session.commit()
+        logger.info(f"Synced stacks: {len(stacks)} tables, {len(rows)} players, busted: {pairs}")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                pass  # logged and requeued; retried on the next tick
+
+    async def close(self):
+        """Stop the flush loop after writing what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+
+stack_sync = StackSyncQueue()
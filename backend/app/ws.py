@@ -1,71 +1,313 @@
-"""WebSocket manager for real-time game state updates."""
+"""
+WebSocket manager for real-time game state updates.
+
+State protocol: every message carries the table's sequence number `seq`.
+A client first gets a full {"type": "snapshot"} (on connect, or when it
+sends get_state / resync); after that each state change is sent as a
+{"type": "delta"} holding only what changed since seq - 1:
+
+    set      changed top-level fields (pot, street, current_player, ...)
+    players  user_id -> changed player fields, or null when the player left
+
+plus any change to the receiver's private overlay (your_cards, your_hand).
+A client that sees a gap in seq asks for a resync.
+"""
+import asyncio
 import json
 import logging
+import time
+from dataclasses import dataclass, field
+from enum import Enum
 from fastapi import WebSocket
-from typing import Dict, Set
+from typing import Dict
 
 logger = logging.getLogger(__name__)
 
 
+def _encode(data: dict) -> str:
+    # Same compact encoding as WebSocket.send_json
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _with_overlay(public_json: str, overlay: dict) -> str:
+    """Splice a small private overlay into an already-encoded public object."""
+    if not overlay:
+        return public_json
+    return f"{public_json[:-1]},{_encode(overlay)[1:]}"
+
+
+def _diff_dict(old: dict, new: dict) -> dict:
+    """Keys whose value changed; removed keys map to None."""
+    changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    for k in old.keys() - new.keys():
+        changed[k] = None
+    return changed
+
+
+def diff_state(old: dict, new: dict) -> dict:
+    """Delta between two public states: changed fields and per-player patches."""
+    delta: dict = {}
+    changed = _diff_dict(
+        {k: v for k, v in old.items() if k != "players"},
+        {k: v for k, v in new.items() if k != "players"},
+    )
+    if changed:
+        delta["set"] = changed
+
+    old_players = {p["user_id"]: p for p in old.get("players", [])}
+    players: dict[int, dict | None] = {}
+    for p in new.get("players", []):
+        before = old_players.pop(p["user_id"], None)
+        if before is None:
+            players[p["user_id"]] = p
+        else:
+            patch = _diff_dict(before, p)
+            if patch:
+                players[p["user_id"]] = patch
+    for uid in old_players:
+        players[uid] = None
+    if players:
+        delta["players"] = players
+    return delta
+
+
+@dataclass
+class _TableStream:
+    """Last broadcast public state of a table and its sequence number."""
+    seq: int = 0
+    state: dict | None = None
+    # user_id -> private overlay last sent; present once the client has a snapshot
+    synced: dict[int, dict] = field(default_factory=dict)
+
+
+class SlowConsumerPolicy(str, Enum):
+    LATEST = "latest"          # drop queued updates; the client gets a fresh snapshot
+    DISCONNECT = "disconnect"  # close the socket; the client reconnects and resyncs
+
+
+SLOW_CONSUMER_CLOSE_CODE = 4008
+TABLE_MOVED_CLOSE_CODE = 1012  # "service restart": reconnect, to the table's new worker
+
+
+@dataclass
+class _Connection:
+    ws: WebSocket
+    queue: asyncio.Queue  # (text, enqueued_at)
+    writer: asyncio.Task | None = None
+
+
+@dataclass
+class SendMetrics:
+    sent: int = 0
+    dropped: int = 0            # queued messages discarded for slow consumers
+    slow_disconnects: int = 0
+    latency_total: float = 0.0  # seconds from enqueue to send completed
+    latency_max: float = 0.0
+
+    def record(self, latency: float):
+        self.sent += 1
+        self.latency_total += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+
+
 class ConnectionManager:
-    """Manages WebSocket connections per table."""
+    """Manages WebSocket connections per table.
+
+    Every socket has a bounded outbound queue drained by its own writer
+    task, so broadcasting only encodes and enqueues: a slow client never
+    holds up the rest of the table or the engine that triggered the send.
+    """
+
+    def __init__(self, queue_size: int | None = None, policy: str | None = None):
+        # table_id -> user_id -> connection
+        self._connections: Dict[int, Dict[int, _Connection]] = {}
+        self._streams: Dict[int, _TableStream] = {}
+        self._queue_size = queue_size
+        self._policy = SlowConsumerPolicy(policy) if policy else None
+        self.metrics = SendMetrics()
 
-    def __init__(self):
-        # table_id -> set of (user_id, websocket)
-        self._connections: Dict[int, Dict[int, WebSocket]] = {}
+    def _settings(self) -> tuple[int, SlowConsumerPolicy]:
+        if self._queue_size is None or self._policy is None:
+            from app.config import get_settings
+            cfg = get_settings()
+            if self._queue_size is None:
+                self._queue_size = cfg.ws_send_queue_size
+            if self._policy is None:
+                self._policy = SlowConsumerPolicy(cfg.ws_slow_consumer_policy)
+        return self._queue_size, self._policy
 
     async def connect(self, table_id: int, user_id: int, ws: WebSocket):
         await ws.accept()
         if table_id not in self._connections:
             self._connections[table_id] = {}
-        self._connections[table_id][user_id] = ws
+            self._streams[table_id] = _TableStream()
+        old = self._connections[table_id].get(user_id)
+        if old and old.writer:
+            old.writer.cancel()
+        queue_size, _ = self._settings()
+        conn = _Connection(ws=ws, queue=asyncio.Queue(maxsize=queue_size))
+        conn.writer = asyncio.create_task(self._writer(table_id, user_id, conn))
+        self._connections[table_id][user_id] = conn
+        self._streams[table_id].synced.pop(user_id, None)
         logger.info(f"WS connected: user={user_id} table={table_id}")
 
-    def disconnect(self, table_id: int, user_id: int):
-        if table_id in self._connections:
-            self._connections[table_id].pop(user_id, None)
-            if not self._connections[table_id]:
+    def disconnect(self, table_id: int, user_id: int, ws: WebSocket | None = None):
+        """Forget a connection; with `ws`, only if it is still the user's current socket."""
+        connections = self._connections.get(table_id)
+        if connections is not None:
+            current = connections.get(user_id)
+            if current is None or (ws is not None and current.ws is not ws):
+                return
+            del connections[user_id]
+            self._streams[table_id].synced.pop(user_id, None)
+            if current.writer and current.writer is not asyncio.current_task():
+                current.writer.cancel()
+            if not connections:
                 del self._connections[table_id]
+                del self._streams[table_id]
         logger.info(f"WS disconnected: user={user_id} table={table_id}")
 
+    async def _writer(self, table_id: int, user_id: int, conn: _Connection):
+        try:
+            while True:
+                text, enqueued_at = await conn.queue.get()
+                await conn.ws.send_text(text)
+                self.metrics.record(time.perf_counter() - enqueued_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(table_id, user_id, conn.ws)
+
+    def _enqueue(self, table_id: int, user_id: int, conn: _Connection, text: str) -> bool:
+        """Queue a message; False if the connection was dropped as too slow."""
+        if conn.queue.full() and not self._shed(table_id, user_id, conn):
+            return False
+        conn.queue.put_nowait((text, time.perf_counter()))
+        return True
+
+    def _shed(self, table_id: int, user_id: int, conn: _Connection) -> bool:
+        """Apply the slow-consumer policy to a full queue; True if the connection stays."""
+        _, policy = self._settings()
+        if policy == SlowConsumerPolicy.DISCONNECT:
+            self.metrics.slow_disconnects += 1
+            self.disconnect(table_id, user_id, conn.ws)
+            asyncio.create_task(self._close(conn.ws, SLOW_CONSUMER_CLOSE_CODE, "Too slow"))
+            logger.warning(f"WS slow consumer disconnected: user={user_id} table={table_id}")
+            return False
+        while not conn.queue.empty():
+            conn.queue.get_nowait()
+            self.metrics.dropped += 1
+        # Whatever comes next for this client is a full snapshot
+        self._streams[table_id].synced.pop(user_id, None)
+        return True
+
+    def close_table(self, table_id: int):
+        """Close every socket at a table this worker stopped hosting."""
+        for user_id, conn in list(self._connections.get(table_id, {}).items()):
+            self.disconnect(table_id, user_id, conn.ws)
+            asyncio.create_task(self._close(conn.ws, TABLE_MOVED_CLOSE_CODE, "Table moved"))
+
+    @staticmethod
+    async def _close(ws: WebSocket, code: int, reason: str):
+        try:
+            await ws.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def snapshot(self, table_id: int, user_id: int, engine=None) -> dict:
+        """Full state for one client at the current seq; later broadcasts go out as deltas."""
+        stream = self._streams.get(table_id)
+        if stream is None:
+            # Not connected (plain request/response); nothing to keep in sync
+            state = engine.get_state() if engine is not None else {"table_id": table_id}
+            return {"type": "snapshot", "seq": 0, **state, "your_user_id": user_id}
+        if stream.state is None and engine is not None:
+            stream.state = engine.get_state()
+        overlay = self._private(engine, user_id)
+        stream.synced[user_id] = overlay
+        return {"type": "snapshot", "seq": stream.seq, **(stream.state or {}), **overlay}
+
+    def send_snapshot(self, table_id: int, user_id: int, engine=None) -> dict | None:
+        """
+        Queue a snapshot on the player's socket, behind the deltas already
+        queued there, so it can't overtake or be overtaken by one. Returns
+        the snapshot instead when the player has no socket here.
+        """
+        data = self.snapshot(table_id, user_id, engine)
+        conn = self._connections.get(table_id, {}).get(user_id)
+        if conn is None:
+            return data
+        self._enqueue(table_id, user_id, conn, _encode(data))
+        return None
+
+    @staticmethod
+    def _private(engine, user_id: int) -> dict:
+        if engine is not None:
+            return engine.get_private_state(user_id)
+        return {"your_user_id": user_id}
+
     async def broadcast_to_table(
         self,
         table_id: int,
         state: dict,
         engine=None,
     ):
-        """Send personalized game state to each connected player.
+        """Queue a game state change for each connected player.
 
-        When an engine is provided, each player receives a state where only
-        their own hole cards are revealed. Without an engine the raw state is
-        sent (used for non-hand broadcasts like seat updates).
+        `state` is the public snapshot. The delta against the previous one is
+        serialized once for the whole table, as is the snapshot for clients
+        that are not in sync yet. Each player gets it with their private
+        overlay (own hole cards, when an engine is provided) spliced in.
         """
         connections = self._connections.get(table_id, {})
-        disconnected = []
-
-        for user_id, ws in connections.items():
-            try:
-                if engine is not None:
-                    # Each player gets their own personalised view
-                    personalized = engine.get_state(for_user_id=user_id)
-                else:
-                    personalized = dict(state)
-                personalized["your_user_id"] = user_id
-                await ws.send_json(personalized)
-            except Exception:
-                disconnected.append(user_id)
-
-        for uid in disconnected:
-            self.disconnect(table_id, uid)
+        stream = self._streams.get(table_id)
+        if not connections or stream is None:
+            return
+
+        delta = diff_state(stream.state, state) if stream.state is not None else None
+        if delta == {}:
+            return
+        stream.seq += 1
+        stream.state = state
+        head = {"type": "delta", "table_id": table_id, "seq": stream.seq}
+        delta_json = _encode({**head, **delta}) if delta is not None else None
+        snapshot_json = None
+
+        for user_id, conn in list(connections.items()):
+            if conn.queue.full() and not self._shed(table_id, user_id, conn):
+                continue
+            overlay = self._private(engine, user_id)
+            last = stream.synced.get(user_id)
+            if delta_json is not None and last is not None:
+                text = _with_overlay(delta_json, _diff_dict(last, overlay))
+            else:
+                if snapshot_json is None:
+                    snapshot_json = _encode({"type": "snapshot", "seq": stream.seq, **state})
+                text = _with_overlay(snapshot_json, overlay)
+            stream.synced[user_id] = overlay
+            self._enqueue(table_id, user_id, conn, text)
 
     async def send_to_player(self, table_id: int, user_id: int, data: dict):
-        connections = self._connections.get(table_id, {})
-        ws = connections.get(user_id)
-        if ws:
-            try:
-                await ws.send_json(data)
-            except Exception:
-                self.disconnect(table_id, user_id)
+        conn = self._connections.get(table_id, {}).get(user_id)
+        if conn:
+            self._enqueue(table_id, user_id, conn, _encode(data))
+
+    def get_metrics(self) -> dict:
+        """Connection, queue depth and send latency figures for monitoring."""
+        depths = [c.queue.qsize() for conns in self._connections.values() for c in conns.values()]
+        m = self.metrics
+        return {
+            "tables": len(self._connections),
+            "connections": len(depths),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "sent": m.sent,
+            "dropped": m.dropped,
+            "slow_disconnects": m.slow_disconnects,
+            "send_latency_avg_ms": round(m.latency_total / m.sent * 1000, 3) if m.sent else 0.0,
+            "send_latency_max_ms": round(m.latency_max * 1000, 3),
+        }
 
 
 manager = ConnectionManager()
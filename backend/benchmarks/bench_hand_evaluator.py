@@ -0,0 +1,118 @@
+"""
+Hand evaluator benchmark: lookup-table evaluator (per hand and batched)
+vs the original combinations()-based implementation.
+
+Run from backend/:
+    python -m benchmarks.bench_hand_evaluator --hands 2000000
+"""
+import argparse
+import random
+import time
+from itertools import combinations
+
+import numpy as np
+
+from app.game.deck import Card, CARD_RANK, CARD_SUIT
+from app.game.hand_evaluator import HandRank, evaluate_batch, evaluate_hand, evaluate_strength
+
+
+# ── Reference implementation (pre lookup-table) ──
+
+def legacy_evaluate_hand(cards: list[Card]) -> tuple[HandRank, list[int]]:
+    best_rank = HandRank.HIGH_CARD
+    best_kickers: list[int] = []
+    for combo in combinations(cards, 5):
+        hand_rank, kickers = _legacy_evaluate_five(list(combo))
+        if (hand_rank, kickers) > (best_rank, best_kickers):
+            best_rank = hand_rank
+            best_kickers = kickers
+    return best_rank, best_kickers
+
+
+def _legacy_evaluate_five(cards: list[Card]) -> tuple[HandRank, list[int]]:
+    ranks = sorted([CARD_RANK[c] for c in cards], reverse=True)
+    is_flush = len(set(CARD_SUIT[c] for c in cards)) == 1
+    is_straight, straight_high = _legacy_check_straight(ranks)
+
+    rank_counts: dict[int, int] = {}
+    for r in ranks:
+        rank_counts[r] = rank_counts.get(r, 0) + 1
+    counts = sorted(rank_counts.values(), reverse=True)
+    sorted_by_count = sorted(rank_counts.keys(), key=lambda r: (rank_counts[r], r), reverse=True)
+
+    if is_straight and is_flush:
+        if straight_high == 14:
+            return HandRank.ROYAL_FLUSH, [straight_high]
+        return HandRank.STRAIGHT_FLUSH, [straight_high]
+    if counts == [4, 1]:
+        return HandRank.FOUR_OF_A_KIND, sorted_by_count
+    if counts == [3, 2]:
+        return HandRank.FULL_HOUSE, sorted_by_count
+    if is_flush:
+        return HandRank.FLUSH, ranks
+    if is_straight:
+        return HandRank.STRAIGHT, [straight_high]
+    if counts == [3, 1, 1]:
+        return HandRank.THREE_OF_A_KIND, sorted_by_count
+    if counts == [2, 2, 1]:
+        return HandRank.TWO_PAIR, sorted_by_count
+    if counts == [2, 1, 1, 1]:
+        return HandRank.ONE_PAIR, sorted_by_count
+    return HandRank.HIGH_CARD, ranks
+
+
+def _legacy_check_straight(ranks: list[int]) -> tuple[bool, int]:
+    unique = sorted(set(ranks), reverse=True)
+    if len(unique) != 5:
+        return False, 0
+    if unique[0] - unique[4] == 4:
+        return True, unique[0]
+    if unique == [14, 5, 4, 3, 2]:
+        return True, 5
+    return False, 0
+
+
+# ── Benchmark ──
+
+def _random_hands(n: int, size: int, seed: int) -> list[list[Card]]:
+    rng = random.Random(seed)
+    return [rng.sample(range(52), size) for _ in range(n)]
+
+
+def _run(label: str, fn, hands) -> list:
+    start = time.perf_counter()
+    results = [fn(h) for h in hands]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(hands):>10,} hands  {elapsed:8.2f}s  {len(hands) / elapsed:>12,.0f} hands/sec")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hands", type=int, default=2_000_000)
+    parser.add_argument("--baseline-hands", type=int, default=None,
+                        help="hands for the slow legacy run (default: same as --hands)")
+    parser.add_argument("--cards", type=int, default=7, choices=(5, 6, 7))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    hands = _random_hands(args.hands, args.cards, args.seed)
+    baseline = hands[: args.baseline_hands] if args.baseline_hands else hands
+
+    array = np.array(hands, dtype=np.int8)
+    start = time.perf_counter()
+    batch = evaluate_batch(array)
+    elapsed = time.perf_counter() - start
+    print(f"{'batch':<10} {len(hands):>10,} hands  {elapsed:8.2f}s  {len(hands) / elapsed:>12,.0f} hands/sec")
+
+    new = _run("table", evaluate_hand, hands)
+    old = _run("legacy", legacy_evaluate_hand, baseline)
+
+    mismatches = sum(1 for a, b in zip(new, old) if a != b)
+    print(f"cross-checked {len(old):,} hands, mismatches: {mismatches}")
+    batch_mismatches = sum(1 for h, s in zip(hands, batch.tolist()) if evaluate_strength(h) != s)
+    print(f"batch cross-checked {len(hands):,} hands, mismatches: {batch_mismatches}")
+
+
+if __name__ == "__main__":
+    main()
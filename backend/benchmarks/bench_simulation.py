@@ -0,0 +1,40 @@
+"""
+Full-hand engine throughput with bot players and invariant checks.
+
+Run from backend/:
+    python -m benchmarks.bench_simulation --players 6 --hands 50000 --policy mixed
+"""
+import argparse
+import sys
+
+from app.game.simulation import (
+    Simulator, aggressive_policy, passive_policy, random_policy, timeout_policy,
+)
+
+POLICIES = {
+    "passive": [passive_policy],
+    "random": [random_policy],
+    "aggressive": [aggressive_policy],
+    "mixed": [random_policy, aggressive_policy, passive_policy, timeout_policy(0.1)],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--hands", type=int, default=50_000)
+    parser.add_argument("--policy", choices=tuple(POLICIES), default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sim = Simulator(players=args.players, policies=POLICIES[args.policy], seed=args.seed)
+    report = sim.run(args.hands)
+    print(report.summary())
+    for violation in report.violations[:20]:
+        print(f"  {violation}")
+    if report.violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
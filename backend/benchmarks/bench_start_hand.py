@@ -0,0 +1,69 @@
+"""
+Micro-benchmark of GameEngine.start_hand and the deal phase.
+
+Run from backend/:
+    python -m benchmarks.bench_start_hand --players 9 --hands 100000 --rng secure
+"""
+import argparse
+import asyncio
+import time
+
+from app.game.deck import Deck
+from app.game.engine import GameEngine
+from app.game.rng import SecureRng, SeededRng
+
+
+def _make_rng(kind: str):
+    return SeededRng(1) if kind == "seeded" else SecureRng()
+
+
+def bench_deal(players: int, hands: int, rng: str) -> float:
+    """Shuffle + hole cards + burns + full board, as dealt in one hand."""
+    deck = Deck(_make_rng(rng))
+    start = time.perf_counter()
+    for _ in range(hands):
+        deck.reset()
+        for _ in range(players):
+            deck.deal(2)
+        deck.burn()
+        deck.deal(3)
+        deck.burn()
+        deck.deal(1)
+        deck.burn()
+        deck.deal(1)
+    return time.perf_counter() - start
+
+
+async def bench_start_hand(players: int, hands: int, rng: str) -> float:
+    engine = GameEngine(table_id=0, small_blind=1, big_blind=2, rng=_make_rng(rng))
+    for seat in range(players):
+        engine.add_player(user_id=seat + 1, seat=seat, stack=1000)
+
+    elapsed = 0.0
+    for _ in range(hands):
+        for p in engine.players.values():
+            p.stack = 1000
+        start = time.perf_counter()
+        await engine.start_hand()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def _report(label: str, hands: int, elapsed: float):
+    print(f"{label:<12} {hands:>9,} hands  {elapsed:7.2f}s  {elapsed / hands * 1e6:8.2f} us/hand")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=9)
+    parser.add_argument("--hands", type=int, default=100_000)
+    parser.add_argument("--rng", choices=("secure", "seeded"), default="secure")
+    args = parser.parse_args()
+
+    _report("deal", args.hands, bench_deal(args.players, args.hands, args.rng))
+    _report("start_hand", args.hands,
+            asyncio.run(bench_start_hand(args.players, args.hands, args.rng)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Randomized check of PotManager.collect_bets against the original
+per-level implementation it replaced.
+
+Plays random multi-street hands (bets, folds, all-ins of any size) through
+both, checking after every street that the pot totals agree and at the end
+that every player is paid the same for random hand strengths. Payouts are
+compared as exact fractions, since merged pots may split odd chips
+differently. Exits non-zero on the first mismatch.
+
+Run from backend/:
+    python -m benchmarks.check_pots --hands 20000 --seed 1
+"""
+import argparse
+import random
+import sys
+from fractions import Fraction
+
+from app.game.pot import PotManager
+
+
+# ── Reference implementation (pre single sweep) ──
+
+class LegacyPotManager:
+    def __init__(self):
+        self.pots: list[tuple[int, list[int]]] = []  # (amount, eligible user_ids)
+        self._player_bets: dict[int, int] = {}
+
+    def add_bet(self, user_id: int, amount: int):
+        self._player_bets[user_id] = self._player_bets.get(user_id, 0) + amount
+
+    def collect_bets(self, active_player_ids: list[int]):
+        if not self._player_bets:
+            return
+        remaining_bets = dict(self._player_bets)
+        prev_level = 0
+        for _, level in sorted(self._player_bets.items(), key=lambda x: x[1]):
+            if level <= prev_level:
+                continue
+            diff = level - prev_level
+            amount = 0
+            for pid, pbet in remaining_bets.items():
+                contribution = min(pbet, diff)
+                amount += contribution
+                remaining_bets[pid] = pbet - contribution
+            eligible = [
+                pid for pid, orig_bet in self._player_bets.items()
+                if orig_bet >= level and pid in active_player_ids
+            ]
+            if amount > 0:
+                self.pots.append((amount, eligible))
+            prev_level = level
+        self._player_bets.clear()
+
+
+def _payouts(pots, live: set[int], strength: dict[int, int]) -> dict[int, Fraction]:
+    paid: dict[int, Fraction] = {}
+    for amount, eligible in pots:
+        contenders = [uid for uid in eligible if uid in live]
+        if not contenders:
+            continue
+        best = max(strength[uid] for uid in contenders)
+        winners = [uid for uid in contenders if strength[uid] == best]
+        for uid in winners:
+            paid[uid] = paid.get(uid, 0) + Fraction(amount, len(winners))
+    return paid
+
+
+def play_hand(rng: random.Random) -> str | None:
+    """One random hand through both managers; a description of any mismatch."""
+    players = list(range(1, rng.randint(2, 9) + 1))
+    stacks = {uid: rng.choice([rng.randint(1, 50), rng.randint(50, 5000)]) for uid in players}
+    live = set(players)
+    new, old = PotManager(), LegacyPotManager()
+
+    for street in range(4):
+        in_hand = [uid for uid in players if uid in live and stacks[uid] > 0]
+        if len(live) < 2 or not in_hand:
+            break
+        for uid in in_hand:
+            roll = rng.random()
+            if roll < 0.15 and len(live) > 1:
+                live.discard(uid)
+                bet = rng.randint(0, stacks[uid]) if rng.random() < 0.3 else 0
+            elif roll < 0.3:
+                bet = stacks[uid]  # all-in
+            else:
+                bet = rng.randint(0, min(stacks[uid], 200))
+            if bet:
+                stacks[uid] -= bet
+                new.add_bet(uid, bet)
+                old.add_bet(uid, bet)
+        active = sorted(live)
+        new.collect_bets(active)
+        old.collect_bets(active)
+        old_total = sum(amount for amount, _ in old.pots)
+        if new.total != old_total:
+            return f"street {street}: total {new.total} != {old_total}"
+
+    strength = {uid: rng.randint(0, 5) for uid in players}
+    got = _payouts([(p.amount, p.eligible_players) for p in new.pots], live, strength)
+    want = _payouts(old.pots, live, strength)
+    if got != want:
+        return f"payouts {got} != {want} (pots {new.pots} vs {old.pots}, live {sorted(live)})"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hands", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+    rng = random.Random(seed)
+    for i in range(args.hands):
+        mismatch = play_hand(rng)
+        if mismatch:
+            print(f"seed {seed}, hand {i}: {mismatch}")
+            sys.exit(1)
+    print(f"{args.hands:,} hands OK (seed {seed})")
+
+
+if __name__ == "__main__":
+    main()
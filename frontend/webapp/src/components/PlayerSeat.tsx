@@ -9,6 +9,7 @@ interface Props {
     status: string
     current_bet: number
     cards: { rank: number; suit: number }[]
+    hand?: string | null
     username?: string
   }
   isCurrentTurn: boolean
@@ -61,6 +62,13 @@ export function PlayerSeat({ player, isCurrentTurn, isMe, position }: Props) {
         </AnimatePresence>
       </div>
 
+      {/* Current made hand (own cards, or everyone at showdown) */}
+      {player.hand && player.cards.length > 0 && (
+        <div className="mb-1 text-[10px] text-poker-gold-light font-medium whitespace-nowrap">
+          {player.hand}
+        </div>
+      )}
+
       {/* Fold animation */}
       <AnimatePresence>
         {isFolded && (
@@ -1,5 +1,5 @@
 import { useEffect, useRef, useCallback } from 'react'
-import { useStore } from '../store/useStore'
+import { useStore, applyDelta, withPrivateView, GameState } from '../store/useStore'
 import { useTelegram } from './useTelegram'
 
 const RECONNECT_DELAY_MS = 3000
@@ -9,6 +9,8 @@ export function useWebSocket(tableId: number | null) {
   const wsRef = useRef<WebSocket | null>(null)
   const reconnectAttempts = useRef(0)
   const reconnectTimer = useRef<ReturnType<typeof setTimeout> | null>(null)
+  // Raw server state (before the private overlay is merged); deltas apply to it
+  const rawState = useRef<GameState | null>(null)
   const setGameState = useStore((s) => s.setGameState)
   const { initData } = useTelegram()
 
@@ -24,15 +26,29 @@ export function useWebSocket(tableId: number | null) {
 
     ws.onopen = () => {
       reconnectAttempts.current = 0
+      rawState.current = null
       ws.send(JSON.stringify({ type: 'get_state' }))
     }
 
     ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data)
-        if (data.table_id !== undefined) {
-          setGameState(data)
+        if (data.type === 'delta') {
+          const prev = rawState.current
+          if (!prev) return  // snapshot still on its way
+          if (data.seq !== (prev.seq ?? 0) + 1) {
+            // Missed an update: drop deltas until a fresh snapshot arrives
+            rawState.current = null
+            ws.send(JSON.stringify({ type: 'resync' }))
+            return
+          }
+          rawState.current = applyDelta(prev, data)
+        } else if (data.table_id !== undefined) {
+          rawState.current = data
+        } else {
+          return
         }
+        setGameState(withPrivateView(rawState.current!))
       } catch {}
     }
 
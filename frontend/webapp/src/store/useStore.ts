@@ -10,7 +10,8 @@ interface User {
   fun_balance: number
 }
 
-interface GameState {
+export interface GameState {
+  seq?: number
   table_id: number | null
   street: string
   community_cards: any[]
@@ -23,6 +24,53 @@ interface GameState {
   dealer_seat: number | null
   sb_seat: number | null
   bb_seat: number | null
+  last_action?: { action: string; user_id: number; amount?: number } | null
+  // Private overlay, only for the receiving player
+  your_user_id?: number
+  your_cards?: { rank: number; suit: number }[]
+  your_hand?: string | null
+}
+
+/** Merge the private overlay into the shared public state: own seat gets its hole cards. */
+export function withPrivateView(state: GameState): GameState {
+  if (!state.your_cards) return state
+  return {
+    ...state,
+    players: state.players.map((p) =>
+      p.user_id === state.your_user_id
+        ? { ...p, cards: state.your_cards, hand: state.your_hand }
+        : p
+    ),
+  }
+}
+
+/** State change sent after the first snapshot (see app/ws.py). */
+export interface StateDelta {
+  type: 'delta'
+  seq: number
+  set?: Record<string, any>
+  players?: Record<string, any | null>
+  your_user_id?: number
+  your_cards?: { rank: number; suit: number }[] | null
+  your_hand?: string | null
+}
+
+/** Apply a delta to the previous raw (un-merged) state. */
+export function applyDelta(state: GameState, delta: StateDelta): GameState {
+  const next: any = { ...state, ...delta.set, seq: delta.seq }
+  if (delta.players) {
+    const players = new Map<number, any>(state.players.map((p) => [p.user_id, p]))
+    for (const [id, patch] of Object.entries(delta.players)) {
+      const uid = Number(id)
+      if (patch === null) players.delete(uid)
+      else players.set(uid, { ...players.get(uid), ...patch })
+    }
+    next.players = [...players.values()].sort((a, b) => a.seat - b.seat)
+  }
+  for (const key of ['your_user_id', 'your_cards', 'your_hand'] as const) {
+    if (key in delta) next[key] = delta[key]
+  }
+  return next
 }
 
 interface AppState {